@@ -0,0 +1,23 @@
+import os
+from typing import Dict, Optional
+
+from app.config.loaders.env_loader import env_settings
+from app.config.loaders.helpers.yaml_loading_helper import load_yaml
+from app.config.models.app_config_model import AppConfig
+
+# Keyed by the raw CONFIG_PATH value: resolving the path costs more than the lookup it guards.
+_validated: Dict[Optional[str], AppConfig] = {}
+
+
+def get_app_config() -> AppConfig:
+    """The validated config for ``CONFIG_PATH``, built once per process and shared by every caller."""
+    key = os.getenv("CONFIG_PATH")
+    config = _validated.get(key)
+    if config is None:
+        config = _validated[key] = AppConfig(**load_yaml(env_settings.get_config_path()))
+    return config
+
+
+def set_app_config(config: AppConfig) -> None:
+    """Seeds the cache with a config validated elsewhere, e.g. in the parent of a worker process."""
+    _validated[os.getenv("CONFIG_PATH")] = config
@@ -1,24 +1,40 @@
-from app.config.loaders.env_loader import env_settings
-from app.config.loaders.helpers.yaml_loading_helper import load_yaml
-from app.config.models.app_config_model import AppConfig, SitemapConfig, HttpCrawlerConfig, PostprocessConfig, \
-    ParsingConfig
+from app.config.loaders.app_config_loader import get_app_config
+from app.config.models.app_config_model import SitemapConfig, HttpCrawlerConfig, PostprocessConfig, \
+    ParsingConfig, CheckpointConfig, HttpCacheConfig, BatchConfig, \
+    TransportConfig, MetricsConfig
 
 
 def get_sitemap_config() -> SitemapConfig:
-    data = load_yaml(env_settings.get_config_path())
-    return AppConfig(**data).url_discovery.sitemap
+    return get_app_config().url_discovery.sitemap
 
 
 def get_crawler_config() -> HttpCrawlerConfig:
-    data = load_yaml(env_settings.get_config_path())
-    return AppConfig(**data).url_discovery.crawler
+    return get_app_config().url_discovery.crawler
 
 
 def get_postprocess_config() -> PostprocessConfig:
-    data = load_yaml(env_settings.get_config_path())
-    return AppConfig(**data).url_discovery.postprocess
+    return get_app_config().url_discovery.postprocess
 
 
 def get_parsing_config() -> ParsingConfig:
-    data = load_yaml(env_settings.get_config_path())
-    return AppConfig(**data).url_discovery.parsing
+    return get_app_config().url_discovery.parsing
+
+
+def get_checkpoint_config() -> CheckpointConfig:
+    return get_app_config().url_discovery.checkpoint
+
+
+def get_http_cache_config() -> HttpCacheConfig:
+    return get_app_config().url_discovery.http_cache
+
+
+def get_transport_config() -> TransportConfig:
+    return get_app_config().url_discovery.transport
+
+
+def get_batch_config() -> BatchConfig:
+    return get_app_config().url_discovery.batch
+
+
+def get_metrics_config() -> MetricsConfig:
+    return get_app_config().url_discovery.metrics
@@ -1,9 +1,14 @@
-from typing import List, Dict
+from typing import List, Dict, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
-class SitemapConfig(BaseModel):
+class FrozenModel(BaseModel):
+    # Validated once and shared (also with worker processes), so it must not change afterwards.
+    model_config = ConfigDict(frozen=True)
+
+
+class SitemapConfig(FrozenModel):
     timeout: int
     retry: int
     concurrency: int
@@ -12,9 +17,30 @@ class SitemapConfig(BaseModel):
     max_urls_per_sitemap: int = 50000
     max_total_urls: int = 1000000
     worker_timeout: float = 30.0
+    max_sitemap_bytes: int = 104857600
+    state_dir: str = ".sitemap_state"
+
+
+class TrapConfig(FrozenModel):
+    enabled: bool = True
+    max_depth: int = 15
+    max_segment_repeats: int = 2
+    max_query_keys: int = 6
+    max_query_variants: int = 200
+    min_year: int = 1990
+    max_years_ahead: int = 2
+    quarantine_after: int = 20
+    min_new_links: float = 1.5
+
 
+class FingerprintConfig(FrozenModel):
+    enabled: bool = False
+    max_distance: int = 4
+    min_words: int = 50
+    alias_links: Literal["lower", "skip"] = "lower"
 
-class HttpCrawlerConfig(BaseModel):
+
+class HttpCrawlerConfig(FrozenModel):
     include_subdomains: bool
     include_assets: bool
     html_only: bool
@@ -22,14 +48,37 @@ class HttpCrawlerConfig(BaseModel):
     concurrency: int
     obey_robots: bool
     verbose: bool
+    parse_executor: Literal["inline", "process"] = "inline"
+    parse_workers: int = 0
+    parse_batch_size: int = 8
+    frontier_hot_capacity: int = 100000
+    frontier_dir: Optional[str] = None
+    per_host_concurrency: Optional[float] = None
+    max_per_host_concurrency: Optional[float] = None
+    latency_factor: float = 3.0
+    max_crawl_delay: float = 30.0
+    max_retries: int = 2
+    max_html_bytes: int = 5_000_000
+    non_html_learn_after: int = 3
+    traps: TrapConfig = TrapConfig()
+    fingerprint: FingerprintConfig = FingerprintConfig()
 
 
-class PostprocessConfig(BaseModel):
+class PostprocessConfig(FrozenModel):
     collapse_language_variants: bool
     default_languages: List[str]
 
 
-class ParsingConfig(BaseModel):
+class CanonicalConfig(FrozenModel):
+    strip_tracking_params: bool = False
+    sort_query: bool = False
+    trailing_slash: Literal["strip", "keep"] = "keep"
+    case_insensitive_hosts: List[str] = []
+    ignore_params: Dict[str, List[str]] = {}
+    learn_from_redirects: bool = True
+
+
+class ParsingConfig(FrozenModel):
     html_content_types: List[str]
     sitemap_content_types: List[str]
     url_in_text_pattern: str
@@ -42,19 +91,58 @@ class ParsingConfig(BaseModel):
     prefer_https: bool
     strip_www: bool
     max_pagination_page: int
+    canonical: CanonicalConfig = CanonicalConfig()
+
+
+class CheckpointConfig(FrozenModel):
+    flush_interval: float = 1.0
+    snapshot_interval: float = 60.0
+
+
+class HttpCacheConfig(FrozenModel):
+    enabled: bool = False
+    path: str = ".http_cache"
+    max_bytes: int = 1073741824
+    max_entry_bytes: int = 52428800
+
+
+class TransportConfig(FrozenModel):
+    max_connections: int = 256
+    max_keepalive_connections: int = 128
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+    dns_ttl: float = 300.0
+
+
+class BatchConfig(FrozenModel):
+    workers: int = 0
+    max_concurrent_domains: int = 64
+    domain_timeout: float = 900.0
+
+
+class MetricsConfig(FrozenModel):
+    enabled: bool = False
+    summary_path: Optional[str] = None
+    prometheus_path: Optional[str] = None
+    prometheus_interval: float = 15.0
 
 
-class UrlDiscoveryConfig(BaseModel):
+class UrlDiscoveryConfig(FrozenModel):
     sitemap: SitemapConfig
     crawler: HttpCrawlerConfig
     postprocess: PostprocessConfig
     parsing: ParsingConfig
+    checkpoint: CheckpointConfig = CheckpointConfig()
+    http_cache: HttpCacheConfig = HttpCacheConfig()
+    transport: TransportConfig = TransportConfig()
+    batch: BatchConfig = BatchConfig()
+    metrics: MetricsConfig = MetricsConfig()
 
 
-class TestConfig(BaseModel):
+class TestConfig(FrozenModel):
     target_url: str
 
 
-class AppConfig(BaseModel):
+class AppConfig(FrozenModel):
     test: TestConfig
     url_discovery: UrlDiscoveryConfig
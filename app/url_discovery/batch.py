@@ -0,0 +1,147 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from multiprocessing import get_context
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+
+from app.config.loaders.app_config_loader import get_app_config, set_app_config
+from app.config.models.app_config_model import AppConfig
+from app.logging.logger import setup_logger
+
+if TYPE_CHECKING:
+    from app.url_discovery.core.transport import HttpSession
+
+
+@dataclass
+class DomainResult:
+    domain: str
+    urls: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    error: Optional[str] = None
+    # Near-duplicate pages among the URLs: alias URL -> URL of the original page.
+    aliases: Dict[str, str] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        record = asdict(self)
+        record["count"] = len(self.urls)
+        return json.dumps(record, ensure_ascii=False)
+
+
+@dataclass
+class BatchStats:
+    domains: int = 0
+    failed: int = 0
+    missing: int = 0
+    urls: int = 0
+    seconds: float = 0.0
+
+    @property
+    def domains_per_hour(self) -> float:
+        return self.domains * 3600 / self.seconds if self.seconds else 0.0
+
+
+async def discover_domain(domain: str, use_sitemap: bool = True, timeout: Optional[float] = None,
+                          session: Optional["HttpSession"] = None) -> DomainResult:
+    from app.url_discovery.orchestrator import UrlDiscoveryOrchestrator
+
+    start = time.perf_counter()
+    try:
+        orchestrator = UrlDiscoveryOrchestrator(domain, use_sitemap=use_sitemap, session=session)
+        urls = await asyncio.wait_for(orchestrator.discover(), timeout)
+        return DomainResult(domain, urls, round(time.perf_counter() - start, 3), aliases=orchestrator.aliases)
+    except asyncio.TimeoutError:
+        return DomainResult(domain, [], round(time.perf_counter() - start, 3), f"timed out after {timeout}s")
+    except Exception as e:
+        return DomainResult(domain, [], round(time.perf_counter() - start, 3), str(e) or type(e).__name__)
+
+
+async def _drain(tasks, results, concurrent_domains: int, use_sitemap: bool, timeout: Optional[float]) -> None:
+    from app.url_discovery.core.metrics import metrics_reporting
+    from app.url_discovery.core.transport import HttpSession
+
+    loop = asyncio.get_running_loop()
+    # One thread takes domains off the shared queue so the event loop never blocks on it.
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        async with metrics_reporting(), HttpSession() as session:
+            async def run():
+                while (domain := await loop.run_in_executor(reader, tasks.get)) is not None:
+                    results.put(await discover_domain(domain, use_sitemap, timeout, session))
+
+            await asyncio.gather(*(run() for _ in range(concurrent_domains)))
+
+
+def _worker(config: AppConfig, tasks, results, concurrent_domains: int, use_sitemap: bool,
+            timeout: Optional[float], log_level: int) -> None:
+    logging.disable(log_level - 1)
+    # The parent's validated config, so workers neither re-read nor re-validate the YAML.
+    set_app_config(config)
+    asyncio.run(_drain(tasks, results, concurrent_domains, use_sitemap, timeout))
+
+
+def run_batch(domains: Iterable[str], on_result: Callable[[DomainResult], None], workers: int = 0,
+              max_concurrent_domains: int = 64, use_sitemap: bool = True, domain_timeout: Optional[float] = None,
+              log_level: int = logging.WARNING) -> BatchStats:
+    """Discover URLs for many domains using all cores.
+
+    Domains are handed out from a shared queue to ``workers`` processes (one per core by
+    default), so a slow domain never holds back a fixed shard. At most ``max_concurrent_domains``
+    domains run at once across all processes; request concurrency within a domain follows the
+    sitemap and crawler settings. Each worker keeps one :class:`HttpSession` for all of its
+    domains. ``on_result`` is called in this process as each domain finishes.
+    """
+    logger = setup_logger(__name__)
+    domains = list(dict.fromkeys(d.strip() for d in domains if d.strip()))
+    stats = BatchStats()
+    if not domains:
+        return stats
+
+    workers = min(workers or os.cpu_count() or 1, len(domains))
+    per_worker = max(1, math.ceil(min(max_concurrent_domains, len(domains)) / workers))
+    ctx = get_context("spawn")
+    tasks, results = ctx.Queue(), ctx.Queue()
+    for domain in domains:
+        tasks.put(domain)
+    for _ in range(workers * per_worker):
+        tasks.put(None)
+
+    logger.info(f"Batch of {len(domains)} domains on {workers} workers, {per_worker} concurrent domains each")
+    start = time.perf_counter()
+    procs = [ctx.Process(target=_worker,
+                         args=(get_app_config(), tasks, results, per_worker, use_sitemap, domain_timeout, log_level),
+                         daemon=True)
+             for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+
+    try:
+        while stats.domains < len(domains):
+            try:
+                result = results.get(timeout=1.0)
+            except queue.Empty:
+                if not any(proc.is_alive() for proc in procs):
+                    break
+                continue
+            stats.domains += 1
+            stats.urls += len(result.urls)
+            if result.error is not None:
+                stats.failed += 1
+            on_result(result)
+    finally:
+        for proc in procs:
+            if stats.domains < len(domains):
+                proc.terminate()
+            proc.join()
+
+    stats.missing = len(domains) - stats.domains
+    stats.seconds = round(time.perf_counter() - start, 3)
+    if stats.missing:
+        logger.warning(f"{stats.missing} domains got no result; a worker process exited early")
+    logger.info(f"Batch done: {stats.domains} domains ({stats.failed} failed), {stats.urls} URLs "
+                f"in {stats.seconds}s, {stats.domains_per_hour:.0f} domains/hour")
+    return stats
@@ -1,143 +1,271 @@
 import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Callable, Generic, TypeVar, Set, List
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Deque, Generic, Iterable, List, Optional, Set, \
+    Tuple, TypeVar, Union
+
+from app.url_discovery.core.checkpoint import CheckpointStore
+from app.url_discovery.core.metrics import get_metrics
 
 T = TypeVar('T')
 R = TypeVar('R')
 
+_DONE = object()
 
-class AsyncWorkerPool(Generic[T, R]):
-    def __init__(self, concurrency: int, processor: Callable[[T], R]):
-        self.concurrency = concurrency
-        self.processor = processor
-        self.semaphore = asyncio.Semaphore(concurrency)
-        self.processed_items: Set[T] = set()
-        self.results: Set[R] = set()
-
-    async def process_items(self, initial_items: list[T]) -> Set[R]:
-        if not initial_items:
-            return set()
-
-        queue = asyncio.Queue()
-        stop_event = asyncio.Event()
 
-        for item in initial_items:
-            await queue.put(item)
+@dataclass(frozen=True)
+class ItemResult(Generic[T, R]):
+    """Results and follow-up items produced by a single ``process_item`` call."""
+    results: Iterable[R] = ()
+    next_items: Iterable[T] = ()
 
-        async def worker():
-            while not stop_event.is_set():
-                try:
-                    item = await asyncio.wait_for(queue.get(), timeout=0.5)
-                except asyncio.TimeoutError:
-                    continue
 
-                if item in self.processed_items:
-                    queue.task_done()
-                    continue
+@dataclass(frozen=True)
+class ItemOutcome(Generic[T, R]):
+    """What one item produced, or why it failed."""
+    item: T
+    value: Optional[R] = None
+    error: Optional[str] = None
+    timed_out: bool = False
+    seconds: float = 0.0
 
-                self.processed_items.add(item)
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
-                async with self.semaphore:
-                    try:
-                        result = await self.processor(item)
-                        if result:
-                            self.results.add(result)
-                    except Exception:
-                        pass
 
-                queue.task_done()
-
-        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+class AsyncWorkerPool(Generic[T, R]):
+    """Runs ``processor`` over items on ``concurrency`` workers and streams an outcome per item.
+
+    Items are taken from the source only when the bounded input queue has room, and outcomes wait
+    in a bounded output queue until the consumer takes them, so a slow consumer slows the source
+    instead of growing memory. Workers exit as soon as the source is exhausted and drained. Each
+    item gets at most ``timeout`` seconds and is cancelled after that; errors and timeouts are
+    reported as failed outcomes rather than raised.
+    """
+
+    def __init__(self, concurrency: int, processor: Callable[[T], Awaitable[R]], timeout: Optional[float] = None,
+                 queue_size: int = 0, name: str = "pool"):
+        self.concurrency = max(1, concurrency)
+        self.processor = processor
+        self.timeout = timeout
+        self.queue_size = queue_size or 2 * self.concurrency
+        # Labels this pool's metrics.
+        self.name = name
+        self.metrics = get_metrics()
+        self._item_seconds = self.metrics.histogram("pool_item_seconds", pool=name)
+        self._queue_wait = self.metrics.histogram("pool_queue_wait_seconds", pool=name)
+        self._outcomes = {kind: self.metrics.counter("pool_items_total", pool=name, outcome=kind)
+                          for kind in ("ok", "error", "timeout")}
+        self.in_flight = 0
+
+    async def _run(self, item: T) -> ItemOutcome[T, R]:
+        start = time.perf_counter()
+        self.in_flight += 1
+        try:
+            value = await asyncio.wait_for(self.processor(item), self.timeout)
+            outcome = ItemOutcome(item, value, seconds=time.perf_counter() - start)
+        except asyncio.TimeoutError:
+            outcome = ItemOutcome(item, error=f"timed out after {self.timeout}s", timed_out=True,
+                                  seconds=time.perf_counter() - start)
+        except Exception as e:
+            outcome = ItemOutcome(item, error=f"{type(e).__name__}: {e}", seconds=time.perf_counter() - start)
+        finally:
+            self.in_flight -= 1
+        self._item_seconds.observe(outcome.seconds)
+        self._outcomes["ok" if outcome.ok else "timeout" if outcome.timed_out else "error"].inc()
+        return outcome
 
-        await queue.join()
+    async def stream(self, items: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[ItemOutcome[T, R]]:
+        inbox: asyncio.Queue = asyncio.Queue(self.queue_size)
+        outbox: asyncio.Queue = asyncio.Queue(self.queue_size)
+        source_error: List[BaseException] = []
 
-        stop_event.set()
-        await asyncio.gather(*workers, return_exceptions=True)
+        async def feed():
+            try:
+                if isinstance(items, AsyncIterable):
+                    async for item in items:
+                        await inbox.put((item, time.perf_counter()))
+                else:
+                    for item in items:
+                        await inbox.put((item, time.perf_counter()))
+            except Exception as e:
+                source_error.append(e)
+            for _ in range(self.concurrency):
+                await inbox.put(_DONE)
+
+        async def work():
+            while (entry := await inbox.get()) is not _DONE:
+                item, queued = entry
+                self._queue_wait.observe(time.perf_counter() - queued)
+                await outbox.put(await self._run(item))
+            await outbox.put(_DONE)
+
+        gauges = [self.metrics.track("pool_queue_size", inbox.qsize, pool=self.name),
+                  self.metrics.track("in_flight", lambda: self.in_flight, phase=self.name)]
+        tasks = [asyncio.create_task(feed())] + [asyncio.create_task(work()) for _ in range(self.concurrency)]
+        running = self.concurrency
+        try:
+            while running:
+                outcome = await outbox.get()
+                if outcome is _DONE:
+                    running -= 1
+                else:
+                    yield outcome
+            if source_error:
+                raise source_error[0]
+        finally:
+            for handle in gauges:
+                self.metrics.untrack(handle)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-        return self.results
+    async def process_items(self, initial_items: Iterable[T]) -> Set[R]:
+        results: Set[R] = set()
+        async with aclosing(self.stream(dict.fromkeys(initial_items))) as outcomes:
+            async for outcome in outcomes:
+                if outcome.ok and outcome.value:
+                    results.add(outcome.value)
+        return results
 
 
 class QueueProcessor(ABC, Generic[T, R]):
-    def __init__(self, concurrency: int, worker_timeout: float = 30.0):
+    # Labels the worker pool's metrics.
+    metrics_name = "queue"
+
+    def __init__(self, concurrency: int, worker_timeout: float = 30.0,
+                 checkpoint: Optional[CheckpointStore] = None, on_result: Optional[Callable[[R], None]] = None):
         self.concurrency = concurrency
         self.worker_timeout = worker_timeout
+        self.checkpoint = checkpoint
+        # Called once per distinct result as soon as it is produced.
+        self.on_result = on_result
+        # Items whose processing raised or timed out in the last run.
+        self.failures: List[ItemOutcome[T, ItemResult[T, R]]] = []
 
     @abstractmethod
-    async def process_item(self, item: T) -> R:
+    async def process_item(self, item: T) -> Union[R, ItemResult[T, R]]:
         pass
 
-    @abstractmethod
     async def get_next_items(self, item: T) -> List[T]:
-        pass
+        return []
+
+    async def _run_item(self, item: T) -> ItemResult[T, R]:
+        result = await self.process_item(item)
+        if isinstance(result, ItemResult):
+            return result
+        if not result:
+            results = []
+        elif isinstance(result, (set, list, tuple)):
+            results = list(result)
+        else:
+            results = [result]
+        return ItemResult(results, await self.get_next_items(item))
+
+    def _restore_checkpoint(self) -> Optional[Tuple[bool, Set[T], List[T], Set[R]]]:
+        snapshot, records = self.checkpoint.load()
+        if snapshot is None and not records:
+            return None
+
+        snapshot = snapshot or {}
+        done: Set[T] = set(snapshot.get("done", []))
+        queued: List[T] = list(snapshot.get("queued", []))
+        results: Set[R] = set(snapshot.get("results", []))
+        for record in records:
+            if record[0] == "queued":
+                queued.append(record[1])
+            elif record[0] == "done":
+                done.add(record[1])
+                results.update(record[2])
+        return bool(snapshot.get("complete")), done, [i for i in dict.fromkeys(queued) if i not in done], results
 
     async def process_with_queue(self, initial_items: List[T]) -> Set[R]:
         if not initial_items:
             return set()
 
-        queue = asyncio.Queue()
         processed_items: Set[T] = set()
         results: Set[R] = set()
-        semaphore = asyncio.Semaphore(self.concurrency)
-        stop_event = asyncio.Event()
-        active_workers = 0
-
-        for item in initial_items:
-            await queue.put(item)
-
-        async def worker():
-            nonlocal active_workers
-            active_workers += 1
-
+        self.failures = []
+
+        restored = self._restore_checkpoint() if self.checkpoint is not None else None
+        if restored is not None:
+            complete, processed_items, initial_items, results = restored
+            if self.on_result is not None:
+                for result in results:
+                    self.on_result(result)
+            if complete:
+                return results
+        else:
+            initial_items = list(dict.fromkeys(initial_items))
+
+        todo: Deque[T] = deque(initial_items)
+        # Items that have been queued but not finished, kept for de-duplication and checkpoint snapshots.
+        pending: dict = dict.fromkeys(initial_items)
+        in_flight = 0
+        progress = asyncio.Event()
+        metrics = get_metrics()
+
+        def checkpoint_state(complete: bool = False) -> dict:
+            return {
+                "done": [i for i in processed_items if i not in pending],
+                "queued": list(pending),
+                "results": list(results),
+                "complete": complete,
+            }
+
+        if self.checkpoint is not None:
+            self.checkpoint.write_snapshot(checkpoint_state())
+
+        async def frontier():
+            # Ends exactly when nothing is queued and nothing is being processed.
+            nonlocal in_flight
+            gauge = metrics.track("frontier_size", lambda: len(todo), phase=self.metrics_name)
             try:
-                while not stop_event.is_set():
-                    try:
-                        item = await asyncio.wait_for(queue.get(), timeout=0.5)
-                    except asyncio.TimeoutError:
-                        continue
-
-                    if item in processed_items:
-                        queue.task_done()
-                        continue
-
-                    processed_items.add(item)
-
-                    async with semaphore:
-                        try:
-                            result = await asyncio.wait_for(
-                                self.process_item(item),
-                                timeout=self.worker_timeout
-                            )
-                            if result:
-
-                                if isinstance(result, (set, list, tuple)):
-                                    results.update(result)
-                                else:
-                                    results.add(result)
-
-                            next_items = await asyncio.wait_for(
-                                self.get_next_items(item),
-                                timeout=self.worker_timeout
-                            )
-                            for next_item in next_items:
-                                if next_item not in processed_items:
-                                    await queue.put(next_item)
-
-                        except asyncio.TimeoutError:
-                            pass
-                        except Exception:
-                            pass
-
-                    queue.task_done()
+                while True:
+                    while todo:
+                        item = todo.popleft()
+                        processed_items.add(item)
+                        in_flight += 1
+                        yield item
+                    if not in_flight:
+                        return
+                    progress.clear()
+                    await progress.wait()
             finally:
-                active_workers -= 1
-
-        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
-
-        try:
-            await queue.join()
-        finally:
-            stop_event.set()
-            if workers:
-                await asyncio.gather(*workers, return_exceptions=True)
-
+                metrics.untrack(gauge)
+
+        pool = AsyncWorkerPool(self.concurrency, self._run_item, self.worker_timeout, name=self.metrics_name)
+        async with aclosing(pool.stream(frontier())) as outcomes:
+            async for outcome in outcomes:
+                item_results: List[R] = []
+                if outcome.ok:
+                    item_results = list(outcome.value.results)
+                    for result in item_results:
+                        if result not in results:
+                            results.add(result)
+                            if self.on_result is not None:
+                                self.on_result(result)
+                    for next_item in outcome.value.next_items:
+                        if next_item not in processed_items and next_item not in pending:
+                            pending[next_item] = None
+                            if self.checkpoint is not None:
+                                self.checkpoint.append("queued", next_item)
+                            todo.append(next_item)
+                else:
+                    self.failures.append(outcome)
+
+                pending.pop(outcome.item, None)
+                if self.checkpoint is not None:
+                    self.checkpoint.append("done", outcome.item, item_results)
+                    if self.checkpoint.snapshot_due():
+                        self.checkpoint.write_snapshot(checkpoint_state())
+                in_flight -= 1
+                progress.set()
+
+        if self.checkpoint is not None:
+            self.checkpoint.write_snapshot(checkpoint_state(complete=True))
         return results
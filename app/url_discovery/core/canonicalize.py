@@ -0,0 +1,122 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.config.loaders.url_discovery_config_loader import get_parsing_config
+from app.config.models.app_config_model import CanonicalConfig
+from app.logging.logger import setup_logger
+from app.url_discovery.core.normalize import canonical_netloc, normalize_link
+from app.url_discovery.core.patterns import ParsingPatterns
+
+# Distinct paths a host must show the same redirect behaviour on before it becomes a rule.
+LEARN_AFTER = 2
+
+
+@dataclass
+class HostRules:
+    ignore_params: Set[str] = field(default_factory=set)
+    lower_paths: bool = False
+    # "add" or "strip" when the host redirects to one form, otherwise the global policy applies.
+    trailing_slash: Optional[str] = None
+
+
+class Canonicalizer:
+    """Per-host rules on top of :func:`normalize_link`, which applies the global
+    ``strip_tracking_params``, ``sort_query`` and ``trailing_slash`` settings when they are on.
+
+    Rules come from ``parsing.canonical`` (``ignore_params``, ``case_insensitive_hosts``) and,
+    with ``learn_from_redirects``, from the redirects a host sends: a parameter it drops, a path
+    it lowercases or a trailing slash it adds or removes, once seen on ``LEARN_AFTER`` paths.
+    URLs of hosts without rules are returned unchanged.
+    """
+
+    def __init__(self, patterns: ParsingPatterns, cfg: Optional[CanonicalConfig] = None):
+        cfg = cfg or get_parsing_config().canonical
+        self.patterns = patterns
+        self.learn = cfg.learn_from_redirects
+        self.hosts: Dict[str, HostRules] = {}
+        self._evidence: Dict[Tuple[str, str], Set[str]] = {}
+        self.logger = setup_logger(__name__)
+        for host, params in cfg.ignore_params.items():
+            self._rules(host).ignore_params.update(p.lower() for p in params)
+        for host in cfg.case_insensitive_hosts:
+            self._rules(host).lower_paths = True
+
+    def _rules(self, host: str) -> HostRules:
+        _, host = canonical_netloc("https", host, self.patterns.strip_www, self.patterns.prefer_https)
+        return self.hosts.setdefault(host, HostRules())
+
+    def canonical(self, url: str) -> Optional[str]:
+        """Full canonical form of an absolute URL, or None when it is not a crawlable http(s) URL."""
+        url = normalize_link("", url, self.patterns)
+        return self.apply(url) if url is not None else None
+
+    def apply(self, url: str) -> str:
+        """Applies the host rules to a URL already normalized by :func:`normalize_link`."""
+        if not self.hosts:
+            return url
+        p = urlsplit(url)
+        rules = self.hosts.get(p.netloc)
+        if rules is None:
+            return url
+
+        path = p.path or "/"
+        if rules.lower_paths:
+            path = path.lower()
+        if rules.trailing_slash == "add":
+            if not path.endswith("/") and "." not in path.rsplit("/", 1)[-1]:
+                path += "/"
+        elif rules.trailing_slash == "strip" and path != "/":
+            path = path.rstrip("/") or "/"
+        query = p.query
+        if query and rules.ignore_params:
+            query = urlencode([(k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+                               if k.lower() not in rules.ignore_params])
+        return urlunsplit((p.scheme, p.netloc, path, query, ""))
+
+    def learn_redirect(self, requested: str, final: str) -> bool:
+        """Records what a redirect from ``requested`` (canonical) to ``final`` (as served) says about
+        the host. Returns True when that added a rule, so URLs of the host may have a new form."""
+        if not self.learn or requested == final:
+            return False
+        a, b = urlsplit(requested), urlsplit(final)
+        _, final_host = canonical_netloc(b.scheme, b.netloc, self.patterns.strip_www, self.patterns.prefer_https)
+        if a.netloc != final_host:
+            return False
+
+        host = a.netloc
+        old_path, new_path = a.path or "/", b.path or "/"
+        learned = False
+        if old_path != new_path:
+            old_base, new_base = old_path.rstrip("/"), new_path.rstrip("/")
+            if new_base != old_base and new_base != old_base.lower():
+                # A different page; the query tells nothing about this one.
+                return False
+            if new_base != old_base:
+                learned = self._observe(host, "lower_paths", old_path)
+            if new_path.endswith("/") and not old_path.endswith("/"):
+                learned = self._observe(host, "slash:add", old_path) or learned
+            elif old_path.endswith("/") and not new_path.endswith("/"):
+                learned = self._observe(host, "slash:strip", old_path) or learned
+        kept = {k.lower() for k, _ in parse_qsl(b.query, keep_blank_values=True)}
+        for param in {k.lower() for k, _ in parse_qsl(a.query, keep_blank_values=True)} - kept:
+            learned = self._observe(host, "param:" + param, old_path) or learned
+        return learned
+
+    def _observe(self, host: str, rule: str, path: str) -> bool:
+        paths = self._evidence.setdefault((host, rule), set())
+        if len(paths) >= LEARN_AFTER:
+            return False
+        paths.add(path)
+        if len(paths) < LEARN_AFTER:
+            return False
+
+        rules = self.hosts.setdefault(host, HostRules())
+        if rule == "lower_paths":
+            rules.lower_paths = True
+        elif rule.startswith("slash:"):
+            rules.trailing_slash = rule[len("slash:"):]
+        else:
+            rules.ignore_params.add(rule[len("param:"):])
+        self.logger.info(f"Canonical rule learned for {host}: {rule}")
+        return True
@@ -0,0 +1,119 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.logging.logger import setup_logger
+
+
+class CheckpointStore:
+    """Crash-safe progress log for one discovery phase.
+
+    State changes are appended as JSON lines to ``log.jsonl`` and flushed every ``flush_interval``
+    seconds. Every ``snapshot_interval`` seconds the owner writes a full ``snapshot.json`` (atomically
+    replaced), after which the log starts over. Restoring reads the snapshot and replays the log.
+    The owner may keep state too large to snapshot in a file of its own at :attr:`frontier_path`,
+    which :meth:`reset` removes with the rest.
+    """
+
+    SNAPSHOT = "snapshot.json"
+    LOG = "log.jsonl"
+    FRONTIER = "frontier.sqlite"
+
+    def __init__(self, directory: str | Path, flush_interval: float = 1.0, snapshot_interval: float = 60.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self.logger = setup_logger(__name__)
+
+        self._buffer: List[str] = []
+        self._log = None
+        self._last_flush = time.monotonic()
+        self._last_snapshot = time.monotonic()
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.directory / self.SNAPSHOT
+
+    @property
+    def log_path(self) -> Path:
+        return self.directory / self.LOG
+
+    @property
+    def frontier_path(self) -> Path:
+        return self.directory / self.FRONTIER
+
+    @property
+    def exists(self) -> bool:
+        return self.snapshot_path.exists() or (self.log_path.exists() and self.log_path.stat().st_size > 0)
+
+    def load(self) -> Tuple[Optional[Dict[str, Any]], List[list]]:
+        snapshot = None
+        if self.snapshot_path.exists():
+            snapshot = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+
+        records: List[list] = []
+        if self.log_path.exists():
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A torn last line from a crash mid-write; everything before it is intact.
+                        break
+        if snapshot is not None or records:
+            self.logger.info(f"Loaded checkpoint from {self.directory}: "
+                             f"snapshot={'yes' if snapshot else 'no'}, log records={len(records)}")
+        return snapshot, records
+
+    def append(self, *record: Any) -> None:
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._log is None:
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        self._log.write("\n".join(self._buffer) + "\n")
+        self._log.flush()
+        self._buffer.clear()
+
+    def snapshot_due(self) -> bool:
+        return time.monotonic() - self._last_snapshot >= self.snapshot_interval
+
+    def write_snapshot(self, state: Dict[str, Any]) -> None:
+        # Records buffered so far are covered by the snapshot, so they are dropped rather than written.
+        self._buffer.clear()
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+
+        if self._log is not None:
+            self._log.close()
+        self._log = open(self.log_path, "w", encoding="utf-8")
+        self._last_snapshot = time.monotonic()
+        self._last_flush = time.monotonic()
+
+    def reset(self) -> None:
+        self._buffer.clear()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        frontier = [self.frontier_path.with_name(self.FRONTIER + suffix) for suffix in ("", "-wal", "-shm")]
+        for path in (self.snapshot_path, self.log_path, *frontier):
+            if path.exists():
+                path.unlink()
+
+    def close(self) -> None:
+        self.flush()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
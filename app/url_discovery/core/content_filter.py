@@ -0,0 +1,54 @@
+import re
+from typing import Dict, Set
+from urllib.parse import parse_qsl, urlsplit
+
+from app.logging.logger import setup_logger
+
+_NUMBER = re.compile(r"\d+")
+
+
+class NonHtmlPatterns:
+    """URL patterns a host has answered only with non-HTML content, so they are no longer fetched.
+
+    A pattern is the host and directory plus the file extension when the last path segment has
+    one (``/files/*.pdf``), otherwise the path with numbers replaced and the query keys
+    (``/download/N?format``). It is learned once ``learn_after`` distinct URLs of it returned
+    non-HTML; an HTML response from any URL of the pattern stops it from ever being learned.
+    """
+
+    def __init__(self, learn_after: int = 3):
+        self.learn_after = learn_after
+        self.patterns: Set[str] = set()
+        self._evidence: Dict[str, Set[str]] = {}
+        self._mixed: Set[str] = set()
+        self.logger = setup_logger(__name__)
+
+    @staticmethod
+    def pattern(url: str) -> str:
+        p = urlsplit(url)
+        directory, _, last = p.path.rpartition("/")
+        if "." in last:
+            return f"{p.netloc}{directory}/*.{last.rsplit('.', 1)[1].lower()}"
+        keys = sorted({k for k, _ in parse_qsl(p.query, keep_blank_values=True)}) if p.query else ()
+        return f"{p.netloc}{_NUMBER.sub('N', p.path)}?{'&'.join(keys)}"
+
+    def skip(self, url: str) -> bool:
+        return bool(self.patterns) and self.pattern(url) in self.patterns
+
+    def record(self, url: str, is_html: bool) -> None:
+        """Counts the content type a fetched URL was served with towards its pattern."""
+        if self.learn_after <= 0:
+            return
+        pattern = self.pattern(url)
+        if pattern in self._mixed or pattern in self.patterns:
+            return
+        if is_html:
+            self._mixed.add(pattern)
+            self._evidence.pop(pattern, None)
+            return
+        urls = self._evidence.setdefault(pattern, set())
+        urls.add(url)
+        if len(urls) >= self.learn_after:
+            del self._evidence[pattern]
+            self.patterns.add(pattern)
+            self.logger.info(f"Not fetching {pattern} any more: {len(urls)} URLs of it were not HTML")
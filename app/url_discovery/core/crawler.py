@@ -1,24 +1,45 @@
 import asyncio
-from typing import Optional, Set, Tuple, List
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Set, Tuple, List
 from urllib.parse import urlparse, parse_qsl
 
 import httpx
 
 from app.config.loaders.url_discovery_config_loader import get_crawler_config, get_sitemap_config
 from app.logging.logger import setup_logger
-from app.url_discovery.core.html_parsing import extract_links, is_probably_html_url
-from app.url_discovery.core.normalize import normalize_link, canonical_netloc, same_domain
+from app.url_discovery.core.canonicalize import Canonicalizer
+from app.url_discovery.core.checkpoint import CheckpointStore
+from app.url_discovery.core.content_filter import NonHtmlPatterns
+from app.url_discovery.core.fingerprint import FingerprintIndex
+from app.url_discovery.core.frontier import CrawlFrontier
+from app.url_discovery.core.host_scheduler import HostScheduler, THROTTLE_STATUSES
+from app.url_discovery.core.metrics import get_metrics
+from app.url_discovery.core.normalize import LinkNormalizer, canonical_netloc, host_in_domain
+from app.url_discovery.core.parse_executor import make_parse_executor
 from app.url_discovery.core.patterns import load_patterns, ParsingPatterns
+from app.url_discovery.core.robots import RobotsCache
+from app.url_discovery.core.traps import TrapDetector
+from app.url_discovery.core.transport import HttpSession
+from app.url_discovery.core.url_classifier import UrlClassifier
+
+# Added to the priority of URLs in a quarantined family, so they are fetched after everything else.
+QUARANTINE_PENALTY = 1000
+# Added to the priority of links found on a near-duplicate page, so the original's links go first.
+ALIAS_LINK_PENALTY = 500
 
 
 class HttpAsyncCrawler:
-    def __init__(self, start_url: str):
+    def __init__(self, start_url: str, checkpoint: Optional[CheckpointStore] = None,
+                 robots: Optional[RobotsCache] = None, session: Optional[HttpSession] = None,
+                 on_found: Optional[Callable[[str], None]] = None):
         self.logger = setup_logger(__name__)
         self.cfg = get_crawler_config()
         self.site_cfg = get_sitemap_config()
         self.patterns: ParsingPatterns = load_patterns()
+        self.canonicalizer = Canonicalizer(self.patterns)
 
-        self.start_url = (normalize_link(start_url, "", self.patterns) or start_url).rstrip("/")
+        self.start_url = self.canonicalizer.canonical(start_url) or start_url.rstrip("/")
         root = urlparse(self.start_url)
         _, nl = canonical_netloc(root.scheme or "https", root.netloc, self.patterns.strip_www,
                                  self.patterns.prefer_https)
@@ -27,131 +48,502 @@ class HttpAsyncCrawler:
 
         self.seen: Set[str] = set()
         self.found: Set[str] = set()
-        self.q: asyncio.PriorityQueue[Tuple[int, str]] = asyncio.PriorityQueue()
-        self.sem = asyncio.Semaphore(max(1, self.cfg.concurrency))
+        # A checkpointed crawl keeps its frontier next to the checkpoint instead of in every snapshot.
+        self.frontier = CrawlFrontier(self.cfg.frontier_dir, hot_capacity=self.cfg.frontier_hot_capacity,
+                                      path=str(checkpoint.frontier_path) if checkpoint is not None else None)
+        self._wakeup = asyncio.Event()
+        self._claimed: Dict[str, int] = {}
+        # Form each claimed URL is fetched as when host rules rewrite it; both forms are in seen.
+        self._targets: Dict[str, str] = {}
+        # Pages fetched or about to be fetched; a slot is taken before the fetch so max_pages is exact.
+        self._reserved = 0
+        # Pages fetched so far, kept in the checkpoint; seen also holds skipped URLs and rewritten forms.
+        self.pages_fetched = 0
+        # Claimed URLs whose fetch has completed but that are not released yet.
+        self._fetched_claims: Set[str] = set()
+        self._retries: Dict[str, int] = {}
+        self._robots_tasks: Set[asyncio.Task] = set()
+        # Found URLs are reported through on_found once their host's robots.txt is known.
+        self.on_found = on_found
+        self._unconfirmed: Dict[str, List[str]] = {}
+        self.checkpoint = checkpoint
+        self.metrics = get_metrics()
+        self._queue_wait = self.metrics.histogram("crawler_queue_wait_seconds")
+        self._gauges: List[int] = []
+        self.scheduler = HostScheduler(
+            self.cfg.concurrency,
+            initial_limit=self.cfg.per_host_concurrency,
+            max_limit=self.cfg.max_per_host_concurrency,
+            latency_factor=self.cfg.latency_factor,
+        )
+        self.normalizer = LinkNormalizer(self.patterns)
+        self.classifier = UrlClassifier(self.patterns)
+        self.traps = TrapDetector(self.patterns, self.cfg.traps)
+        self.non_html = NonHtmlPatterns(self.cfg.non_html_learn_after)
+        # Body bytes downloaded and then thrown away: redirect responses and non-HTML responses.
+        self.bytes_wasted = 0
+        # Near-duplicate pages: alias URL -> URL of the page first fetched with that content.
+        self.aliases: Dict[str, str] = {}
+        self.fingerprints = FingerprintIndex(self.cfg.fingerprint.max_distance) \
+            if self.cfg.fingerprint.enabled else None
+        self.parse_executor = make_parse_executor(self.cfg, self.patterns, self.normalizer, self.classifier)
 
         headers = dict(self.site_cfg.headers or {})
-        self.client = httpx.AsyncClient(
-            headers=headers,
-            timeout=15.0,
-            http2=True,
-            limits=httpx.Limits(
-                max_connections=max(64, self.cfg.concurrency * 4),
-                max_keepalive_connections=max(32, self.cfg.concurrency * 2)
-            ),
-        )
+        self.robots = robots or RobotsCache(headers.get("User-Agent", ""), self.cfg.max_crawl_delay)
+        self._owns_session = session is None
+        self.session = session or HttpSession()
+        self.client = self.session.client("crawler", headers=headers, timeout=15.0)
 
     async def close(self):
+        for handle in self._gauges:
+            self.metrics.untrack(handle)
+        for task in self._robots_tasks:
+            task.cancel()
         await self.client.aclose()
+        if self._owns_session:
+            await self.session.aclose()
+        await self.parse_executor.close()
+        self.frontier.close()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
 
     def _prio_for(self, url: str) -> int:
-        p = urlparse(url)
-        path = p.path or "/"
+        p = self.normalizer.parse(url)
+        path = p.path
         score = 5 if path in ("", "/") else 10 + min(50, path.count("/") * 5)
         q = {k.lower() for k, _ in parse_qsl(p.query)}
         if q & self.patterns.pagination_hints:
             score += 20
+        if self.traps.is_quarantined(url):
+            score += QUARANTINE_PENALTY
         return score
 
     def _allowed(self, url: str) -> bool:
-        if not same_domain(url, self.root_netloc, self.cfg.include_subdomains):
+        return self._in_domain(url) and self._robots_allow(url)
+
+    def _in_domain(self, url: str) -> bool:
+        if not host_in_domain(self.normalizer.parse(url).host, self.root_netloc, self.cfg.include_subdomains):
             if self.cfg.verbose:
                 self.logger.info(f"URL rejected (different domain): {url} (root: {self.root_netloc})")
             return False
-        if not self.cfg.obey_robots:
-            return True
         return True
 
-    async def _fetch_html(self, url: str) -> Optional[str]:
+    def _robots_allow(self, url: str) -> bool:
+        if not self.cfg.obey_robots or self.robots.allowed(self.normalizer.parse(url).host, url):
+            return True
+        if self.cfg.verbose:
+            self.logger.info(f"URL rejected (robots.txt): {url}")
+        return False
+
+    async def _fetch_html(self, host: str, url: str) \
+            -> Tuple[Optional[int], Optional[Tuple[bytes, Optional[str], str]]]:
+        start = time.monotonic()
+        body = None
         try:
             if self.cfg.verbose:
                 self.logger.info(f"GET {url}")
-            r = await self.client.get(url, follow_redirects=True)
-            ctype = r.headers.get("content-type", "") or ""
-            if self.cfg.verbose:
-                self.logger.info(f"{r.status_code} {url} [{ctype}]")
-            if self.patterns.html_ct.search(ctype):
-                return r.text
-            return None
+            # Streamed, so the body is only read once the headers say it is HTML.
+            async with self.client.stream("GET", url, follow_redirects=True) as r:
+                latency = time.monotonic() - start
+                ctype = r.headers.get("content-type", "") or ""
+                is_html = bool(self.patterns.html_ct.search(ctype))
+                if is_html:
+                    body = await self._read_html(host, url, r)
+                else:
+                    self._skip_body(host, r)
         except Exception as e:
+            self._finish(host, time.monotonic() - start, error=True)
             if self.cfg.verbose:
                 self.logger.warning(f"HTTP error at {url}: {e}")
-            return None
+            return None, None
 
-    async def _prepare(self):
-        await self.q.put((self._prio_for(self.start_url), self.start_url))
-        if (not self.cfg.html_only) or is_probably_html_url(self.start_url, self.patterns):
-            self.found.add(self.start_url)
+        self._finish(host, latency, r.status_code, _retry_after(r.headers.get("retry-after")))
+        self.metrics.inc("crawler_pages_total", host=host)
+        wasted = sum(h.num_bytes_downloaded for h in r.history) + (0 if is_html else r.num_bytes_downloaded)
+        if wasted:
+            self.bytes_wasted += wasted
+            self.metrics.inc("crawler_wasted_bytes_total", wasted, host=host)
+        final_url = str(r.url)
+        if r.history:
+            self._redirected(url, final_url)
+        if r.is_success:
+            self.non_html.record(url, is_html)
+        if self.cfg.verbose:
+            self.logger.info(f"{r.status_code} {url} [{ctype}]")
+        if is_html:
+            return r.status_code, (body, r.charset_encoding, final_url)
+        return r.status_code, None
 
-    async def _worker(self):
-        while len(self.seen) < self.cfg.max_pages:
-            try:
+    async def _read_html(self, host: str, url: str, r: httpx.Response) -> bytes:
+        chunks: List[bytes] = []
+        size = 0
+        async for chunk in r.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.cfg.max_html_bytes:
+                # The rest is left unread; the links in the first max_html_bytes are still used.
+                self.metrics.inc("crawler_truncated_total", host=host)
+                if self.cfg.verbose:
+                    self.logger.info(f"HTML of {url} cut off at {self.cfg.max_html_bytes} bytes")
+                return b"".join(chunks)[:self.cfg.max_html_bytes]
+        return b"".join(chunks)
+
+    def _skip_body(self, host: str, r: httpx.Response) -> None:
+        # The stream is closed unread when the caller leaves the response context.
+        length = r.headers.get("content-length", "")
+        if length.isdigit():
+            self.metrics.inc("crawler_avoided_bytes_total", int(length), host=host)
+
+    def _redirected(self, url: str, final_url: str) -> None:
+        self.canonicalizer.learn_redirect(url, final_url)
+        target = self.canonicalizer.canonical(final_url)
+        if target is not None and target != url:
+            # Links to the redirect target are not fetched again.
+            self.seen.add(target)
+
+    def _finish(self, host: str, latency: Optional[float] = None, status: Optional[int] = None,
+                retry_after: Optional[float] = None, error: bool = False) -> None:
+        self.scheduler.finish(host, latency, status, retry_after, error)
+        self._wakeup.set()
+
+    def _watch_host(self, host: str, url: str) -> None:
+        if not self.cfg.obey_robots or host in self.scheduler.hosts:
+            return
+        if host in self.robots:
+            self.scheduler.release_hold(host, self.robots.crawl_delay(host))
+            return
+        # Requests to a new host wait until its robots.txt has been read.
+        self.scheduler.hold(host)
+        task = asyncio.create_task(self._load_robots(host, f"{self.normalizer.parse(url).scheme}://{host}"))
+        self._robots_tasks.add(task)
+        task.add_done_callback(self._robots_tasks.discard)
+
+    async def _load_robots(self, host: str, origin: str) -> None:
+        try:
+            rules = await self.robots.fetch(self.client, origin, host)
+            self.logger.info(f"robots.txt for {host}: {len(rules.rules)} rules, "
+                             f"crawl-delay={self.robots.crawl_delay(host)}")
+        finally:
+            self.scheduler.release_hold(host, self.robots.crawl_delay(host))
+            self._confirm(host)
+            self._wakeup.set()
+
+    def _push(self, url: str, penalty: int = 0) -> bool:
+        prio = self._prio_for(url) + penalty
+        if not self.frontier.push(prio, url):
+            return False
+        if self.checkpoint is not None:
+            self.checkpoint.append("push", prio, url)
+        self._wakeup.set()
+        return True
+
+    def _add_found(self, url: str) -> None:
+        if url in self.found:
+            return
+        self.found.add(url)
+        if self.checkpoint is not None:
+            self.checkpoint.append("found", url)
+        self._report(url)
+
+    def _report(self, url: str) -> None:
+        if self.on_found is None:
+            return
+        host = self.normalizer.parse(url).host
+        if self.cfg.obey_robots and host not in self.robots:
+            self._unconfirmed.setdefault(host, []).append(url)
+        else:
+            self.on_found(url)
+
+    def _confirm(self, host: str) -> None:
+        for url in self._unconfirmed.pop(host, ()):
+            if url in self.found and self._robots_allow(url):
+                self.on_found(url)
+
+    def _confirm_all(self) -> None:
+        # Hosts whose robots.txt was never read are allowed, as in _robots_allow.
+        for host in list(self._unconfirmed):
+            self._confirm(host)
+
+    def _release(self, url: str, done: bool = True) -> None:
+        self._claimed.pop(url, None)
+        target = self._targets.pop(url, None)
+        fetched = url in self._fetched_claims
+        self._fetched_claims.discard(url)
+        # Idle workers re-check whether the crawl is over.
+        self._wakeup.set()
+        if self.checkpoint is None or not done:
+            return
+        if fetched:
+            self.checkpoint.append("done", url, 1)
+        else:
+            self.checkpoint.append("done", url)
+        if target is not None:
+            self.checkpoint.append("done", target)
+        if self.checkpoint.snapshot_due():
+            self.checkpoint.write_snapshot(self._checkpoint_state())
+
+    def _checkpoint_state(self, complete: bool = False) -> dict:
+        # Pending URLs are not listed: every URL pushed is in the frontier's own file, and a resume
+        # queues again those not in seen. URLs a worker has claimed but not finished are left out
+        # of seen, so they are refetched.
+        self.frontier.flush()
+        in_flight = set(self._claimed).union(self._targets.values())
+        return {
+            "seen": [u for u in self.seen if u not in in_flight],
+            "found": list(self.found),
+            "aliases": self.aliases,
+            # Claimed pages are refetched after a resume, so they are not counted yet.
+            "fetched": self.pages_fetched - len(self._fetched_claims),
+            "complete": complete,
+        }
+
+    def _restore(self) -> bool:
+        snapshot, records = self.checkpoint.load()
+        if snapshot is None and not records:
+            return False
+
+        snapshot = snapshot or {}
+        self.seen = set(snapshot.get("seen", []))
+        self.found = set(snapshot.get("found", []))
+        self.aliases = dict(snapshot.get("aliases", {}))
+        # Checkpoints written before the count was kept fall back to the size of seen.
+        self.pages_fetched = snapshot.get("fetched", len(self.seen))
+        # Only checkpoints written before the frontier file was kept list their pending URLs.
+        pending: Dict[str, int] = {u: p for p, u in snapshot.get("pending", [])}
+        for record in records:
+            kind = record[0]
+            if kind == "push":
+                pending.setdefault(record[2], record[1])
+            elif kind == "done":
+                self.seen.add(record[1])
+                if len(record) > 2 and record[2]:
+                    self.pages_fetched += 1
+            elif kind == "found":
+                self.found.add(record[1])
+            elif kind == "alias":
+                self.aliases[record[1]] = record[2]
+
+        if snapshot.get("complete"):
+            self.frontier.clear()
+        else:
+            self.frontier.requeue(self.seen)
+            for url, prio in pending.items():
+                if url not in self.seen:
+                    self.frontier.push(prio, url)
+        self._wakeup.set()
+        self.checkpoint.write_snapshot(self._checkpoint_state(complete=bool(snapshot.get("complete"))))
+        self.logger.info(f"Resumed crawl: seen={len(self.seen)}, found={len(self.found)}, "
+                         f"pending={len(self.frontier)}")
+        return True
+
+    def _fill_host_queues(self) -> None:
+        # Move URLs from the frontier into per-host queues until one of them can start,
+        # so a slow or throttled host does not hold up the others.
+        while self.scheduler.parked < self.cfg.frontier_hot_capacity:
+            item = self.frontier.pop()
+            if item is None:
+                return
+            prio, url = item
+            host = self.normalizer.parse(url).host
+            self._watch_host(host, url)
+            self.scheduler.submit(host, prio, url)
+            if self.scheduler.has_capacity(host):
+                return
+
+    def _finished(self) -> bool:
+        # Claimed URLs may still add links or, if skipped or throttled, give their page slot back.
+        if self._claimed:
+            return False
+        return self._reserved >= self.cfg.max_pages or (not len(self.frontier) and not self.scheduler.parked)
+
+    async def _next_url(self) -> Optional[Tuple[str, str]]:
+        waited = time.perf_counter()
+        while True:
+            if self._reserved < self.cfg.max_pages:
+                ready = self.scheduler.next_ready()
+                if ready is None:
+                    self._fill_host_queues()
+                    ready = self.scheduler.next_ready()
+                if ready is not None:
+                    host, prio, url = ready
+                    self._claimed[url] = prio
+                    self._reserved += 1
+                    self._queue_wait.observe(time.perf_counter() - waited)
+                    return host, url
+
+            if self._finished():
+                # Wakes the other idle workers so they see it too.
+                self._wakeup.set()
+                return None
+
+            self._wakeup.clear()
+            delay = self.scheduler.wait_time() if self._reserved < self.cfg.max_pages else None
+            if delay is None:
+                await self._wakeup.wait()
+            else:
                 try:
-                    _, url = await asyncio.wait_for(self.q.get(), timeout=10.0)
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
                 except asyncio.TimeoutError:
-                    if self.q.empty():
-                        self.logger.info("Worker exiting: queue empty for 10 seconds")
-                        return
-                    continue
+                    pass
 
-                self.q.task_done()
+    async def _prepare(self):
+        if self.checkpoint is not None:
+            if self._restore():
+                for url in self.found:
+                    self._report(url)
+                return
+            # Left by a run that stopped before anything was checkpointed.
+            self.frontier.clear()
+        self._push(self.start_url)
+        if (not self.cfg.html_only) or self.classifier.is_html(self.start_url):
+            self._add_found(self.start_url)
 
-                if url in self.seen:
-                    continue
-                if not self._allowed(url):
-                    continue
-                if not is_probably_html_url(url, self.patterns):
+    async def _enqueue_links(self, url: str, links: Set[str], penalty: int = 0):
+        self.logger.info(f"Found {len(links)} links on {url}")
+
+        new_links_added = 0
+        rejected_domain = 0
+        rejected_robots = 0
+        rejected_html = 0
+        already_seen = 0
+        already_queued = 0
+        rejected_trap = 0
+
+        for link in links:
+            if not link or len(link) > self.patterns.max_url_length:
+                continue
+            link = self.canonicalizer.apply(link)
+
+            if not self._in_domain(link):
+                rejected_domain += 1
+                continue
+            if not self._robots_allow(link):
+                rejected_robots += 1
+                continue
+
+            is_html = self.classifier.is_html(link)
+            if is_html and link not in self.found and link not in self.seen:
+                reason = self.traps.check(link)
+                if reason is not None:
+                    rejected_trap += 1
+                    if self.cfg.verbose:
+                        self.logger.info(f"URL rejected (trap: {reason}): {link}")
                     continue
+            if (not self.cfg.html_only) or is_html:
+                self._add_found(link)
+
+            if link in self.seen:
+                already_seen += 1
+            elif not is_html:
+                rejected_html += 1
+            elif self._push(link, penalty):
+                new_links_added += 1
+            else:
+                already_queued += 1
+
+        self.traps.record(url, new_links_added)
+        self.logger.info(
+            f"Link processing: {new_links_added} added, {rejected_domain} rejected (domain), {rejected_robots} rejected (robots), {rejected_html} rejected (html), {rejected_trap} rejected (trap), {already_seen} already seen, {already_queued} already queued")
+
+    async def _crawl_one(self, host: str, url: str) -> bool:
+        # Host rules learned after the URL was queued may give it another form.
+        target = self.canonicalizer.apply(url)
+        if url in self.seen or target in self.seen or not self._allowed(url) or not self.classifier.is_html(url):
+            if not self._robots_allow(url):
+                # Queued before its host's robots.txt was known.
+                self.found.discard(url)
+            self._finish(host)
+            self._reserved -= 1
+            return True
+
+        if self.non_html.skip(target):
+            # Other URLs of this pattern on the host were all served as something other than HTML.
+            self.metrics.inc("crawler_non_html_skipped_total", host=host)
+            if self.cfg.verbose:
+                self.logger.info(f"URL skipped (non-HTML pattern): {url}")
+            self._finish(host)
+            self._reserved -= 1
+            return True
+
+        self.seen.add(url)
+        self.seen.add(target)
+        if target != url:
+            self._targets[url] = target
+        status, page = await self._fetch_html(host, target)
 
-                async with self.sem:
-                    self.seen.add(url)
-                    try:
-                        html = await self._fetch_html(url)
-                        if html:
-                            links = extract_links(url, html, include_assets=self.cfg.include_assets,
-                                                  html_only=self.cfg.html_only, patterns=self.patterns)
-                            self.logger.info(f"Found {len(links)} links on {url}")
-
-                            new_links_added = 0
-                            rejected_domain = 0
-                            rejected_html = 0
-                            already_seen = 0
-
-                            for link in links:
-                                if not link or len(link) > self.patterns.max_url_length:
-                                    continue
-
-                                if not self._allowed(link):
-                                    rejected_domain += 1
-                                    continue
-
-                                if (not self.cfg.html_only) or is_probably_html_url(link, self.patterns):
-                                    self.found.add(link)
-
-                                if (link not in self.seen) and is_probably_html_url(link, self.patterns):
-                                    await self.q.put((self._prio_for(link), link))
-                                    new_links_added += 1
-                                else:
-                                    if link in self.seen:
-                                        already_seen += 1
-                                    else:
-                                        rejected_html += 1
-
-                            self.logger.info(
-                                f"Link processing: {new_links_added} added, {rejected_domain} rejected (domain), {rejected_html} rejected (html), {already_seen} already seen")
-                    except Exception as e:
-                        self.logger.warning(f"Error processing {url}: {e}")
+        if status in THROTTLE_STATUSES and self._retries.get(url, 0) < self.cfg.max_retries:
+            # Back in the host queue; the scheduler holds the host until its backoff expires.
+            self._retries[url] = self._retries.get(url, 0) + 1
+            self.seen.discard(url)
+            self.seen.discard(target)
+            self._reserved -= 1
+            self.scheduler.submit(host, self._claimed.get(url, self._prio_for(url)), url)
+            return False
+        self.pages_fetched += 1
+        self._fetched_claims.add(url)
+
+        if page:
+            try:
+                html, encoding, final_url = page
+                start = time.perf_counter()
+                # Relative links resolve against the URL that was finally served.
+                links, fingerprint = await self.parse_executor.parse_page(final_url, html, encoding)
+                parsed = time.perf_counter()
+                if fingerprint is None or not self._is_alias(url, fingerprint):
+                    await self._enqueue_links(url, links)
+                elif self.cfg.fingerprint.alias_links == "lower":
+                    await self._enqueue_links(url, links, ALIAS_LINK_PENALTY)
+                self.metrics.observe("extract_links_seconds", parsed - start, host=host)
+                self.metrics.observe("enqueue_seconds", time.perf_counter() - parsed, host=host)
+            except Exception as e:
+                self.logger.warning(f"Error processing {url}: {e}")
+        return True
+
+    def _is_alias(self, url: str, fingerprint: int) -> bool:
+        original = self.fingerprints.add(url, fingerprint)
+        if original is None:
+            return False
+        self.aliases[url] = original
+        self.metrics.inc("crawler_aliases_total")
+        if self.checkpoint is not None:
+            self.checkpoint.append("alias", url, original)
+        if self.cfg.verbose:
+            self.logger.info(f"Near-duplicate page: {url} (alias of {original})")
+        return True
+
+    async def _worker(self):
+        while True:
+            try:
+                claimed = await self._next_url()
+                if claimed is None:
+                    return
+
+                host, url = claimed
+                done = True
+                try:
+                    done = await self._crawl_one(host, url)
+                finally:
+                    self._release(url, done)
             except Exception as e:
                 self.logger.warning(f"Worker error: {e}")
 
     async def run(self) -> List[str]:
         await self._prepare()
+        self._reserved = self.pages_fetched
+        if not len(self.frontier):
+            self.logger.info("Nothing left to crawl")
+            self._confirm_all()
+            return self._results()
         self.logger.info(f"Starting crawler with {self.cfg.concurrency} workers, max_pages: {self.cfg.max_pages}")
-        workers = [asyncio.create_task(self._worker()) for _ in range(self.cfg.concurrency)]
+        worker_count = self.cfg.concurrency + self.parse_executor.capacity
+        self._gauges = [
+            self.metrics.track("frontier_size", lambda: len(self.frontier)),
+            self.metrics.track("host_queue_size", lambda: self.scheduler.parked),
+            self.metrics.track("in_flight", lambda: len(self._claimed), phase="crawler"),
+        ]
+        workers = [asyncio.create_task(self._worker()) for _ in range(worker_count)]
 
         try:
-            await self.q.join()
-
             await asyncio.gather(*workers, return_exceptions=True)
 
         except Exception as e:
@@ -161,5 +553,26 @@ class HttpAsyncCrawler:
                 if not w.done():
                     w.cancel()
 
-        self.logger.info(f"Crawler finished. Seen: {len(self.seen)}, Found: {len(self.found)}")
-        return sorted(self.found)
+        self._confirm_all()
+        if self.checkpoint is not None:
+            self.checkpoint.write_snapshot(self._checkpoint_state(complete=True))
+        self.logger.info(f"Crawler finished. Seen: {len(self.seen)}, Found: {len(self.found)}, "
+                         f"Aliases: {len(self.aliases)}, Wasted bytes: {self.bytes_wasted}")
+        return self._results()
+
+    def _results(self) -> List[str]:
+        # Host rules learned during the crawl also apply to URLs found before them.
+        return sorted({self.canonicalizer.apply(url) for url in self.found})
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,94 @@
+import struct
+from typing import AbstractSet, Dict, List, Optional
+from zlib import crc32
+
+from lxml import etree
+
+# Removed before taking the text, so pages sharing a template do not look alike.
+_BOILERPLATE = ("script", "style", "noscript", "template", "nav", "header", "footer", "aside")
+# Maps ASCII whitespace and punctuation to spaces and ASCII letters to lower case; UTF-8 bytes of
+# other letters stay as they are, so they remain inside their words.
+_WORD_BYTES = bytes(v if v >= 0x80 or chr(v).isalnum() else 0x20 for v in range(256)).lower()
+_HIGH_SEED = 0x9E3779B9
+# _BIT_SET[k] maps a byte to 1 when its bit k is set, else 0.
+_BIT_SET = [bytes((v >> k) & 1 for v in range(256)) for k in range(8)]
+BITS = 64
+
+
+def simhash(features: AbstractSet[bytes]) -> int:
+    """64-bit SimHash of distinct byte-string features, each weighted once.
+
+    Bit ``b`` of the result is set when more than half of the feature hashes have it set. The
+    hashes are packed into bytes and each bit column is counted with ``translate``/``count``, so
+    the per-feature Python work is just the two CRCs.
+    """
+    low = [crc32(f) for f in features]
+    high = [crc32(f, _HIGH_SEED) for f in features]
+    n = len(low)
+    out = 0
+    for offset, hashes in ((0, low), (32, high)):
+        packed = struct.pack(f"<{n}I", *hashes)
+        for byte in range(4):
+            column = packed[byte::4]
+            for bit in range(8):
+                if 2 * column.translate(_BIT_SET[bit]).count(1) > n:
+                    out |= 1 << (offset + 8 * byte + bit)
+    return out
+
+
+def main_text(root) -> str:
+    """Visible text of a parsed page without scripts, navigation and other boilerplate. Modifies ``root``."""
+    etree.strip_elements(root, *_BOILERPLATE, with_tail=False)
+    body = root.find("body")
+    return etree.tostring(body if body is not None else root, method="text", encoding="unicode") or ""
+
+
+def text_fingerprint(text: str, min_words: int = 50) -> Optional[int]:
+    """SimHash over the distinct words of ``text``, or None when it has fewer than ``min_words`` words.
+
+    Word order is ignored, so listings that only differ in sort order match.
+    """
+    words = text.encode("utf-8", errors="ignore").translate(_WORD_BYTES).split()
+    if len(words) < min_words:
+        return None
+    return simhash(set(words))
+
+
+class FingerprintIndex:
+    """Fingerprints of fetched pages, banded for near-duplicate lookup.
+
+    The 64 bits are split into ``max_distance + 1`` bands; two fingerprints within
+    ``max_distance`` bits of each other agree on at least one whole band, so only pages sharing a
+    band value are compared.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        edges = [BITS * i // bands for i in range(bands + 1)]
+        self._bands = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:])]
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in self._bands]
+        self._fingerprints: List[int] = []
+        self._urls: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def find(self, fingerprint: int) -> Optional[str]:
+        for (shift, mask), table in zip(self._bands, self._tables):
+            for i in table.get((fingerprint >> shift) & mask, ()):
+                if (self._fingerprints[i] ^ fingerprint).bit_count() <= self.max_distance:
+                    return self._urls[i]
+        return None
+
+    def add(self, url: str, fingerprint: int) -> Optional[str]:
+        """URL of an indexed near-duplicate of ``fingerprint``; otherwise indexes it under ``url`` and returns None."""
+        original = self.find(fingerprint)
+        if original is not None:
+            return original
+        i = len(self._fingerprints)
+        self._fingerprints.append(fingerprint)
+        self._urls.append(url)
+        for (shift, mask), table in zip(self._bands, self._tables):
+            table.setdefault((fingerprint >> shift) & mask, []).append(i)
+        return None
@@ -0,0 +1,181 @@
+import heapq
+import os
+import sqlite3
+import tempfile
+from collections import OrderedDict
+from typing import Container, Iterator, List, Optional, Tuple
+
+_COMMIT_EVERY = 5000
+
+
+class CrawlFrontier:
+    """Priority frontier with a bounded in-memory hot tier and a SQLite spill tier.
+
+    Every URL ever pushed is recorded in the store, so duplicates are rejected at enqueue time
+    instead of piling up in the queue. Items are popped in ``(priority, insertion order)`` order
+    across both tiers; the hot tier is refilled from disk in batches.
+
+    The store is a new file in ``directory`` (the system temp directory by default) that belongs
+    to this frontier alone and is removed on :meth:`close`, so concurrent crawls never share
+    one. With ``path`` the store is that file instead, opened as it was left and kept on close,
+    so a checkpointed crawl can resume it with :meth:`requeue` rather than snapshotting the queue.
+    """
+
+    def __init__(self, directory: Optional[str] = None, hot_capacity: int = 100000,
+                 recent_capacity: int = 100000, refill_batch: int = 10000, path: Optional[str] = None):
+        self.hot_capacity = max(1, hot_capacity)
+        self.recent_capacity = recent_capacity
+        self.refill_batch = max(1, refill_batch)
+
+        self.persistent = path is not None
+        if path is None:
+            if directory is not None:
+                os.makedirs(directory, exist_ok=True)
+            fd, path = tempfile.mkstemp(prefix="smartcrawl-frontier-", suffix=".sqlite", dir=directory)
+            os.close(fd)
+        self.path = path
+        self._db = sqlite3.connect(path, isolation_level=None)
+        # A kept store must survive the process being killed mid-write; a scratch one need not.
+        journal = "WAL" if self.persistent else "OFF"
+        self._db.executescript(
+            f"""
+            PRAGMA journal_mode = {journal};
+            PRAGMA synchronous = OFF;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA cache_size = -16384;
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                prio INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                queued INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS frontier_queue ON frontier (prio, seq) WHERE queued = 1;
+            """
+        )
+
+        self._hot: List[Tuple[int, int, str]] = []
+        self._hot_urls: set[str] = set()
+        self._recent: OrderedDict[str, None] = OrderedDict()
+        self._seq = self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM frontier").fetchone()[0]
+        self._disk_count = self._db.execute("SELECT COUNT(*) FROM frontier WHERE queued = 1").fetchone()[0]
+        self._disk_head = self._find_head()
+        self._uncommitted = 0
+
+    def __len__(self) -> int:
+        return len(self._hot) + self._disk_count
+
+    @property
+    def spilled(self) -> int:
+        return self._disk_count
+
+    def push(self, prio: int, url: str) -> bool:
+        if url in self._hot_urls or url in self._recent:
+            return False
+
+        self._seq += 1
+        spill = len(self._hot) >= self.hot_capacity
+        self._begin()
+        cur = self._db.execute("INSERT OR IGNORE INTO frontier VALUES (?, ?, ?, ?)",
+                               (url, prio, self._seq, 1 if spill else 0))
+        self._remember(url)
+        self._uncommitted += 1
+        if self._uncommitted >= _COMMIT_EVERY:
+            self._commit()
+        if cur.rowcount == 0:
+            return False
+
+        if spill:
+            self._disk_count += 1
+            if self._disk_head is None or (prio, self._seq) < self._disk_head:
+                self._disk_head = (prio, self._seq)
+        else:
+            heapq.heappush(self._hot, (prio, self._seq, url))
+            self._hot_urls.add(url)
+        return True
+
+    def pop(self) -> Optional[Tuple[int, str]]:
+        if self._disk_count and (not self._hot or self._disk_head < self._hot[0][:2]):
+            self._refill()
+        if not self._hot:
+            return None
+        prio, _, url = heapq.heappop(self._hot)
+        self._hot_urls.discard(url)
+        return prio, url
+
+    def items(self) -> Iterator[Tuple[int, str]]:
+        for prio, _, url in sorted(self._hot):
+            yield prio, url
+        yield from self._db.execute("SELECT prio, url FROM frontier WHERE queued = 1 ORDER BY prio, seq")
+
+    def requeue(self, done: Container[str]) -> int:
+        """Queues again every URL of a reopened store that is not in ``done``. URLs that were in
+        memory when the previous crawl stopped are on disk only as dequeued; this brings them back."""
+        urls = [url for url, in self._db.execute("SELECT url FROM frontier WHERE queued = 0") if url not in done]
+        self._begin()
+        self._db.executemany("UPDATE frontier SET queued = 1 WHERE url = ?", ((url,) for url in urls))
+        self._commit()
+        self._disk_count += len(urls)
+        self._disk_head = self._find_head()
+        return len(urls)
+
+    def clear(self) -> None:
+        self._begin()
+        self._db.execute("DELETE FROM frontier")
+        self._commit()
+        self._hot.clear()
+        self._hot_urls.clear()
+        self._recent.clear()
+        self._disk_count = 0
+        self._disk_head = None
+
+    def flush(self) -> None:
+        """Commits the writes so far, so the store holds every URL pushed until now."""
+        self._commit()
+
+    def close(self) -> None:
+        self._commit()
+        self._db.close()
+        if self.persistent:
+            return
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _begin(self) -> None:
+        if not self._db.in_transaction:
+            self._db.execute("BEGIN")
+
+    def _commit(self) -> None:
+        # Writes are grouped into transactions; SQLite reads on the same connection see them anyway.
+        if self._db.in_transaction:
+            self._db.execute("COMMIT")
+        self._uncommitted = 0
+
+    def _remember(self, url: str) -> None:
+        if not self.recent_capacity:
+            return
+        self._recent[url] = None
+        if len(self._recent) > self.recent_capacity:
+            self._recent.popitem(last=False)
+
+    def _refill(self) -> None:
+        limit = max(1, min(self.refill_batch, self.hot_capacity - len(self._hot)))
+        rows = self._db.execute(
+            "SELECT url, prio, seq FROM frontier WHERE queued = 1 ORDER BY prio, seq LIMIT ?", (limit,)
+        ).fetchall()
+        self._begin()
+        self._db.executemany("UPDATE frontier SET queued = 0 WHERE url = ?", ((url,) for url, _, _ in rows))
+        self._commit()
+
+        for url, prio, seq in rows:
+            heapq.heappush(self._hot, (prio, seq, url))
+            self._hot_urls.add(url)
+        self._disk_count -= len(rows)
+        self._disk_head = self._find_head()
+
+    def _find_head(self) -> Optional[Tuple[int, int]]:
+        head = self._db.execute(
+            "SELECT prio, seq FROM frontier WHERE queued = 1 ORDER BY prio, seq LIMIT 1"
+        ).fetchone()
+        return tuple(head) if head else None
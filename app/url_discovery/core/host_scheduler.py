@@ -0,0 +1,148 @@
+import heapq
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+THROTTLE_STATUSES = (429, 503)
+
+
+@dataclass
+class HostState:
+    limit: float
+    in_flight: int = 0
+    queue: List[Tuple[int, int, str]] = field(default_factory=list)
+    next_allowed: float = 0.0
+    crawl_delay: float = 0.0
+    held: bool = False
+    base_latency: float = math.inf
+    avg_latency: float = 0.0
+    last_decrease: float = 0.0
+    throttled_streak: int = 0
+
+    @property
+    def capacity(self) -> int:
+        # A Crawl-delay means requests to the host are serialized and spaced out.
+        return 1 if self.crawl_delay else max(1, int(self.limit))
+
+
+class HostScheduler:
+    """Per-host queues with AIMD concurrency limits and round-robin service across hosts.
+
+    Each host's limit grows by roughly one slot per round trip while latency stays near the
+    fastest latency seen for that host, and is halved (at most once per round trip) on 429/503,
+    transport errors or latency above ``latency_factor`` times that baseline. Retry-After and
+    Crawl-delay push the host's next allowed start time forward. ``concurrency`` bounds the
+    total number of requests in flight across all hosts; it is also the per-host maximum unless
+    ``max_limit`` is given, and hosts start at the maximum unless ``initial_limit`` is given, so a
+    single-host crawl runs at full concurrency until the host pushes back.
+    """
+
+    def __init__(self, concurrency: int, initial_limit: Optional[float] = None,
+                 max_limit: Optional[float] = None, min_limit: float = 1.0, latency_factor: float = 3.0,
+                 decrease_factor: float = 0.5, max_backoff: float = 300.0, adaptive: bool = True):
+        self.concurrency = max(1, concurrency)
+        self.max_limit = max(min_limit, max_limit or self.concurrency)
+        self.initial_limit = initial_limit or self.max_limit
+        self.min_limit = min_limit
+        self.latency_factor = latency_factor
+        self.decrease_factor = decrease_factor
+        self.max_backoff = max_backoff
+        self.adaptive = adaptive
+
+        self.hosts: Dict[str, HostState] = {}
+        self.in_flight = 0
+        self.parked = 0
+        self._rotation: Deque[str] = deque()
+        self._seq = 0
+
+    def state(self, host: str) -> HostState:
+        st = self.hosts.get(host)
+        if st is None:
+            st = HostState(limit=min(self.max_limit, max(self.min_limit, self.initial_limit)))
+            self.hosts[host] = st
+        return st
+
+    def submit(self, host: str, prio: int, url: str) -> None:
+        st = self.state(host)
+        if not st.queue:
+            self._rotation.append(host)
+        self._seq += 1
+        heapq.heappush(st.queue, (prio, self._seq, url))
+        self.parked += 1
+
+    def has_capacity(self, host: str) -> bool:
+        st = self.state(host)
+        return not st.held and st.in_flight < st.capacity and st.next_allowed <= time.monotonic()
+
+    def next_ready(self) -> Optional[Tuple[str, int, str]]:
+        if self.in_flight >= self.concurrency:
+            return None
+        now = time.monotonic()
+        for _ in range(len(self._rotation)):
+            host = self._rotation[0]
+            self._rotation.rotate(-1)
+            st = self.hosts[host]
+            if st.held or st.in_flight >= st.capacity or st.next_allowed > now:
+                continue
+            prio, _, url = heapq.heappop(st.queue)
+            self.parked -= 1
+            if not st.queue:
+                self._rotation.pop()
+            self._start(st, now)
+            return host, prio, url
+        return None
+
+    def wait_time(self) -> Optional[float]:
+        # Seconds until a host that only waits on a delay becomes ready; None if no such host.
+        now = time.monotonic()
+        waits = [st.next_allowed - now for st in map(self.hosts.__getitem__, self._rotation)
+                 if not st.held and st.in_flight < st.capacity and st.next_allowed > now]
+        return max(0.0, min(waits)) if waits else None
+
+    def hold(self, host: str) -> None:
+        self.state(host).held = True
+
+    def release_hold(self, host: str, crawl_delay: float = 0.0) -> None:
+        st = self.state(host)
+        st.held = False
+        st.crawl_delay = crawl_delay
+
+    def finish(self, host: str, latency: Optional[float] = None, status: Optional[int] = None,
+               retry_after: Optional[float] = None, error: bool = False) -> None:
+        st = self.hosts[host]
+        st.in_flight -= 1
+        self.in_flight -= 1
+        if latency is None or not self.adaptive:
+            return
+
+        now = time.monotonic()
+        throttled = error or status in THROTTLE_STATUSES
+        if not throttled:
+            st.base_latency = min(st.base_latency, latency)
+            st.avg_latency = latency if not st.avg_latency else 0.8 * st.avg_latency + 0.2 * latency
+            st.throttled_streak = 0
+        else:
+            st.throttled_streak += 1
+            backoff = retry_after if retry_after is not None else min(self.max_backoff, 0.5 * 2 ** st.throttled_streak)
+            st.next_allowed = max(st.next_allowed, now + min(self.max_backoff, backoff))
+
+        slow = not throttled and latency > self.latency_factor * st.base_latency and latency > 0.05
+        if throttled or slow:
+            if now - st.last_decrease >= max(st.avg_latency, latency):
+                st.limit = max(self.min_limit, st.limit * self.decrease_factor)
+                st.last_decrease = now
+        else:
+            st.limit = min(self.max_limit, st.limit + 1.0 / st.limit)
+
+    def parked_items(self) -> Iterator[Tuple[int, str]]:
+        for st in self.hosts.values():
+            for prio, _, url in st.queue:
+                yield prio, url
+
+    def _start(self, st: HostState, now: float) -> None:
+        st.in_flight += 1
+        self.in_flight += 1
+        if st.crawl_delay:
+            st.next_allowed = max(st.next_allowed, now + st.crawl_delay)
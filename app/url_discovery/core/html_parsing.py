@@ -1,30 +1,166 @@
-from typing import Optional, Set
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
 
-from bs4 import BeautifulSoup
+from lxml import etree
 
-from app.url_discovery.core.normalize import normalize_link
+from app.url_discovery.core.fingerprint import main_text, text_fingerprint
+from app.url_discovery.core.metrics import get_metrics
+from app.url_discovery.core.normalize import LinkNormalizer, normalize_link
 from app.url_discovery.core.patterns import ParsingPatterns
+from app.url_discovery.core.url_classifier import HTML, UrlClassifier, classify_url
 
 
 def is_probably_html_url(u: Optional[str], patterns: ParsingPatterns) -> bool:
     if not u:
         return False
-    if patterns.non_html_api.search(u):
-        return False
-    lower = u.lower()
-    for ext in patterns.asset_extensions:
-        if lower.endswith("." + ext) or ("." + ext + "?") in lower:
-            return False
-    return True
+    return classify_url(u, patterns.asset_extensions, patterns.non_html_api) == HTML
+
+
+_ASSET_SRC_TAGS = frozenset({"img", "script", "iframe", "source", "video", "audio"})
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.I)
+_BOMS = (b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")
+
+
+@lru_cache(maxsize=16)
+def _html_parser(encoding: Optional[str]) -> etree.HTMLParser:
+    return etree.HTMLParser(encoding=encoding, remove_comments=True, remove_pis=True, no_network=True)
+
+
+def _sniff_encoding(html: bytes) -> Optional[str]:
+    if html.startswith(_BOMS):
+        return None
+    m = _META_CHARSET.search(html, 0, 4096)
+    return m.group(1).decode("ascii") if m else "utf-8"
+
+
+def _parse_html(html: str | bytes, encoding: Optional[str]):
+    if isinstance(html, str):
+        html, encoding = html.encode("utf-8", errors="surrogatepass"), "utf-8"
+    elif encoding is None:
+        encoding = _sniff_encoding(html)
+    try:
+        parser = _html_parser(encoding)
+    except LookupError:
+        parser = _html_parser("utf-8")
+    try:
+        return etree.fromstring(html, parser)
+    except (etree.XMLSyntaxError, ValueError):
+        return None
 
 
 def extract_links(
+        base_url: str,
+        html: str | bytes,
+        include_assets: bool,
+        html_only: bool,
+        patterns: ParsingPatterns,
+        encoding: Optional[str] = None,
+        normalizer: Optional[LinkNormalizer] = None,
+        classifier: Optional[UrlClassifier] = None,
+) -> Set[str]:
+    return parse_page(base_url, html, include_assets, html_only, patterns, encoding, normalizer, classifier)[0]
+
+
+def parse_page(
+        base_url: str,
+        html: str | bytes,
+        include_assets: bool,
+        html_only: bool,
+        patterns: ParsingPatterns,
+        encoding: Optional[str] = None,
+        normalizer: Optional[LinkNormalizer] = None,
+        classifier: Optional[UrlClassifier] = None,
+        fingerprint: bool = False,
+        min_words: int = 50,
+) -> Tuple[Set[str], Optional[int]]:
+    """Links of a page and, with ``fingerprint``, the SimHash of its main text from the same parse."""
+    links, page_fingerprint, timings = parse_page_timed(base_url, html, include_assets, html_only, patterns,
+                                                        encoding, normalizer, classifier, fingerprint, min_words)
+    record_parse_timings(timings)
+    return links, page_fingerprint
+
+
+def record_parse_timings(timings: Dict[str, float]) -> None:
+    metrics = get_metrics()
+    for name, seconds in timings.items():
+        metrics.histogram(name).observe(seconds)
+
+
+def parse_page_timed(
+        base_url: str,
+        html: str | bytes,
+        include_assets: bool,
+        html_only: bool,
+        patterns: ParsingPatterns,
+        encoding: Optional[str] = None,
+        normalizer: Optional[LinkNormalizer] = None,
+        classifier: Optional[UrlClassifier] = None,
+        fingerprint: bool = False,
+        min_words: int = 50,
+) -> Tuple[Set[str], Optional[int], Dict[str, float]]:
+    """``parse_page`` that returns the seconds spent in each stage instead of recording them, for
+    parse workers whose metrics would never reach the crawler's registry."""
+    start = time.perf_counter()
+    root = _parse_html(html, encoding)
+    if root is None:
+        return set(), None, {}
+
+    want_assets = include_assets and not html_only
+    raw: List[str] = []
+    walk = root.iter() if want_assets else root.iter("a", "link", "script")
+    for el in walk:
+        tag = el.tag
+        if not isinstance(tag, str):
+            continue
+        if tag == "a" or tag == "link":
+            href = el.get("href")
+            if href:
+                raw.append(href)
+        elif tag == "script" and el.text:
+            raw.extend(m.group("u") for m in patterns.url_in_text.finditer(el.text))
+
+        if want_assets:
+            if tag in _ASSET_SRC_TAGS:
+                src = el.get("src")
+                if src:
+                    raw.append(src)
+            srcset = el.get("srcset")
+            if srcset:
+                for part in srcset.split(","):
+                    token = part.split()
+                    if token:
+                        raw.append(token[0])
+
+    normalizer = normalizer or LinkNormalizer(patterns)
+    classifier = classifier or UrlClassifier(patterns)
+    parsed = time.perf_counter()
+    out: Set[str] = set()
+    for parts in normalizer.normalize_many(base_url, raw):
+        if html_only and not classifier.is_html(parts.url):
+            continue
+        out.add(parts.url)
+    normalized = time.perf_counter()
+    timings = {"html_parse_seconds": parsed - start, "normalize_seconds": normalized - parsed}
+
+    page_fingerprint = None
+    if fingerprint:
+        page_fingerprint = text_fingerprint(main_text(root), min_words)
+        timings["fingerprint_seconds"] = time.perf_counter() - normalized
+    return out, page_fingerprint, timings
+
+
+def extract_links_bs4(
         base_url: str,
         html: str,
         include_assets: bool,
         html_only: bool,
         patterns: ParsingPatterns,
 ) -> Set[str]:
+    """Reference BeautifulSoup implementation of ``extract_links``, kept for parity checks."""
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "lxml")
     out: Set[str] = set()
 
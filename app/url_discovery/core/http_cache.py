@@ -0,0 +1,278 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+import httpx
+
+from app.logging.logger import setup_logger
+
+# Headers that describe the stored body and are kept when a 304 refreshes the others.
+_ENTITY_HEADERS = {"content-encoding", "content-length", "content-type", "transfer-encoding"}
+_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding"}
+# Seconds a write waits for another process holding the index lock (batch workers share the cache).
+_BUSY_TIMEOUT = 30.0
+# Eviction stops at this fraction of max_bytes, so the next stores do not each evict again.
+_LOW_WATER = 0.9
+_EVICT_BATCH = 256
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    digest: str
+    status: int
+    headers: List[Tuple[str, str]]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    size: int
+
+
+class HttpCacheStore:
+    """Size-bounded on-disk response cache.
+
+    Bodies are stored once per SHA-256 digest under ``bodies/``; a SQLite index maps URLs to a
+    digest, the response headers and their validators. When the bodies exceed ``max_bytes`` the
+    least recently used URLs are dropped until they are under 90% of it, and a body file goes with
+    the last URL that uses it. ``total_bytes`` counts this process's writes on top of the index
+    total; since several processes may share the cache it is re-read from the index before
+    evicting and after every tenth of ``max_bytes`` written.
+    """
+
+    def __init__(self, path: str | Path, max_bytes: int = 1 << 30):
+        self.path = Path(path)
+        self.bodies = self.path / "bodies"
+        self.bodies.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.logger = setup_logger(__name__)
+        self._db = sqlite3.connect(self.path / "index.sqlite", timeout=_BUSY_TIMEOUT, isolation_level=None)
+        self._db.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_access ON entries (last_access);
+            CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+            """
+        )
+        self.total_bytes = 0
+        self._written = 0
+        self._sync_total()
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        row = self._db.execute(
+            "SELECT url, digest, status, headers, etag, last_modified, size FROM entries WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = CacheEntry(row[0], row[1], row[2], [tuple(h) for h in json.loads(row[3])], row[4], row[5], row[6])
+        if not self._body_path(entry.digest).exists():
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            return None
+        return entry
+
+    def read_body(self, entry: CacheEntry) -> bytes:
+        self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), entry.url))
+        return self._body_path(entry.digest).read_bytes()
+
+    def refresh(self, entry: CacheEntry, headers: List[Tuple[str, str]]) -> None:
+        self._db.execute("UPDATE entries SET headers = ?, last_access = ? WHERE url = ?",
+                         (json.dumps(headers), time.time(), entry.url))
+
+    def store(self, url: str, status: int, headers: List[Tuple[str, str]], body: bytes) -> None:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._body_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            # A unique name, since another process may be storing the same body right now.
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=digest, suffix=".tmp", delete=False) as tmp:
+                tmp.write(body)
+            os.replace(tmp.name, path)
+            self.total_bytes += len(body)
+            self._written += len(body)
+
+        lower = {k.lower(): v for k, v in headers}
+        old = self._db.execute("SELECT digest FROM entries WHERE url = ?", (url,)).fetchone()
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, digest, status, json.dumps(headers), lower.get("etag"), lower.get("last-modified"),
+             len(body), time.time()),
+        )
+        if old is not None and old[0] != digest:
+            self._drop_orphan(old[0])
+        self._evict()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _body_path(self, digest: str) -> Path:
+        return self.bodies / digest[:2] / digest
+
+    def _drop_orphan(self, digest: str) -> None:
+        if self._db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+            return
+        path = self._body_path(digest)
+        try:
+            self.total_bytes -= path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _sync_total(self) -> None:
+        self.total_bytes = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+        ).fetchone()[0]
+        self._written = 0
+
+    def _evict(self) -> None:
+        if self.total_bytes <= self.max_bytes and self._written < self.max_bytes // 10:
+            return
+        self._sync_total()
+        if self.total_bytes <= self.max_bytes:
+            return
+        low_water = int(self.max_bytes * _LOW_WATER)
+        while self.total_bytes > low_water:
+            rows = self._db.execute("SELECT url, digest FROM entries ORDER BY last_access LIMIT ?",
+                                    (_EVICT_BATCH,)).fetchall()
+            if not rows:
+                break
+            for url, digest in rows:
+                if self.total_bytes <= low_water:
+                    break
+                self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                self._drop_orphan(digest)
+        self.logger.info(f"HTTP cache evicted down to {self.total_bytes} bytes")
+
+
+class _TeeStream(httpx.AsyncByteStream):
+    """Passes the body through and stores it once it has been read to the end."""
+
+    def __init__(self, inner: httpx.AsyncByteStream, on_complete, max_bytes: int):
+        self._inner = inner
+        self._on_complete = on_complete
+        self._max_bytes = max_bytes
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        chunks: Optional[List[bytes]] = []
+        size = 0
+        async for chunk in self._inner:
+            if chunks is not None:
+                size += len(chunk)
+                if size > self._max_bytes:
+                    chunks = None
+                else:
+                    chunks.append(chunk)
+            yield chunk
+        if chunks is not None:
+            self._on_complete(b"".join(chunks))
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    def __init__(self, inner: httpx.AsyncByteStream, on_chunk):
+        self._inner = inner
+        self._on_chunk = on_chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._inner:
+            self._on_chunk(len(chunk))
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """Adds ETag/Last-Modified revalidation on top of another transport.
+
+    Cached GET responses are revalidated with ``If-None-Match``/``If-Modified-Since``; a 304 is
+    answered with the stored body. Bodies are cached as received (still content-encoded), so
+    httpx decodes them exactly like a fresh response. Only 200 responses that carry a validator
+    and allow storing are cached.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, store: HttpCacheStore, max_entry_bytes: int = 50 << 20):
+        self.inner = inner
+        self.store = store
+        self.max_entry_bytes = max_entry_bytes
+        self.logger = setup_logger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self.bytes_from_cache = 0
+        self.bytes_from_network = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self.inner.handle_async_request(request)
+
+        url = str(request.url)
+        entry = self.store.lookup(url)
+        if entry is not None:
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+
+        response = await self.inner.handle_async_request(request)
+        if entry is not None and response.status_code == 304:
+            await response.aclose()
+            headers = self._merge_headers(entry.headers, response.headers.multi_items())
+            self.store.refresh(entry, headers)
+            body = self.store.read_body(entry)
+            self.hits += 1
+            self.bytes_from_cache += len(body)
+            return httpx.Response(entry.status, headers=headers, stream=httpx.ByteStream(body),
+                                  extensions=response.extensions)
+
+        self.misses += 1
+        if response.status_code != 200 or not self._storable(response):
+            return self._counted(response)
+
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _HOP_HEADERS]
+        tee = _TeeStream(response.stream, lambda body: self.store.store(url, 200, headers, body),
+                         self.max_entry_bytes)
+        return self._counted(httpx.Response(200, headers=response.headers, stream=tee,
+                                            extensions=response.extensions))
+
+    async def aclose(self) -> None:
+        self.logger.info(f"HTTP cache: {self.hits} revalidated hits, {self.misses} misses, "
+                         f"{self.bytes_from_cache} bytes from cache, {self.bytes_from_network} bytes from network")
+        await self.inner.aclose()
+        self.store.close()
+
+    def _counted(self, response: httpx.Response) -> httpx.Response:
+        response.stream = _CountingStream(response.stream, self._count_network)
+        return response
+
+    def _count_network(self, size: int) -> None:
+        self.bytes_from_network += size
+
+    @staticmethod
+    def _storable(response: httpx.Response) -> bool:
+        if "no-store" in response.headers.get("cache-control", "").lower():
+            return False
+        return "etag" in response.headers or "last-modified" in response.headers
+
+    @staticmethod
+    def _merge_headers(stored: List[Tuple[str, str]], fresh: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        updated = {k.lower() for k, _ in fresh if k.lower() not in _ENTITY_HEADERS}
+        merged = [(k, v) for k, v in stored if k.lower() not in updated]
+        merged += [(k, v) for k, v in fresh if k.lower() in updated]
+        return merged
+
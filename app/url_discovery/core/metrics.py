@@ -0,0 +1,282 @@
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config.loaders.url_discovery_config_loader import get_metrics_config
+from app.config.models.app_config_model import MetricsConfig
+from app.logging.logger import setup_logger
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# Upper bounds in seconds, from sub-millisecond parsing to slow downloads.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PREFIX = "smartcrawl_"
+
+
+def _key(name: str, labels: Dict[str, object]) -> Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_text(labels: Tuple[Tuple[str, str], ...]) -> str:
+    return ",".join(f"{k}={v}" for k, v in labels)
+
+
+def _prom_labels(labels: Tuple[Tuple[str, str], ...], le: Optional[str] = None) -> str:
+    pairs = list(labels) + ([("le", le)] if le is not None else [])
+    if not pairs:
+        return ""
+    escaped = ('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+               for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles are bucket upper bounds."""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return round(min(bound, self.max), 6)
+        return round(self.max, 6)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 6),
+        }
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, value: float = 1) -> None:
+        self.value += value
+
+
+class _NullSeries:
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, value: float = 1) -> None:
+        pass
+
+
+_NULL_SERIES = _NullSeries()
+
+
+class Metrics:
+    """Counters, sampled gauges and latency histograms for one process.
+
+    Gauges are callbacks registered with :meth:`track` and read only when a summary or
+    Prometheus snapshot is taken, so frontier sizes and in-flight counts cost nothing per event.
+    Callbacks registered under the same name and labels (e.g. concurrent crawls in a batch
+    worker) are summed. Hot paths with fixed labels bind a series once with :meth:`counter` or
+    :meth:`histogram` instead of passing labels on every call.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.started = time.time()
+        self.counters: Dict[Key, Counter] = {}
+        self.histograms: Dict[Key, Histogram] = {}
+        self.peaks: Dict[Key, float] = {}
+        self._gauges: Dict[int, Tuple[Key, Callable[[], float]]] = {}
+        self._next_gauge = 0
+
+    def counter(self, name: str, **labels) -> Counter:
+        key = _key(name, labels)
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = self.counters[key] = Counter()
+        return counter
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        key = _key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        return histogram
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        self.counter(name, **labels).value += value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        self.histogram(name, **labels).observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def track(self, name: str, fn: Callable[[], float], **labels) -> int:
+        self._next_gauge += 1
+        self._gauges[self._next_gauge] = (_key(name, labels), fn)
+        return self._next_gauge
+
+    def untrack(self, handle: int) -> None:
+        self._gauges.pop(handle, None)
+
+    def gauges(self) -> Dict[Key, float]:
+        values: Dict[Key, float] = {}
+        for key, fn in self._gauges.values():
+            values[key] = values.get(key, 0) + fn()
+        for key, value in values.items():
+            if value > self.peaks.get(key, 0):
+                self.peaks[key] = value
+        return values
+
+    def summary(self) -> dict:
+        gauges = self.gauges()
+        out: dict = {"uptime_seconds": round(time.time() - self.started, 3), "counters": {}, "gauges": {},
+                     "histograms": {}}
+        for (name, labels), counter in sorted(self.counters.items()):
+            out["counters"].setdefault(name, {})[_label_text(labels)] = counter.value
+        for key in sorted(set(gauges) | set(self.peaks)):
+            name, labels = key
+            out["gauges"].setdefault(name, {})[_label_text(labels)] = {"value": gauges.get(key, 0),
+                                                                        "peak": self.peaks.get(key, 0)}
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            out["histograms"].setdefault(name, {})[_label_text(labels)] = histogram.to_dict()
+        return out
+
+    def prometheus(self) -> str:
+        lines: List[str] = []
+        typed = set()
+
+        def header(name: str, kind: str) -> None:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        for (name, labels), counter in sorted(self.counters.items()):
+            header(name, "counter")
+            lines.append(f"{PREFIX}{name}{_prom_labels(labels)} {counter.value}")
+        for (name, labels), value in sorted(self.gauges().items()):
+            header(name, "gauge")
+            lines.append(f"{PREFIX}{name}{_prom_labels(labels)} {value}")
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, n in zip(BUCKETS, histogram.counts):
+                cumulative += n
+                lines.append(f"{PREFIX}{name}_bucket{_prom_labels(labels, str(bound))} {cumulative}")
+            lines.append(f"{PREFIX}{name}_bucket{_prom_labels(labels, '+Inf')} {histogram.count}")
+            lines.append(f"{PREFIX}{name}_sum{_prom_labels(labels)} {histogram.sum}")
+            lines.append(f"{PREFIX}{name}_count{_prom_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+class NullMetrics(Metrics):
+    """Used when metrics are disabled: every call is a no-op."""
+
+    enabled = False
+
+    def counter(self, name: str, **labels):
+        return _NULL_SERIES
+
+    def histogram(self, name: str, **labels):
+        return _NULL_SERIES
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        pass
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        pass
+
+    def timer(self, name: str, **labels):
+        return nullcontext()
+
+    def track(self, name: str, fn: Callable[[], float], **labels) -> int:
+        return 0
+
+
+_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics() if get_metrics_config().enabled else NullMetrics()
+    return _metrics
+
+
+def set_metrics(metrics: Metrics) -> None:
+    global _metrics
+    _metrics = metrics
+
+
+def _write(path: str, text: str) -> None:
+    # Written to a temporary file and renamed, so scrapers never read a partial file.
+    target = Path(path.format(pid=os.getpid()))
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, target)
+
+
+@asynccontextmanager
+async def metrics_reporting(cfg: Optional[MetricsConfig] = None):
+    """Writes the Prometheus file every ``prometheus_interval`` seconds while the block runs and
+    the JSON summary (or logs it, without ``summary_path``) when it ends. ``{pid}`` in either path
+    is replaced with the process id, for batch workers."""
+    cfg = cfg or get_metrics_config()
+    metrics = get_metrics()
+    if not metrics.enabled:
+        yield metrics
+        return
+
+    async def export():
+        while True:
+            await asyncio.sleep(cfg.prometheus_interval)
+            _write(cfg.prometheus_path, metrics.prometheus())
+
+    exporter = asyncio.create_task(export()) if cfg.prometheus_path else None
+    try:
+        yield metrics
+    finally:
+        if exporter is not None:
+            exporter.cancel()
+            await asyncio.gather(exporter, return_exceptions=True)
+            _write(cfg.prometheus_path, metrics.prometheus())
+        summary = json.dumps(metrics.summary(), indent=2)
+        if cfg.summary_path:
+            _write(cfg.summary_path, summary + "\n")
+        else:
+            setup_logger(__name__).info(f"Metrics summary:\n{summary}")
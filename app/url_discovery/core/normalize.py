@@ -1,4 +1,7 @@
-from typing import Tuple
+import re
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterable, List, NamedTuple, Tuple
 
 from app.url_discovery.core.patterns import ParsingPatterns
 
@@ -15,7 +18,15 @@ def canonical_netloc(scheme: str, netloc: str, strip_www: bool, prefer_https: bo
     return sch, nl
 
 
-from urllib.parse import urljoin, urldefrag, urlparse, urlunparse, parse_qsl, urlencode
+from urllib.parse import urljoin, urldefrag, urlparse, urlunparse, urlsplit, parse_qsl, urlencode
+
+
+class ParsedUrl(NamedTuple):
+    url: str
+    scheme: str
+    host: str
+    path: str
+    query: str
 
 
 def normalize_link(
@@ -23,6 +34,15 @@ def normalize_link(
         href: str | bytes | None,
         patterns: ParsingPatterns
 ) -> str | None:
+    parts = normalize_link_parts(base_url, href, patterns)
+    return parts.url if parts else None
+
+
+def normalize_link_parts(
+        base_url: str,
+        href: str | bytes | None,
+        patterns: ParsingPatterns
+) -> ParsedUrl | None:
     if not href:
         return None
     if isinstance(href, (bytes, bytearray)):
@@ -57,24 +77,107 @@ def normalize_link(
     if path != "/":
         while "//" in path:
             path = path.replace("//", "/")
-
-    q_pairs: list[tuple[str, str]] = []
-    for k, v in parse_qsl(p.query, keep_blank_values=True):
-        kl = k.lower()
-        if kl in patterns.asset_extensions or kl in patterns.pagination_hints:
-            continue
-        q_pairs.append((k, v))
-
-    query = urlencode(q_pairs, doseq=True)
+        if patterns.strip_trailing_slash:
+            path = path.rstrip("/") or "/"
+
+    query = ""
+    if p.query:
+        q_pairs: list[tuple[str, str]] = []
+        for k, v in parse_qsl(p.query, keep_blank_values=True):
+            kl = k.lower()
+            if kl in patterns.asset_extensions or kl in patterns.pagination_hints or kl in patterns.tracking_params:
+                continue
+            q_pairs.append((k, v))
+        if patterns.sort_query:
+            # By name only, so repeated parameters keep their order.
+            q_pairs.sort(key=itemgetter(0))
+        query = urlencode(q_pairs, doseq=True)
 
     out = urlunparse((sch, nl, path, "", query, ""))
     if len(out) > patterns.max_url_length:
         return None
-    return out
+    return ParsedUrl(out, sch, nl, path, query)
+
+
+_ABSOLUTE_HTTP = re.compile(r"^https?://", re.I)
+
+
+class LinkNormalizer:
+    """Memoizing front end for ``normalize_link`` that works on all hrefs of one page at a time.
+
+    Results are cached on ``(base prefix, href)``, where the prefix is only as specific as the href
+    needs: nothing for absolute URLs, the origin for root-relative ones, the base directory for
+    relative paths and the full base URL for query- or fragment-only hrefs. Navigation and footer
+    links therefore hit the cache across every page of a site.
+    """
+
+    def __init__(self, patterns: ParsingPatterns, cache_size: int = 65536):
+        self.patterns = patterns
+        self._normalize = lru_cache(maxsize=cache_size)(self._normalize_uncached)
+        self._parse = lru_cache(maxsize=cache_size)(self._parse_uncached)
+        self._bases = lru_cache(maxsize=256)(self._base_prefixes)
+
+    def normalize(self, base_url: str, href: str | bytes | None) -> ParsedUrl | None:
+        if not href:
+            return None
+        if isinstance(href, (bytes, bytearray)):
+            href = href.decode("utf-8", errors="ignore")
+        return self._normalize(self._prefix_for(self._bases(base_url), href.strip()), href)
+
+    def normalize_many(self, base_url: str, hrefs: Iterable[str | bytes | None]) -> List[ParsedUrl]:
+        bases = self._bases(base_url)
+        out: List[ParsedUrl] = []
+        for href in dict.fromkeys(hrefs):
+            if not href:
+                continue
+            if isinstance(href, (bytes, bytearray)):
+                href = href.decode("utf-8", errors="ignore")
+            parts = self._normalize(self._prefix_for(bases, href.strip()), href)
+            if parts is not None:
+                out.append(parts)
+        return out
+
+    def parse(self, url: str) -> ParsedUrl:
+        return self._parse(url)
+
+    def cache_info(self):
+        return self._normalize.cache_info()
+
+    @staticmethod
+    def _prefix_for(bases: Tuple[str, str, str], href: str) -> str:
+        full, origin, directory = bases
+        if not href or href[0] in "?#;":
+            return full
+        if _ABSOLUTE_HTTP.match(href):
+            return ""
+        if href[0] == "/":
+            return origin
+        return directory
+
+    @staticmethod
+    def _base_prefixes(base_url: str) -> Tuple[str, str, str]:
+        p = urlsplit(base_url)
+        if not (p.scheme and p.netloc):
+            return base_url, base_url, base_url
+        origin = f"{p.scheme}://{p.netloc}/"
+        directory = origin + p.path[1:p.path.rfind("/") + 1] if "/" in p.path else origin
+        return base_url, origin, directory
+
+    def _normalize_uncached(self, prefix: str, href: str) -> ParsedUrl | None:
+        return normalize_link_parts(prefix, href, self.patterns)
+
+    @staticmethod
+    def _parse_uncached(url: str) -> ParsedUrl:
+        p = urlsplit(url)
+        return ParsedUrl(url, p.scheme, p.netloc.lower(), p.path or "/", p.query)
 
 
 def same_domain(url: str, root_netloc: str, include_subdomains: bool) -> bool:
-    netloc = urlparse(url).netloc.lower()
+    return host_in_domain(urlparse(url).netloc, root_netloc, include_subdomains)
+
+
+def host_in_domain(host: str, root_netloc: str, include_subdomains: bool) -> bool:
+    netloc = host.lower()
     root = root_netloc.lower()
 
     if not root.startswith("www.") and netloc.startswith("www."):
@@ -0,0 +1,148 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.config.loaders.app_config_loader import get_app_config, set_app_config
+from app.config.models.app_config_model import AppConfig, HttpCrawlerConfig
+from app.url_discovery.core.html_parsing import parse_page, parse_page_timed, record_parse_timings
+from app.url_discovery.core.normalize import LinkNormalizer
+from app.url_discovery.core.patterns import ParsingPatterns
+from app.url_discovery.core.url_classifier import UrlClassifier
+
+PageInput = Tuple[str, bytes, Optional[str]]
+# Links of a page and its content fingerprint, None unless fingerprinting is on.
+PageOutput = Tuple[Set[str], Optional[int]]
+# A worker's PageOutput plus its stage timings, which the parent records in its own metrics.
+_TimedOutput = Tuple[Set[str], Optional[int], Dict[str, float]]
+
+_worker_state: dict = {}
+
+
+def _init_worker(config: AppConfig, patterns: ParsingPatterns, include_assets: bool, html_only: bool,
+                 fingerprint: bool = False, min_words: int = 50) -> None:
+    # The parent's config, which may not be the one at CONFIG_PATH.
+    set_app_config(config)
+    _worker_state.update(patterns=patterns, include_assets=include_assets, html_only=html_only,
+                         normalizer=LinkNormalizer(patterns), classifier=UrlClassifier(patterns),
+                         fingerprint=fingerprint, min_words=min_words)
+
+
+def _parse_batch(batch: List[PageInput]) -> List[_TimedOutput | Exception]:
+    out: List[_TimedOutput | Exception] = []
+    for url, html, encoding in batch:
+        try:
+            out.append(parse_page_timed(url, html, _worker_state["include_assets"], _worker_state["html_only"],
+                                  _worker_state["patterns"], encoding=encoding,
+                                  normalizer=_worker_state["normalizer"],
+                                  classifier=_worker_state["classifier"],
+                                  fingerprint=_worker_state["fingerprint"],
+                                  min_words=_worker_state["min_words"]))
+        except Exception as e:
+            out.append(e)
+    return out
+
+
+class InlineParseExecutor:
+    def __init__(self, patterns: ParsingPatterns, include_assets: bool, html_only: bool,
+                 normalizer: Optional[LinkNormalizer] = None, classifier: Optional[UrlClassifier] = None,
+                 fingerprint: bool = False, min_words: int = 50):
+        self.patterns = patterns
+        self.include_assets = include_assets
+        self.html_only = html_only
+        self.normalizer = normalizer or LinkNormalizer(patterns)
+        self.classifier = classifier or UrlClassifier(patterns)
+        self.fingerprint = fingerprint
+        self.min_words = min_words
+        self.capacity = 0
+
+    async def extract_links(self, url: str, html: bytes, encoding: Optional[str] = None) -> Set[str]:
+        return (await self.parse_page(url, html, encoding))[0]
+
+    async def parse_page(self, url: str, html: bytes, encoding: Optional[str] = None) -> PageOutput:
+        return parse_page(url, html, self.include_assets, self.html_only, self.patterns, encoding=encoding,
+                          normalizer=self.normalizer, classifier=self.classifier,
+                          fingerprint=self.fingerprint, min_words=self.min_words)
+
+    async def close(self) -> None:
+        pass
+
+
+class ProcessParseExecutor:
+    """Parses pages in worker processes so the event loop keeps fetching while HTML is parsed.
+
+    Pages submitted within the same loop iteration are sent to the pool as one batch.
+    """
+
+    def __init__(self, patterns: ParsingPatterns, include_assets: bool, html_only: bool,
+                 workers: int = 0, batch_size: int = 8, fingerprint: bool = False, min_words: int = 50,
+                 config: Optional[AppConfig] = None):
+        self.batch_size = max(1, batch_size)
+        workers = workers or os.cpu_count() or 1
+        # Pages that can be parsing at once without holding a fetch slot.
+        self.capacity = workers * self.batch_size
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(config or get_app_config(), patterns, include_assets, html_only, fingerprint, min_words),
+        )
+        self._pending: List[Tuple[PageInput, asyncio.Future]] = []
+        self._flush_scheduled = False
+
+    async def extract_links(self, url: str, html: bytes, encoding: Optional[str] = None) -> Set[str]:
+        return (await self.parse_page(url, html, encoding))[0]
+
+    async def parse_page(self, url: str, html: bytes, encoding: Optional[str] = None) -> PageOutput:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append(((url, html, encoding), fut))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        futures = [fut for _, fut in batch]
+        done = asyncio.get_running_loop().run_in_executor(self._pool, _parse_batch, [page for page, _ in batch])
+
+        def distribute(task: asyncio.Future) -> None:
+            if task.cancelled() or task.exception() is not None:
+                error = asyncio.CancelledError() if task.cancelled() else task.exception()
+                for fut in futures:
+                    if not fut.done():
+                        fut.set_exception(error)
+                return
+            for fut, result in zip(futures, task.result()):
+                if fut.done():
+                    continue
+                if isinstance(result, Exception):
+                    fut.set_exception(result)
+                else:
+                    links, fingerprint, timings = result
+                    record_parse_timings(timings)
+                    fut.set_result((links, fingerprint))
+
+        done.add_done_callback(distribute)
+
+    async def close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._pool.shutdown)
+
+
+def make_parse_executor(cfg: HttpCrawlerConfig, patterns: ParsingPatterns,
+                        normalizer: Optional[LinkNormalizer] = None,
+                        classifier: Optional[UrlClassifier] = None) -> InlineParseExecutor | ProcessParseExecutor:
+    fingerprint = cfg.fingerprint.enabled
+    if cfg.parse_executor == "process":
+        return ProcessParseExecutor(patterns, cfg.include_assets, cfg.html_only,
+                                    workers=cfg.parse_workers, batch_size=cfg.parse_batch_size,
+                                    fingerprint=fingerprint, min_words=cfg.fingerprint.min_words)
+    return InlineParseExecutor(patterns, cfg.include_assets, cfg.html_only, normalizer, classifier,
+                               fingerprint, cfg.fingerprint.min_words)
@@ -1,8 +1,9 @@
 import re
 from dataclasses import dataclass
-from typing import Pattern, Set
+from typing import FrozenSet, Optional, Pattern, Tuple
 
 from app.config.loaders.url_discovery_config_loader import get_parsing_config
+from app.config.models.app_config_model import ParsingConfig
 
 
 @dataclass(frozen=True)
@@ -10,31 +11,48 @@ class ParsingPatterns:
     html_ct: Pattern[str]
     sitemap_ct: Pattern[str]
     url_in_text: Pattern[str]
-    asset_extensions: Set[str]
+    asset_extensions: FrozenSet[str]
     non_html_api: Pattern[str]
     language_segment: Pattern[str]
     max_url_length: int
     prefer_https: bool
     strip_www: bool
-    pagination_hints: Set[str]
+    pagination_hints: FrozenSet[str]
     max_pagination_page: int
+    tracking_params: FrozenSet[str] = frozenset()
+    sort_query: bool = False
+    strip_trailing_slash: bool = False
+
+
+_compiled: Optional[Tuple[ParsingConfig, ParsingPatterns]] = None
 
 
 def load_patterns() -> ParsingPatterns:
+    """Patterns for the current parsing config, compiled once and reused while that config stays current."""
+    global _compiled
     cfg = get_parsing_config()
+    if _compiled is None or _compiled[0] is not cfg:
+        _compiled = (cfg, compile_patterns(cfg))
+    return _compiled[1]
 
+
+def compile_patterns(cfg: ParsingConfig) -> ParsingPatterns:
     html_ct = re.compile("(" + "|".join(map(re.escape, cfg.html_content_types)) + ")", re.I)
     sitemap_ct = re.compile("(" + "|".join(map(re.escape, cfg.sitemap_content_types)) + ")", re.I)
     url_in_text = re.compile(cfg.url_in_text_pattern, re.I)
 
-    asset_extensions = {e.lower().lstrip(".") for e in cfg.asset_extensions}
+    asset_extensions = frozenset(e.lower().lstrip(".") for e in cfg.asset_extensions)
 
     non_html_join = "|".join(re.escape(s) for s in cfg.non_html_api_patterns)
     non_html_api = re.compile(non_html_join, re.I)
 
     language_segment = re.compile(cfg.language_segment_pattern, re.I)
 
-    pagination_hints = {p.lower() for p in cfg.pagination_hints}
+    pagination_hints = frozenset(p.lower() for p in cfg.pagination_hints)
+
+    canonical = cfg.canonical
+    tracking_params = frozenset(p.lower() for p in cfg.tracking_params) if canonical.strip_tracking_params \
+        else frozenset()
 
     return ParsingPatterns(
         html_ct=html_ct,
@@ -48,4 +66,7 @@ def load_patterns() -> ParsingPatterns:
         strip_www=cfg.strip_www,
         pagination_hints=pagination_hints,
         max_pagination_page=cfg.max_pagination_page,
+        tracking_params=tracking_params,
+        sort_query=canonical.sort_query,
+        strip_trailing_slash=canonical.trailing_slash == "strip",
     )
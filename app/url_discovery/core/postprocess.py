@@ -1,8 +1,9 @@
 from collections import defaultdict
-from typing import DefaultDict, Dict, Iterable, List, Tuple
+from typing import DefaultDict, Dict, Iterable, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
 from app.url_discovery.core.patterns import ParsingPatterns
+from app.url_discovery.core.url_classifier import UrlClassifier
 
 
 def _split_lang(path: str, patterns: ParsingPatterns) -> Tuple[str, str]:
@@ -16,22 +17,26 @@ def _split_lang(path: str, patterns: ParsingPatterns) -> Tuple[str, str]:
     return "", path
 
 
+def _variant_key(url: str, patterns: ParsingPatterns) -> Tuple[str, Tuple[str, str, str]]:
+    p = urlparse(url)
+    lang, rest = _split_lang(p.path or "/", patterns)
+    if rest != "/" and rest.endswith("/"):
+        rest = rest.rstrip("/")
+    return lang, (p.scheme, p.netloc.lower(), rest)
+
+
 def collapse_language_variants(urls: Iterable[str], default_langs: Iterable[str], patterns: ParsingPatterns,
-                               treat_assets_as_is: bool = True) -> List[str]:
+                               treat_assets_as_is: bool = True,
+                               classifier: Optional[UrlClassifier] = None) -> List[str]:
+    classifier = classifier or UrlClassifier(patterns)
     defaults = {l.lower() for l in default_langs}
     buckets: DefaultDict[Tuple[str, str, str], Dict[str, str]] = defaultdict(dict)
     assets: List[str] = []
     for u in urls:
-        p = urlparse(u)
-        path = p.path or "/"
-        low = u.lower()
-        if treat_assets_as_is and any(low.endswith("." + ext) for ext in patterns.asset_extensions):
+        if treat_assets_as_is and classifier.is_asset(u):
             assets.append(u)
             continue
-        lang, rest = _split_lang(path, patterns)
-        if rest != "/" and rest.endswith("/"):
-            rest = rest.rstrip("/")
-        key = (p.scheme, p.netloc.lower(), rest)
+        lang, key = _variant_key(u, patterns)
         buckets[key][lang] = u
     out: List[str] = []
     for _, language_map in buckets.items():
@@ -39,3 +44,35 @@ def collapse_language_variants(urls: Iterable[str], default_langs: Iterable[str]
         out.extend(sorted(set(non_default if non_default else language_map.values())))
     out.extend(assets)
     return sorted(set(out))
+
+
+class StreamingLanguageCollapser:
+    """Incremental dedup and language collapsing for URLs that arrive one at a time.
+
+    Follows :func:`collapse_language_variants` as far as a stream allows: a default-language URL
+    is dropped when a non-default variant of it has already been seen, but one emitted before its
+    variant arrives cannot be taken back.
+    """
+
+    def __init__(self, default_langs: Iterable[str], patterns: ParsingPatterns, enabled: bool = True,
+                 treat_assets_as_is: bool = True, classifier: Optional[UrlClassifier] = None):
+        self.patterns = patterns
+        self.enabled = enabled
+        self.treat_assets_as_is = treat_assets_as_is
+        self.classifier = classifier or UrlClassifier(patterns)
+        self.defaults = {l.lower() for l in default_langs}
+        self.emitted: Set[str] = set()
+        self._translated: Set[Tuple[str, str, str]] = set()
+
+    def add(self, url: str) -> bool:
+        """Whether ``url`` should be emitted now."""
+        if url in self.emitted:
+            return False
+        if self.enabled and not (self.treat_assets_as_is and self.classifier.is_asset(url)):
+            lang, key = _variant_key(url, self.patterns)
+            if lang and lang not in self.defaults:
+                self._translated.add(key)
+            elif key in self._translated:
+                return False
+        self.emitted.add(url)
+        return True
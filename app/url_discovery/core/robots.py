@@ -0,0 +1,248 @@
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+
+from app.logging.logger import setup_logger
+
+# Characters left as-is when percent-encoding robots.txt paths, so patterns compare like URLs do.
+_PATH_SAFE = "/?=&;:@!$'()*+,-._~%"
+_URL_PATH = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*://[^/?#]*([^#]*)")
+
+Verdict = Tuple[int, bool]
+
+
+def _encode(path: str) -> str:
+    # Crawled URLs are already encoded; only raw non-ASCII text and spaces need quoting.
+    return quote(path, safe=_PATH_SAFE) if not path.isascii() or " " in path else path
+
+
+def _normalize_pattern(pattern: str) -> str:
+    # A trailing "*" adds nothing to a prefix match, and dropping it lets the rule use the trie.
+    if not pattern.endswith("$"):
+        pattern = pattern.rstrip("*") or "/"
+    return _encode(pattern)
+
+
+def _merge(rules: List[Tuple[str, bool]]) -> Dict[str, bool]:
+    merged: Dict[str, bool] = {}
+    for pattern, allow in rules:
+        merged[pattern] = merged.get(pattern, False) or allow
+    return merged
+
+
+class _PrefixIndex:
+    """Longest plain-prefix rule for a path via one bisect over the sorted patterns.
+
+    Any pattern that is a prefix of the path is a prefix of the sorted predecessor of the path
+    as well, so it lies on that predecessor's chain of shorter prefix patterns.
+    """
+
+    def __init__(self, rules: Dict[str, bool]):
+        self.patterns = sorted(rules)
+        self.allow = [rules[p] for p in self.patterns]
+        self.parent: List[int] = []
+        stack: List[int] = []
+        for i, pattern in enumerate(self.patterns):
+            while stack and not pattern.startswith(self.patterns[stack[-1]]):
+                stack.pop()
+            self.parent.append(stack[-1] if stack else -1)
+            stack.append(i)
+
+    def match(self, path: str) -> Optional[Verdict]:
+        i = bisect_right(self.patterns, path) - 1
+        while i >= 0:
+            pattern = self.patterns[i]
+            if path.startswith(pattern):
+                return len(pattern), self.allow[i]
+            i = self.parent[i]
+        return None
+
+
+def _compile_wildcards(rules: Dict[str, bool]) -> Tuple[Optional[re.Pattern], Optional[str], List[Verdict]]:
+    # Longest pattern first, Allow before Disallow on ties, so the first alternative that
+    # matches is the most specific wildcard rule. Every wildcard rule ends in a literal tail
+    # the path must contain; the first characters of those tails are returned so most paths
+    # can skip the alternation after a few substring checks.
+    if not rules:
+        return None, None, []
+    ordered = sorted(rules.items(), key=lambda r: (-len(r[0]), not r[1]))
+    parts = []
+    hint = set()
+    open_tail = False
+    for pattern, _ in ordered:
+        anchored = pattern.endswith("$")
+        pieces = (pattern[:-1] if anchored else pattern).split("*")
+        body = ".*".join(re.escape(piece) for piece in pieces)
+        parts.append(f"({body}\\Z)" if anchored else f"({body})")
+        if pieces[-1]:
+            hint.add(pieces[-1][0])
+        else:
+            open_tail = True
+    hint_chars = "".join(sorted(hint)) if not open_tail and len(hint) <= 4 else None
+    return re.compile("|".join(parts), re.DOTALL), hint_chars, [(len(p), allow) for p, allow in ordered]
+
+
+class RobotsRules:
+    """Allow/Disallow rules from one robots.txt group, compiled for fast matching.
+
+    Matching follows RFC 9309: the longest matching pattern wins, Allow wins ties, ``*`` matches
+    any run of characters and a trailing ``$`` anchors the end of the path. Plain prefix rules
+    are resolved with a bisect, ``$``-only rules with a dict lookup and wildcard rules with one
+    ordered alternation, consulted only when one of them could beat the prefix match.
+    """
+
+    def __init__(self, rules: List[Tuple[str, bool]] = (), crawl_delay: Optional[float] = None,
+                 sitemaps: List[str] = ()):
+        self.rules = [(_normalize_pattern(p), allow) for p, allow in rules if p]
+        self.crawl_delay = crawl_delay
+        self.sitemaps = list(sitemaps)
+        merged = _merge(self.rules)
+        self._prefixes = _PrefixIndex({p: a for p, a in merged.items() if "*" not in p and not p.endswith("$")})
+        self._exact = {p[:-1]: (len(p), a) for p, a in merged.items() if "*" not in p and p.endswith("$")}
+        self._wildcard, self._wildcard_hint, self._wildcard_verdicts = _compile_wildcards(
+            {p: a for p, a in merged.items() if "*" in p})
+        self._max_wildcard_len = max((n for n, _ in self._wildcard_verdicts), default=-1)
+        self._disallows = any(not allow for _, allow in self.rules)
+
+    def _might_match_wildcard(self, path: str) -> bool:
+        hint = self._wildcard_hint
+        if hint is None:
+            return True
+        for ch in hint:
+            if ch in path:
+                return True
+        return False
+
+    @classmethod
+    def allow_all(cls) -> "RobotsRules":
+        return cls()
+
+    @classmethod
+    def disallow_all(cls) -> "RobotsRules":
+        return cls([("/", False)])
+
+    @classmethod
+    def parse(cls, robots_txt: str, user_agent: str = "") -> "RobotsRules":
+        token = user_agent.split("/", 1)[0].strip().lower()
+        groups: Dict[str, Tuple[List[Tuple[str, bool]], List[float]]] = {}
+        sitemaps: List[str] = []
+        agents: List[str] = []
+        in_rules = False
+
+        for raw in robots_txt.splitlines():
+            line = raw.split("#", 1)[0].strip()
+            if ":" not in line:
+                continue
+            key, value = (part.strip() for part in line.split(":", 1))
+            key = key.lower()
+            if key == "sitemap":
+                if value:
+                    sitemaps.append(value)
+                continue
+            if key == "user-agent":
+                if in_rules:
+                    agents = []
+                    in_rules = False
+                agents.append(value.lower())
+                continue
+            if not agents:
+                continue
+            in_rules = True
+            for agent in agents:
+                rules, delays = groups.setdefault(agent, ([], []))
+                if key in ("allow", "disallow"):
+                    rules.append((value, key == "allow"))
+                elif key == "crawl-delay":
+                    try:
+                        delays.append(float(value))
+                    except ValueError:
+                        pass
+
+        # The most specific product token that matches our user agent, else the "*" group.
+        chosen = None
+        if token:
+            matching = [agent for agent in groups if agent != "*" and agent in token]
+            if matching:
+                chosen = groups[max(matching, key=len)]
+        if chosen is None:
+            chosen = groups.get("*", ([], []))
+        rules, delays = chosen
+        return cls(rules, delays[0] if delays else None, sitemaps)
+
+    def can_fetch(self, url: str) -> bool:
+        if not self._disallows:
+            return True
+        m = _URL_PATH.match(url)
+        path = m.group(1) if m else url
+        if not path.startswith("/"):
+            path = "/" + path
+        if path == "/robots.txt":
+            return True
+        path = _encode(path)
+
+        best, allow = self._prefixes.match(path) or (-1, True)
+        if self._exact and (exact := self._exact.get(path)) and exact[0] >= best:
+            best, allow = exact
+        if (self._wildcard is not None and self._max_wildcard_len >= best
+                and self._might_match_wildcard(path) and (m := self._wildcard.match(path))):
+            length, wildcard_allow = self._wildcard_verdicts[m.lastindex - 1]
+            if length > best or (length == best and wildcard_allow):
+                allow = wildcard_allow
+        return allow
+
+
+class RobotsCache:
+    """robots.txt rules per host, fetched and parsed once for the whole run."""
+
+    def __init__(self, user_agent: str = "", max_crawl_delay: Optional[float] = None, cache_size: int = 65536):
+        self.user_agent = user_agent
+        self.max_crawl_delay = max_crawl_delay
+        self.logger = setup_logger(__name__)
+        self._rules: Dict[str, RobotsRules] = {}
+        self._allowed = lru_cache(maxsize=cache_size)(self._allowed_uncached)
+
+    def __contains__(self, host: str) -> bool:
+        return host in self._rules
+
+    def get(self, host: str) -> Optional[RobotsRules]:
+        return self._rules.get(host)
+
+    def put(self, host: str, rules: RobotsRules) -> RobotsRules:
+        self._rules[host] = rules
+        self._allowed.cache_clear()
+        return rules
+
+    def parse(self, host: str, robots_txt: str) -> RobotsRules:
+        return self.put(host, RobotsRules.parse(robots_txt, self.user_agent))
+
+    def crawl_delay(self, host: str) -> float:
+        rules = self._rules.get(host)
+        delay = (rules.crawl_delay if rules is not None else None) or 0.0
+        return min(delay, self.max_crawl_delay) if self.max_crawl_delay is not None else delay
+
+    def allowed(self, host: str, url: str) -> bool:
+        # Hosts whose robots.txt has not been read yet are allowed; callers check again later.
+        return host not in self._rules or self._allowed(host, url)
+
+    async def fetch(self, client: httpx.AsyncClient, origin: str, host: str) -> RobotsRules:
+        if host in self._rules:
+            return self._rules[host]
+        try:
+            r = await client.get(f"{origin}/robots.txt", follow_redirects=True)
+        except httpx.HTTPError as e:
+            self.logger.warning(f"robots.txt fetch failed for {origin}: {e}; allowing all")
+            return self.put(host, RobotsRules.allow_all())
+        if r.status_code >= 500:
+            # RFC 9309: a server error means the whole site is treated as disallowed.
+            self.logger.warning(f"robots.txt for {origin} returned {r.status_code}; disallowing all")
+            return self.put(host, RobotsRules.disallow_all())
+        if r.status_code >= 400:
+            return self.put(host, RobotsRules.allow_all())
+        return self.parse(host, r.text)
+
+    def _allowed_uncached(self, host: str, url: str) -> bool:
+        return self._rules[host].can_fetch(url)
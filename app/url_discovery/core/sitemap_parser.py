@@ -1,51 +1,104 @@
-from typing import List
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
 from urllib.parse import urlparse
 
 import httpx
-from bs4 import BeautifulSoup
 
+from app.exceptions import SitemapDiscoveryError
 from app.logging.logger import setup_logger
-from app.url_discovery.utils.compression_utils import maybe_decompress
+from app.url_discovery.core.canonicalize import Canonicalizer
+from app.url_discovery.core.metrics import get_metrics
+from app.url_discovery.core.patterns import load_patterns
+from app.url_discovery.core.sitemap_xml import SitemapEntry, SitemapStreamParser, URLSET, SITEMAPINDEX
+from app.url_discovery.utils.compression_utils import StreamDecompressor
+
+
+@dataclass
+class SitemapDocument:
+    url: str
+    kind: Optional[str] = None
+    urls: List[SitemapEntry] = field(default_factory=list)
+    sitemaps: List[SitemapEntry] = field(default_factory=list)
+    truncated: bool = False
+    # SHA-256 of the decompressed body; only set when the whole document was read.
+    digest: Optional[str] = None
+
+    @property
+    def is_sitemap(self) -> bool:
+        return self.kind in (URLSET, SITEMAPINDEX)
 
 
 class SitemapParser:
-    def __init__(self, client: httpx.AsyncClient):
+    def __init__(self, client: httpx.AsyncClient, max_bytes: Optional[int] = None):
         self.client = client
+        self.max_bytes = max_bytes
         self.logger = setup_logger(__name__)
+        self.metrics = get_metrics()
+        # Same canonical form as the crawler's, so both phases report a page once.
+        self.canonicalizer = Canonicalizer(load_patterns())
 
-    async def parse_sitemap_urls(self, sitemap_url: str) -> List[str]:
+    async def fetch_sitemap(self, sitemap_url: str, max_urls: Optional[int] = None) -> Optional[SitemapDocument]:
         self.logger.info(f"Parsing sitemap: {sitemap_url}")
+        doc = SitemapDocument(url=sitemap_url)
+        parser = SitemapStreamParser()
+        digest = hashlib.sha256()
+        # CPU time per document, split between decompression and XML parsing.
+        decompress_time = parse_time = 0.0
         try:
-            response = await self.client.get(sitemap_url)
-            response.raise_for_status()
-            content = maybe_decompress(sitemap_url, response.content)
+            async with self.client.stream("GET", sitemap_url) as response:
+                response.raise_for_status()
+                decompressor = StreamDecompressor(sitemap_url, response.headers.get("content-type", ""),
+                                                  self.max_bytes)
+                async for chunk in response.aiter_bytes():
+                    start = time.perf_counter()
+                    pieces = decompressor.feed(chunk)
+                    decompress_time += time.perf_counter() - start
+                    for piece in pieces:
+                        digest.update(piece)
+                        start = time.perf_counter()
+                        entries = parser.feed(piece)
+                        parse_time += time.perf_counter() - start
+                        if not self._collect(doc, parser, entries, max_urls):
+                            return doc
+                for piece in decompressor.flush():
+                    digest.update(piece)
+                    if not self._collect(doc, parser, parser.feed(piece), max_urls):
+                        return doc
+            self._collect(doc, parser, parser.close(), max_urls)
+            doc.digest = digest.hexdigest()
         except httpx.RequestError as e:
             self.logger.warning(f"Fetch failed for {sitemap_url}: {e}")
-            return []
+            return doc if doc.kind else None
+        except SitemapDiscoveryError as e:
+            self.logger.warning(f"Failed to parse sitemap {sitemap_url}: {e}")
+            return doc if doc.kind else None
         except Exception as e:
             self.logger.warning(f"Error retrieving sitemap content from {sitemap_url}: {e}")
-            return []
-
-        soup = BeautifulSoup(content, "xml")
-        if soup.find("urlset"):
-            return [self._normalize_url(loc.text.strip()) for loc in soup.find_all("loc")]
-        else:
-            return []
-
-    async def get_nested_sitemaps(self, sitemap_url: str) -> List[str]:
-        try:
-            response = await self.client.get(sitemap_url)
-            response.raise_for_status()
-            content = maybe_decompress(sitemap_url, response.content)
-        except Exception:
-            return []
-
-        soup = BeautifulSoup(content, "xml")
-        if soup.find("sitemapindex"):
-            return [loc.text.strip() for loc in soup.find_all("loc")]
-        return []
+            return None
+        finally:
+            if self.metrics.enabled:
+                host = urlparse(sitemap_url).hostname or ""
+                self.metrics.observe("sitemap_decompress_seconds", decompress_time, host=host)
+                self.metrics.observe("sitemap_xml_seconds", parse_time, host=host)
+                self.metrics.inc("sitemap_entries_total", len(doc.urls) + len(doc.sitemaps), host=host)
+        return doc
 
     @staticmethod
-    def _normalize_url(url: str) -> str:
-        parsed = urlparse(url)
-        return parsed._replace(fragment="", query="").geturl().rstrip("/")
+    def _collect(doc: SitemapDocument, parser: SitemapStreamParser, entries: List[SitemapEntry],
+                 max_urls: Optional[int]) -> bool:
+        doc.kind = parser.kind
+        if doc.kind == SITEMAPINDEX:
+            doc.sitemaps.extend(entries)
+            return True
+        if max_urls is not None and len(doc.urls) + len(entries) > max_urls:
+            doc.urls.extend(entries[:max(0, max_urls - len(doc.urls))])
+            doc.truncated = True
+            return False
+        doc.urls.extend(entries)
+        return True
+
+    def normalize_url(self, url: str) -> Optional[str]:
+        """Canonical form of a sitemap <loc>, or None when it is not a crawlable URL."""
+        return self.canonicalizer.canonical(url.strip())
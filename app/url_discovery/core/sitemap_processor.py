@@ -1,6 +1,5 @@
 import asyncio
-import re
-from typing import List, Set
+from typing import Callable, Dict, List, Optional, Set
 from urllib.parse import urljoin, urlparse
 
 import httpx
@@ -8,8 +7,12 @@ import httpx
 from app.config.loaders.url_discovery_config_loader import get_sitemap_config
 from app.exceptions import SitemapDiscoveryError
 from app.logging.logger import setup_logger
-from app.url_discovery.core.async_worker_pool import QueueProcessor
-from app.url_discovery.core.sitemap_parser import SitemapParser
+from app.url_discovery.core.async_worker_pool import ItemResult, QueueProcessor
+from app.url_discovery.core.checkpoint import CheckpointStore
+from app.url_discovery.core.robots import RobotsCache, RobotsRules
+from app.url_discovery.core.sitemap_parser import SitemapDocument, SitemapParser
+from app.url_discovery.core.sitemap_state import SitemapState, is_changed_since, parse_lastmod
+from app.url_discovery.core.transport import HttpSession
 from app.url_discovery.utils.compression_utils import maybe_decompress
 from app.url_discovery.utils.url_utils import normalize_base_url
 
@@ -20,29 +23,27 @@ class SitemapUrlCollector:
         self.config = config
         self.logger = setup_logger(__name__)
 
-    async def collect_urls_from_sitemap(self, sitemap_url: str) -> Set[str]:
-        self.logger.info(f"Collecting URLs from sitemap: {sitemap_url}")
-        try:
-            urls = await self.parser.parse_sitemap_urls(sitemap_url)
-            url_set = set(urls)
+    def collect_urls(self, document: SitemapDocument) -> Set[str]:
+        self.logger.info(f"Collecting URLs from sitemap: {document.url}")
+        url_set = {self.parser.normalize_url(entry.loc) for entry in document.urls}
+        url_set.discard(None)
 
-            if len(url_set) > self.config.max_urls_per_sitemap:
-                self.logger.warning(
-                    f"Sitemap {sitemap_url} has {len(url_set)} URLs, limiting to {self.config.max_urls_per_sitemap}")
-                url_set = set(list(url_set)[:self.config.max_urls_per_sitemap])
+        if document.truncated or len(url_set) > self.config.max_urls_per_sitemap:
+            self.logger.warning(
+                f"Sitemap {document.url} has more than {self.config.max_urls_per_sitemap} URLs, limiting")
+            url_set = set(list(url_set)[:self.config.max_urls_per_sitemap])
 
-            return url_set
-        except Exception as e:
-            self.logger.error(f"Failed to collect URLs from {sitemap_url}: {e}")
-            return set()
+        return url_set
 
 
 class SitemapUrlDiscoverer:
-    SITEMAP_PATTERN = re.compile(r"(?i)^sitemap:\s*(.+)$")
-
-    def __init__(self, client: httpx.AsyncClient, config):
+    def __init__(self, client: httpx.AsyncClient, config, parser: Optional[SitemapParser] = None,
+                 robots: Optional[RobotsCache] = None):
         self.client = client
         self.config = config
+        self.parser = parser or SitemapParser(client)
+        self.robots = robots or RobotsCache((config.headers or {}).get("User-Agent", ""))
+        self.prefetched: Dict[str, SitemapDocument] = {}
         self.logger = setup_logger(__name__)
 
     async def discover_sitemap_urls(self, base_url: str) -> List[str]:
@@ -53,6 +54,7 @@ class SitemapUrlDiscoverer:
                 sitemap_urls = await self._get_sitemap_urls_from_robots(base_url)
                 if sitemap_urls:
                     return sitemap_urls
+                break
             except SitemapDiscoveryError as e:
                 self.logger.warning(f"Attempt {attempt + 1}: {e}")
 
@@ -62,9 +64,13 @@ class SitemapUrlDiscoverer:
         robots_url = urljoin(base_url, "/robots.txt")
         try:
             resp = await self.client.get(robots_url)
-            resp.raise_for_status()
         except httpx.RequestError as e:
             raise SitemapDiscoveryError(f"Failed to fetch robots.txt: {e}")
+        if resp.status_code >= 500:
+            raise SitemapDiscoveryError(f"robots.txt returned {resp.status_code}")
+        if resp.status_code >= 400:
+            self.robots.put(urlparse(str(resp.url)).netloc.lower(), RobotsRules.allow_all())
+            return []
 
         final_url = str(resp.url)
         if final_url != robots_url:
@@ -73,21 +79,21 @@ class SitemapUrlDiscoverer:
             self.logger.info(f"Base URL changed via redirect: {robots_url} → {final_url} (base={base_url})")
 
         try:
-            content = maybe_decompress(final_url, resp.content)
+            content = maybe_decompress(final_url, resp.content, resp.headers.get("content-type", ""))
             text = content.decode("utf-8", errors="replace")
         except Exception as e:
             raise SitemapDiscoveryError(f"Decompression or decoding failed: {e}")
 
-        return self._extract_sitemap_urls(text, base_url)
+        rules = self.robots.parse(urlparse(final_url).netloc.lower(), text)
+        return self._extract_sitemap_urls(rules, base_url)
 
-    def _extract_sitemap_urls(self, robots_txt: str, base_url: str) -> List[str]:
+    @staticmethod
+    def _extract_sitemap_urls(rules: RobotsRules, base_url: str) -> List[str]:
         sitemap_urls = []
-        for line in robots_txt.splitlines():
-            if match := self.SITEMAP_PATTERN.match(line.strip()):
-                sitemap_url = match.group(1).strip()
-                if not sitemap_url.startswith(('http://', 'https://')):
-                    sitemap_url = urljoin(base_url, sitemap_url)
-                sitemap_urls.append(sitemap_url)
+        for sitemap_url in rules.sitemaps:
+            if not sitemap_url.startswith(('http://', 'https://')):
+                sitemap_url = urljoin(base_url, sitemap_url)
+            sitemap_urls.append(sitemap_url)
         return sitemap_urls
 
     async def _try_common_sitemap_urls(self, base_url: str) -> List[str]:
@@ -108,62 +114,127 @@ class SitemapUrlDiscoverer:
     async def _check_common_sitemap_url(self, url: str) -> str | None:
         self.logger.info(f"Trying common sitemap path: {url}")
         try:
-            response = await self.client.get(url)
-            response.raise_for_status()
-            content = maybe_decompress(url, response.content)
-            soup = __import__('bs4').BeautifulSoup(content, "xml")
-            if soup.find("urlset") or soup.find("sitemapindex"):
+            document = await self.parser.fetch_sitemap(url, self.config.max_urls_per_sitemap)
+            if document is not None and document.is_sitemap:
+                self.prefetched[url] = document
                 return url
         except Exception as e:
             self.logger.warning(f"Failed to parse sitemap at {url}: {e}")
         return None
 
+    def take_prefetched(self, url: str) -> SitemapDocument | None:
+        return self.prefetched.pop(url, None)
+
 
 class SitemapDiscoveryProcessor(QueueProcessor[str, str]):
-    def __init__(self, base_url: str):
+    """Walks sitemap indexes and collects page URLs.
+
+    With a ``state``, child sitemaps whose ``lastmod`` in the parent index matches the previous
+    run are not fetched; their stored entries are reused. With ``since`` (a UTC timestamp), only
+    URLs modified or first seen at or after it are returned, and child sitemaps the index marks
+    as older are skipped. ``on_url`` is called with each new URL as soon as its sitemap is read.
+    """
+
+    metrics_name = "sitemap"
+
+    def __init__(self, base_url: str, checkpoint: Optional[CheckpointStore] = None,
+                 robots: Optional[RobotsCache] = None, state: Optional[SitemapState] = None,
+                 since: Optional[float] = None, session: Optional[HttpSession] = None,
+                 on_url: Optional[Callable[[str], None]] = None):
         self.base_url = normalize_base_url(base_url)
         self.config = get_sitemap_config()
         self.logger = setup_logger(__name__)
-
-        self.client = httpx.AsyncClient(
-            headers=self.config.headers,
-            timeout=self.config.timeout,
-            http2=True,
-            follow_redirects=True,
-            limits=httpx.Limits(max_connections=50, max_keepalive_connections=25)
-        )
-        self.parser = SitemapParser(self.client)
+        self.state = state
+        self.since = since
+        # lastmod of each child sitemap as listed by its parent index.
+        self.advertised: Dict[str, Optional[str]] = {}
+        self.fetched = 0
+        self.reused = 0
+        self.on_url = on_url
+        self.emitted = 0
+
+        self._owns_session = session is None
+        self.session = session or HttpSession()
+        self.client = self.session.client("sitemap", headers=self.config.headers,
+                                          timeout=self.config.timeout, follow_redirects=True)
+        self.parser = SitemapParser(self.client, self.config.max_sitemap_bytes)
         self.url_collector = SitemapUrlCollector(self.parser, self.config)
-        self.url_discoverer = SitemapUrlDiscoverer(self.client, self.config)
+        self.url_discoverer = SitemapUrlDiscoverer(self.client, self.config, self.parser, robots)
 
-        super().__init__(self.config.concurrency, self.config.worker_timeout)
+        super().__init__(self.config.concurrency, self.config.worker_timeout, checkpoint,
+                         self._emit if on_url is not None else None)
 
     async def discover_urls(self) -> List[str]:
-        try:
-            sitemap_urls = await self.url_discoverer.discover_sitemap_urls(self.base_url)
-        except Exception as e:
-            self.logger.warning(f"Sitemap discovery failed: {e}")
-            sitemap_urls = []
+        if self.checkpoint is not None and self.checkpoint.exists:
+            # Seed sitemaps are part of the checkpoint, so robots.txt and well-known paths are not probed again.
+            self.logger.info("Resuming sitemap processing from checkpoint")
+            sitemap_urls = [self.base_url]
+        else:
+            try:
+                sitemap_urls = await self.url_discoverer.discover_sitemap_urls(self.base_url)
+            except Exception as e:
+                self.logger.warning(f"Sitemap discovery failed: {e}")
+                sitemap_urls = []
 
         if not sitemap_urls:
             self.logger.warning("No sitemap URLs found")
             return []
 
         all_urls = await self.process_with_queue(sitemap_urls)
+        for failure in self.failures:
+            self.logger.warning(f"Sitemap {failure.item} failed after {failure.seconds:.1f}s: {failure.error}")
 
         if len(all_urls) > self.config.max_total_urls:
             self.logger.warning(
                 f"Total URLs ({len(all_urls)}) exceeds limit ({self.config.max_total_urls}), truncating")
             all_urls = set(list(all_urls)[:self.config.max_total_urls])
 
+        if self.state is not None or self.since is not None:
+            self.logger.info(f"Sitemaps fetched: {self.fetched}, reused from previous run: {self.reused}")
         self.logger.info(f"Total discovered URLs: {len(all_urls)}")
         return sorted(all_urls)
 
-    async def process_item(self, sitemap_url: str) -> Set[str]:
-        return await self.url_collector.collect_urls_from_sitemap(sitemap_url)
-
-    async def get_next_items(self, sitemap_url: str) -> List[str]:
-        return await self.parser.get_nested_sitemaps(sitemap_url)
+    def _emit(self, url: str) -> None:
+        if self.emitted < self.config.max_total_urls:
+            self.emitted += 1
+            self.on_url(url)
+
+    async def process_item(self, sitemap_url: str) -> ItemResult[str, str]:
+        advertised = self.advertised.get(sitemap_url)
+        if self.since is not None and (modified := parse_lastmod(advertised)) is not None and modified < self.since:
+            return ItemResult()
+
+        record = self.state.get(sitemap_url) if self.state is not None and advertised else None
+        if record is not None and record.lastmod == advertised:
+            document = self.state.document(record)
+            self.reused += 1
+        else:
+            document = self.url_discoverer.take_prefetched(sitemap_url)
+            if document is None:
+                document = await self.parser.fetch_sitemap(sitemap_url, self.config.max_urls_per_sitemap)
+            if document is None:
+                return ItemResult()
+            self.fetched += 1
+            if self.state is not None and document.digest is not None:
+                self.state.store(document, advertised)
+
+        for entry in document.sitemaps:
+            self.advertised[entry.loc] = entry.lastmod
+        if self.since is not None:
+            first_seen = self.state.first_seen(sitemap_url) if self.state is not None else {}
+            document.urls = [entry for entry in document.urls
+                             if is_changed_since(self.since, entry.lastmod, first_seen.get(entry.loc))]
+
+        return ItemResult(
+            results=self.url_collector.collect_urls(document),
+            next_items=[entry.loc for entry in document.sitemaps],
+        )
 
     async def close(self):
         await self.client.aclose()
+        if self._owns_session:
+            await self.session.aclose()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+        if self.state is not None:
+            self.state.close()
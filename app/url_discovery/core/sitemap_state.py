@@ -0,0 +1,126 @@
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.url_discovery.core.sitemap_parser import SitemapDocument
+from app.url_discovery.core.sitemap_xml import SITEMAPINDEX, SitemapEntry
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[float]:
+    """W3C datetime (``2024-05-01``, ``2024-05-01T10:00:00Z``, ...) as a UTC timestamp."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+@dataclass
+class SitemapRecord:
+    url: str
+    kind: Optional[str]
+    lastmod: Optional[str]
+    digest: Optional[str]
+    fetched_at: float
+
+
+class SitemapState:
+    """What each sitemap contained on the previous runs, keyed by sitemap URL.
+
+    A record keeps the ``lastmod`` its parent index advertised, the digest of the fetched body
+    and the document's entries. URLs remember when they first appeared in a sitemap, so new
+    URLs can be told apart from old ones that simply have no ``lastmod``.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, isolation_level=None)
+        self._db.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS sitemaps (
+                url TEXT PRIMARY KEY,
+                kind TEXT,
+                lastmod TEXT,
+                digest TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                sitemap TEXT NOT NULL,
+                loc TEXT NOT NULL,
+                lastmod TEXT,
+                first_seen REAL,
+                PRIMARY KEY (sitemap, loc)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def get(self, url: str) -> Optional[SitemapRecord]:
+        row = self._db.execute("SELECT url, kind, lastmod, digest, fetched_at FROM sitemaps WHERE url = ?",
+                               (url,)).fetchone()
+        return SitemapRecord(*row) if row else None
+
+    def first_seen(self, sitemap: str) -> Dict[str, Optional[float]]:
+        return dict(self._db.execute("SELECT loc, first_seen FROM entries WHERE sitemap = ?", (sitemap,)))
+
+    def document(self, record: SitemapRecord) -> SitemapDocument:
+        entries = [SitemapEntry(loc, lastmod) for loc, lastmod in self._db.execute(
+            "SELECT loc, lastmod FROM entries WHERE sitemap = ?", (record.url,))]
+        doc = SitemapDocument(url=record.url, kind=record.kind)
+        if record.kind == SITEMAPINDEX:
+            doc.sitemaps = entries
+        else:
+            doc.urls = entries
+        return doc
+
+    def store(self, document: SitemapDocument, lastmod: Optional[str]) -> None:
+        """Replace the stored entries of ``document``, keeping first-seen times of known URLs.
+
+        URLs found the first time a sitemap is stored get no first-seen time: nothing is known
+        about when they were added.
+        """
+        previous = self.get(document.url)
+        now = time.time()
+        if previous is not None and previous.digest == document.digest:
+            self._db.execute("UPDATE sitemaps SET lastmod = ?, fetched_at = ? WHERE url = ?",
+                             (lastmod, now, document.url))
+            return
+
+        known = self.first_seen(document.url)
+        entries = document.sitemaps if document.kind == SITEMAPINDEX else document.urls
+        self._db.execute("BEGIN")
+        try:
+            self._db.execute("INSERT OR REPLACE INTO sitemaps VALUES (?, ?, ?, ?, ?)",
+                             (document.url, document.kind, lastmod, document.digest, now))
+            self._db.execute("DELETE FROM entries WHERE sitemap = ?", (document.url,))
+            self._db.executemany(
+                "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+                ((document.url, e.loc, e.lastmod, known.get(e.loc) if e.loc in known
+                  else (now if previous is not None else None)) for e in entries),
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def is_changed_since(since: float, lastmod: Optional[str], first_seen: Optional[float]) -> bool:
+    # Entries with neither a lastmod nor a first-seen time may be new, so they are kept.
+    modified = parse_lastmod(lastmod)
+    if modified is not None and modified >= since:
+        return True
+    if first_seen is not None:
+        return first_seen >= since
+    return modified is None
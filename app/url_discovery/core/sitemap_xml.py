@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from lxml import etree
+
+from app.exceptions import SitemapDiscoveryError
+
+URLSET = "urlset"
+SITEMAPINDEX = "sitemapindex"
+
+_RECORD_TAGS = {URLSET: "url", SITEMAPINDEX: "sitemap"}
+_FIELDS = ("loc", "lastmod", "priority", "changefreq")
+
+
+@dataclass(frozen=True)
+class SitemapEntry:
+    loc: str
+    lastmod: Optional[str] = None
+    priority: Optional[str] = None
+    changefreq: Optional[str] = None
+
+
+def _local_name(tag) -> str:
+    if not isinstance(tag, str):
+        return ""
+    return tag.rpartition("}")[2]
+
+
+class SitemapStreamParser:
+    """Incremental sitemap reader: feed bytes as they arrive, get entries back as each record closes.
+
+    Only the record being read is kept in memory; finished records are cleared from the tree.
+    """
+
+    def __init__(self):
+        self.kind: Optional[str] = None
+        self._parser = etree.XMLPullParser(
+            events=("end",),
+            tag=tuple("{*}" + t for t in _RECORD_TAGS.values()) + tuple(_RECORD_TAGS.values()),
+            recover=True,
+            resolve_entities=False,
+            no_network=True,
+            huge_tree=True,
+            remove_comments=True,
+            remove_pis=True,
+        )
+
+    @property
+    def is_sitemap(self) -> bool:
+        return self.kind is not None
+
+    def feed(self, data: bytes) -> List[SitemapEntry]:
+        try:
+            self._parser.feed(data)
+        except etree.XMLSyntaxError as e:
+            raise SitemapDiscoveryError(f"Invalid sitemap XML: {e}")
+        return self._drain()
+
+    def close(self) -> List[SitemapEntry]:
+        try:
+            root = self._parser.close()
+        except etree.XMLSyntaxError as e:
+            raise SitemapDiscoveryError(f"Invalid sitemap XML: {e}")
+        out = self._drain()
+        if self.kind is None and root is not None:
+            self._set_kind(root)
+        return out
+
+    def iter_entries(self, content: bytes, chunk_size: int = 64 * 1024) -> Iterator[SitemapEntry]:
+        view = memoryview(content)
+        for start in range(0, len(view), chunk_size):
+            yield from self.feed(view[start:start + chunk_size].tobytes())
+        yield from self.close()
+
+    def _drain(self) -> List[SitemapEntry]:
+        out: List[SitemapEntry] = []
+        for _, elem in self._parser.read_events():
+            parent = elem.getparent()
+            if parent is None or parent.getparent() is not None:
+                continue
+            if self.kind is None:
+                self._set_kind(parent)
+            if self.kind is not None and _local_name(elem.tag) == _RECORD_TAGS[self.kind]:
+                entry = self._to_entry(elem)
+                if entry is not None:
+                    out.append(entry)
+
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+        return out
+
+    def _set_kind(self, root) -> None:
+        name = _local_name(root.tag)
+        if name in _RECORD_TAGS:
+            self.kind = name
+
+    @staticmethod
+    def _to_entry(elem) -> Optional[SitemapEntry]:
+        values = {}
+        for child in elem:
+            name = child.tag.rpartition("}")[2] if isinstance(child.tag, str) else ""
+            if name in _FIELDS and name not in values:
+                values[name] = (child.text or "").strip() or None
+        if not values.get("loc"):
+            return None
+        return SitemapEntry(**values)
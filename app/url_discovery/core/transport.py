@@ -0,0 +1,285 @@
+import asyncio
+import ipaddress
+import socket
+import time
+import typing
+import urllib.request
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+from app.config.loaders.url_discovery_config_loader import get_http_cache_config, get_transport_config
+from app.config.models.app_config_model import HttpCacheConfig, TransportConfig
+from app.logging.logger import setup_logger
+from app.url_discovery.core.http_cache import CachingTransport, HttpCacheStore
+from app.url_discovery.core.metrics import Metrics, get_metrics
+
+
+class DnsCache:
+    """Resolved addresses per (host, port), kept for ``ttl`` seconds.
+
+    Concurrent lookups of the same name share one ``getaddrinfo`` call.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self.lookups = 0
+        self.hits = 0
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._pending: Dict[Tuple[str, int], asyncio.Future] = {}
+        self.metrics = get_metrics()
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            self.lookups += 1
+            start = time.perf_counter()
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            self.metrics.observe("dns_seconds", time.perf_counter() - start, host=host)
+            addresses = list(dict.fromkeys(info[4][0] for info in infos))
+            self._entries[key] = (time.monotonic() + self.ttl, addresses)
+            future.set_result(addresses)
+            return addresses
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Marks it retrieved for when nobody else is waiting.
+            raise
+        finally:
+            del self._pending[key]
+
+
+class _CountingStream(httpcore.AsyncNetworkStream):
+    def __init__(self, inner: httpcore.AsyncNetworkStream, backend: "CachingNetworkBackend"):
+        self._inner = inner
+        self._backend = backend
+
+    async def read(self, max_bytes: int, timeout: Optional[float] = None) -> bytes:
+        return await self._inner.read(max_bytes, timeout)
+
+    async def write(self, buffer: bytes, timeout: Optional[float] = None) -> None:
+        await self._inner.write(buffer, timeout)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    async def start_tls(self, ssl_context, server_hostname: Optional[str] = None,
+                        timeout: Optional[float] = None) -> httpcore.AsyncNetworkStream:
+        self._backend.tls_handshakes += 1
+        start = time.perf_counter()
+        stream = await self._inner.start_tls(ssl_context, server_hostname, timeout)
+        self._backend.metrics.observe("tls_seconds", time.perf_counter() - start, host=server_hostname)
+        return _CountingStream(stream, self._backend)
+
+    def get_extra_info(self, info: str) -> typing.Any:
+        return self._inner.get_extra_info(info)
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend that resolves hosts through a :class:`DnsCache` and counts connections."""
+
+    def __init__(self, dns: DnsCache, inner: Optional[httpcore.AsyncNetworkBackend] = None):
+        self.dns = dns
+        self.inner = inner or httpcore.AnyIOBackend()
+        self.connections = 0
+        self.tls_handshakes = 0
+        self.metrics = get_metrics()
+
+    async def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                          local_address: Optional[str] = None,
+                          socket_options: typing.Optional[typing.Iterable] = None) -> httpcore.AsyncNetworkStream:
+        try:
+            ipaddress.ip_address(host)
+            addresses = [host]
+        except ValueError:
+            try:
+                addresses = await self.dns.resolve(host, port)
+            except OSError as e:
+                raise httpcore.ConnectError(f"DNS lookup failed for {host}: {e}") from e
+
+        error: Optional[Exception] = None
+        for address in addresses:
+            start = time.perf_counter()
+            try:
+                stream = await self.inner.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                self.metrics.inc("connect_errors_total", host=host)
+                error = e
+                continue
+            self.metrics.observe("connect_seconds", time.perf_counter() - start, host=host)
+            self.connections += 1
+            return _CountingStream(stream, self)
+        raise error or httpcore.ConnectError(f"No addresses for {host}")
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None,
+                                  socket_options: typing.Optional[typing.Iterable] = None):
+        return await self.inner.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self.inner.sleep(seconds)
+
+
+class _PooledTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, limits: httpx.Limits, http2: bool,
+                 verify: typing.Union[bool, str]):
+        super().__init__(verify=verify, http2=http2, limits=limits)
+        # httpx has no public hook for the network backend, so the pool is rebuilt around ours.
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(verify=verify),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=backend,
+        )
+
+
+class _ProxyRouter(httpx.AsyncBaseTransport):
+    """Sends requests through the proxies named by HTTP_PROXY, HTTPS_PROXY and ALL_PROXY, except
+    for NO_PROXY hosts, as httpx does for clients built without a custom transport."""
+
+    def __init__(self, direct: httpx.AsyncBaseTransport, limits: httpx.Limits, http2: bool,
+                 verify: typing.Union[bool, str]):
+        self.direct = direct
+        env = urllib.request.getproxies()
+        self.no_proxy = {"no": env["no"]} if env.get("no") else {}
+        self.proxies: Dict[str, httpx.AsyncBaseTransport] = {}
+        for scheme in ("http", "https"):
+            url = env.get(scheme) or env.get("all")
+            if url:
+                url = url if "://" in url else f"http://{url}"
+                self.proxies[scheme] = httpx.AsyncHTTPTransport(proxy=url, verify=verify, http2=http2, limits=limits)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        proxy = self.proxies.get(request.url.scheme)
+        if proxy is None or urllib.request.proxy_bypass_environment(request.url.host, self.no_proxy):
+            return await self.direct.handle_async_request(request)
+        return await proxy.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        for proxy in self.proxies.values():
+            await proxy.aclose()
+        await self.direct.aclose()
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    def __init__(self, inner: httpx.AsyncByteStream, metrics: Metrics, phase: str, host: str):
+        self._inner = inner
+        self._metrics = metrics
+        self._labels = {"phase": phase, "host": host}
+        self._start = time.perf_counter()
+        self._bytes = 0
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._inner:
+            self._bytes += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._metrics.observe("http_download_seconds", time.perf_counter() - self._start, **self._labels)
+            self._metrics.inc("http_bytes_in_total", self._bytes, **self._labels)
+        await self._inner.aclose()
+
+
+class _Borrowed(httpx.AsyncBaseTransport):
+    """Lets a per-phase client use the shared transport without closing it."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, phase: str):
+        self.inner = inner
+        self.phase = phase
+        self.metrics = get_metrics()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.metrics.enabled:
+            return await self.inner.handle_async_request(request)
+        host = request.url.host
+        start = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+        except Exception as e:
+            self.metrics.inc("http_errors_total", phase=self.phase, error=type(e).__name__)
+            raise
+        # Until the response headers: pool wait, connection setup and server time.
+        self.metrics.observe("http_wait_seconds", time.perf_counter() - start, phase=self.phase, host=host)
+        self.metrics.inc("http_responses_total", phase=self.phase, status=f"{response.status_code // 100}xx")
+        response.stream = _MeteredStream(response.stream, self.metrics, self.phase, host)
+        return response
+
+    async def aclose(self) -> None:
+        pass
+
+
+class HttpSession:
+    """Connection pool, DNS cache and optional HTTP cache shared by every phase of a run or batch.
+
+    Each phase gets its own :class:`httpx.AsyncClient` from :meth:`client` with its own headers,
+    timeout and redirect policy; all of them reuse the same connections, TLS sessions and HTTP/2
+    multiplexing. Closing a phase client leaves the session open; :meth:`aclose` closes it.
+    """
+
+    def __init__(self, cfg: Optional[TransportConfig] = None, cache_cfg: Optional[HttpCacheConfig] = None,
+                 verify: typing.Union[bool, str] = True):
+        self.cfg = cfg or get_transport_config()
+        cache_cfg = cache_cfg or get_http_cache_config()
+        self.logger = setup_logger(__name__)
+        self.dns = DnsCache(self.cfg.dns_ttl)
+        self.backend = CachingNetworkBackend(self.dns)
+        limits = httpx.Limits(max_connections=self.cfg.max_connections,
+                              max_keepalive_connections=self.cfg.max_keepalive_connections,
+                              keepalive_expiry=self.cfg.keepalive_expiry)
+        self.transport: httpx.AsyncBaseTransport = _PooledTransport(self.backend, limits, self.cfg.http2, verify)
+        # A custom transport turns off httpx's own environment proxy support, so it is done here.
+        router = _ProxyRouter(self.transport, limits, self.cfg.http2, verify)
+        if router.proxies:
+            self.logger.info(f"Using proxies from the environment for: {', '.join(sorted(router.proxies))}")
+            self.transport = router
+        if cache_cfg.enabled:
+            self.transport = CachingTransport(self.transport, HttpCacheStore(cache_cfg.path, cache_cfg.max_bytes),
+                                              cache_cfg.max_entry_bytes)
+        self.closed = False
+
+    def client(self, phase: str = "http", **kwargs) -> httpx.AsyncClient:
+        """``phase`` labels this client's requests in the metrics."""
+        return httpx.AsyncClient(transport=_Borrowed(self.transport, phase), **kwargs)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": self.backend.connections,
+            "tls_handshakes": self.backend.tls_handshakes,
+            "dns_lookups": self.dns.lookups,
+            "dns_hits": self.dns.hits,
+        }
+
+    async def aclose(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        stats = self.stats
+        self.logger.info(f"HTTP session: {stats['connections']} connections, {stats['tls_handshakes']} TLS "
+                         f"handshakes, {stats['dns_lookups']} DNS lookups ({stats['dns_hits']} cached)")
+        await self.transport.aclose()
+
+    async def __aenter__(self) -> "HttpSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
@@ -0,0 +1,158 @@
+import re
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Iterable, List, Optional, Set
+from urllib.parse import parse_qsl, urlsplit
+
+from app.config.models.app_config_model import TrapConfig
+from app.logging.logger import setup_logger
+from app.url_discovery.core.metrics import get_metrics
+from app.url_discovery.core.patterns import ParsingPatterns
+
+_NUMBER = re.compile(r"\d+")
+# Session ids carried in the path: ;jsessionid=... path parameters and ASP.NET cookieless (S(...)) segments.
+_SESSION = re.compile(r";(?:jsessionid|phpsessid|sessionid|sid)=[^/?;]*|/\(S\([^)]*\)\)", re.I)
+_DATE = re.compile(r"^((?:1[89]|2\d)\d{2})(?:[-_.](\d{1,2})(?:[-_.]\d{1,2})?)?$")
+_MONTH = re.compile(r"^(?:0?[1-9]|1[0-2])$")
+
+
+class TrapDetector:
+    """Keeps the crawler out of URL spaces that never end.
+
+    :meth:`check` rejects a new URL whose shape marks it as a trap: too deep, a path segment
+    repeated, too many query parameters or query variants of one path, a calendar date far in the
+    past or future, a session-id variant of a URL already admitted, or a listing page numbered
+    above ``max_pagination_page`` or beyond the first ``max_pagination_page`` pages seen of its
+    listing. :meth:`record` tracks how many new links the pages of each URL family (host, path with
+    numbers replaced, query keys) led to; a family whose last ``quarantine_after`` pages averaged
+    fewer than ``min_new_links`` is quarantined: its URLs are still reported, and the crawler
+    fetches them only when nothing else is left.
+    """
+
+    def __init__(self, patterns: ParsingPatterns, cfg: TrapConfig):
+        self.cfg = cfg
+        self.max_pages = patterns.max_pagination_page
+        # Single-letter hints only count as their own segment (/p/3): /p3 is as often an id as a page.
+        hints = "|".join(sorted(re.escape(h) for h in patterns.pagination_hints if len(h) > 1))
+        self._page_segment = re.compile(rf"^(?:{hints})[-_]?(\d+)$", re.I) if hints else None
+        self._page_hints = patterns.pagination_hints
+        self.max_year = time.gmtime().tm_year + cfg.max_years_ahead
+        self._query_variants: Dict[str, int] = {}
+        self._listing_pages: Dict[str, Set[str]] = {}
+        self._sessions: Set[str] = set()
+        self._yields: Dict[str, Deque[int]] = {}
+        self.quarantined: Set[str] = set()
+        self.logger = setup_logger(__name__)
+        self.metrics = get_metrics()
+
+    def check(self, url: str) -> Optional[str]:
+        """Why ``url`` is a trap, or None when it is admitted. Call once per new URL: admitted
+        URLs count towards the query-variant, pagination and session limits."""
+        if not self.cfg.enabled:
+            return None
+        reason = self._reject(url)
+        if reason is not None:
+            self.metrics.inc("crawler_traps_total", reason=reason)
+        return reason
+
+    def _reject(self, url: str) -> Optional[str]:
+        p = urlsplit(url)
+        path = p.path
+
+        session_key = None
+        if ";" in path or "(" in path:
+            stripped = _SESSION.sub("", path)
+            if stripped != path:
+                session_key = f"{p.netloc}{stripped}?{p.query}"
+                if session_key in self._sessions:
+                    return "session"
+
+        segments = [s for s in path.split("/") if s]
+        if len(segments) > self.cfg.max_depth:
+            return "depth"
+        if len(segments) > self.cfg.max_segment_repeats:
+            # Numbers repeat legitimately, as in /2024/01/01.
+            repeats = Counter(s for s in segments if not s.isdigit())
+            if repeats and max(repeats.values()) > self.cfg.max_segment_repeats:
+                return "repeat"
+
+        values: List[str] = []
+        if p.query:
+            pairs = parse_qsl(p.query, keep_blank_values=True)
+            if len({k for k, _ in pairs}) > self.cfg.max_query_keys:
+                return "query_keys"
+            values = [v for _, v in pairs]
+        if self._out_of_calendar(segments, values):
+            return "calendar"
+
+        listing = self._listing(p.netloc, segments, p.query)
+        if listing is not None:
+            key, page = listing
+            if int(page) > self.max_pages:
+                return "pagination"
+            pages = self._listing_pages.setdefault(key, set())
+            if page not in pages and len(pages) >= self.max_pages:
+                return "pagination"
+        variant_key = p.netloc + path
+        if p.query and self._query_variants.get(variant_key, 0) >= self.cfg.max_query_variants:
+            return "query_variants"
+
+        if listing is not None:
+            pages.add(page)
+        if p.query:
+            self._query_variants[variant_key] = self._query_variants.get(variant_key, 0) + 1
+        if session_key is not None:
+            self._sessions.add(session_key)
+        return None
+
+    def _out_of_calendar(self, segments: List[str], values: Iterable[str]) -> bool:
+        for i, segment in enumerate(segments):
+            m = _DATE.match(segment)
+            # A bare year only counts as a date when a month follows, as in /2087/03.
+            if m and (m.group(2) or (i + 1 < len(segments) and _MONTH.match(segments[i + 1]))):
+                if not self.cfg.min_year <= int(m.group(1)) <= self.max_year:
+                    return True
+        for value in values:
+            m = _DATE.match(value)
+            if m and m.group(2) and not self.cfg.min_year <= int(m.group(1)) <= self.max_year:
+                return True
+        return False
+
+    def _listing(self, host: str, segments: List[str], query: str) -> Optional[tuple]:
+        # Pages of one listing: /page/3, /p/3 or /page-3, keyed by the URL without the page number.
+        for i, segment in enumerate(segments):
+            if segment.lower() in self._page_hints and i + 1 < len(segments) and segments[i + 1].isdigit():
+                rest = segments[:i + 1] + ["{n}"] + segments[i + 2:]
+                return f"{host}/{'/'.join(rest)}?{query}", segments[i + 1]
+            m = self._page_segment.match(segment) if self._page_segment is not None else None
+            if m:
+                rest = segments[:i] + [segment[:m.start(1)] + "{n}"] + segments[i + 1:]
+                return f"{host}/{'/'.join(rest)}?{query}", m.group(1)
+        return None
+
+    @staticmethod
+    def family(url: str) -> str:
+        p = urlsplit(url)
+        keys = sorted({k for k, _ in parse_qsl(p.query, keep_blank_values=True)}) if p.query else ()
+        return f"{p.netloc}{_NUMBER.sub('N', p.path)}?{'&'.join(keys)}"
+
+    def is_quarantined(self, url: str) -> bool:
+        return bool(self.quarantined) and self.family(url) in self.quarantined
+
+    def record(self, url: str, new_links: int) -> None:
+        """Counts the links a fetched page added to the frontier towards its family's yield."""
+        if not self.cfg.enabled or self.cfg.quarantine_after <= 0:
+            return
+        family = self.family(url)
+        if family in self.quarantined:
+            return
+        window = self._yields.get(family)
+        if window is None:
+            window = self._yields[family] = deque(maxlen=self.cfg.quarantine_after)
+        window.append(new_links)
+        if len(window) == window.maxlen and sum(window) < self.cfg.min_new_links * len(window):
+            del self._yields[family]
+            self.quarantined.add(family)
+            self.metrics.inc("crawler_traps_total", reason="quarantine")
+            self.logger.info(f"Quarantined URL family {family}: {sum(window)} new links "
+                             f"from its last {len(window)} pages")
@@ -0,0 +1,39 @@
+import re
+from functools import lru_cache
+from typing import AbstractSet, Optional, Pattern
+
+from app.url_discovery.core.patterns import ParsingPatterns
+
+HTML = "html"
+ASSET = "asset"
+API = "api"
+
+# Every ".ext" that ends the URL or is directly followed by the query string.
+_SUFFIX = re.compile(r"\.([a-z0-9]+)(?=\?|$)")
+
+
+def classify_url(url: str, asset_extensions: AbstractSet[str], non_html_api: Pattern[str]) -> str:
+    for ext in _SUFFIX.findall(url.lower()):
+        if ext in asset_extensions:
+            return ASSET
+    if non_html_api.search(url):
+        return API
+    return HTML
+
+
+class UrlClassifier:
+    """Sorts URLs into html / asset / api once per URL and remembers the verdict."""
+
+    def __init__(self, patterns: ParsingPatterns, cache_size: int = 131072):
+        self.asset_extensions = frozenset(patterns.asset_extensions)
+        self.non_html_api = patterns.non_html_api
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _classify(self, url: str) -> str:
+        return classify_url(url, self.asset_extensions, self.non_html_api)
+
+    def is_html(self, url: Optional[str]) -> bool:
+        return bool(url) and self.classify(url) == HTML
+
+    def is_asset(self, url: Optional[str]) -> bool:
+        return bool(url) and self.classify(url) == ASSET
@@ -1,43 +1,141 @@
-from typing import List
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from urllib.parse import urlparse
 
-from app.config.loaders.url_discovery_config_loader import get_postprocess_config
+from app.config.loaders.url_discovery_config_loader import get_postprocess_config, get_checkpoint_config, \
+    get_crawler_config, get_sitemap_config
 from app.logging.logger import setup_logger
+from app.url_discovery.core.checkpoint import CheckpointStore
 from app.url_discovery.core.patterns import load_patterns
-from app.url_discovery.core.postprocess import collapse_language_variants
-from app.url_discovery.http_async_crawler import HttpAsyncCrawler
+from app.url_discovery.core.postprocess import StreamingLanguageCollapser, collapse_language_variants
+from app.url_discovery.core.robots import RobotsCache
+from app.url_discovery.core.sitemap_state import SitemapState
+from app.url_discovery.core.transport import HttpSession
+from app.url_discovery.core.url_classifier import UrlClassifier
 from app.url_discovery.sitemap_discoverer import SitemapDiscoverer
 from app.url_discovery.utils.url_utils import normalize_base_url
 
 
 class UrlDiscoveryOrchestrator:
-    def __init__(self, base_url: str, use_sitemap: bool = True):
+    def __init__(self, base_url: str, use_sitemap: bool = True, checkpoint_dir: Optional[str] = None,
+                 resume: bool = False, incremental: bool = False, since: Optional[float] = None,
+                 session: Optional[HttpSession] = None):
         self.base_url = normalize_base_url(base_url)
         self.logger = setup_logger(__name__)
         self.post_cfg = get_postprocess_config()
         self.patterns = load_patterns()
+        self.classifier = UrlClassifier(self.patterns)
         self.use_sitemap = use_sitemap
+        self.checkpoint_dir = checkpoint_dir
+        self.resume = resume
+        self.incremental = incremental
+        self.since = since
+        # Shared with the caller (e.g. a batch worker) when given, otherwise one per discover() call.
+        self.session = session
+        # Shared by both phases so each host's robots.txt is fetched and parsed once.
+        self.robots = RobotsCache((get_sitemap_config().headers or {}).get("User-Agent", ""),
+                                  get_crawler_config().max_crawl_delay)
+        # Near-duplicate pages the crawler found (alias URL -> original), filled by discover() and stream().
+        self.aliases: Dict[str, str] = {}
+
+    def _checkpoint_store(self, phase: str) -> Optional[CheckpointStore]:
+        if not self.checkpoint_dir:
+            return None
+        cfg = get_checkpoint_config()
+        store = CheckpointStore(Path(self.checkpoint_dir) / phase, cfg.flush_interval, cfg.snapshot_interval)
+        if not self.resume:
+            store.reset()
+        return store
+
+    def _sitemap_state(self) -> Optional[SitemapState]:
+        if not self.incremental:
+            return None
+        host = urlparse(self.base_url).netloc
+        return SitemapState(Path(get_sitemap_config().state_dir) / f"{host}.sqlite")
 
     async def discover(self) -> List[str]:
+        session = self.session or HttpSession()
+        try:
+            urls = await self._discover(session)
+        finally:
+            if session is not self.session:
+                await session.aclose()
+        urls = [u for u in urls if isinstance(u, str) and u.startswith(("http://", "https://"))]
+        return self._postprocess(urls)
+
+    async def stream(self) -> AsyncIterator[str]:
+        """Yield URLs as they are confirmed instead of after the whole run.
+
+        Sitemap URLs are yielded as each sitemap is read, crawled URLs once their host's
+        robots.txt allows them. Duplicates are dropped and language variants are collapsed as far
+        as a stream allows (see :class:`StreamingLanguageCollapser`).
+        """
+        collapser = StreamingLanguageCollapser(self._default_languages(), self.patterns, self.post_cfg.collapse_language_variants,
+                                               classifier=self.classifier)
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def emit(url: str) -> None:
+            if isinstance(url, str) and url.startswith(("http://", "https://")) and collapser.add(url):
+                queue.put_nowait(url)
+
+        async def run():
+            session = self.session or HttpSession()
+            try:
+                await self._discover(session, emit)
+            finally:
+                if session is not self.session:
+                    await session.aclose()
+
+        task = asyncio.create_task(run())
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (url := await queue.get()) is not None:
+                yield url
+            task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def _discover(self, session: HttpSession, on_url: Optional[Callable[[str], None]] = None) -> List[str]:
         urls: List[str] = []
+        read_sitemaps = False
 
         if self.use_sitemap:
+            discoverer = SitemapDiscoverer(self.base_url, self._checkpoint_store("sitemap"), self.robots,
+                                           self._sitemap_state(), self.since, session, on_url)
             try:
-                urls = await SitemapDiscoverer(self.base_url).discover_urls()
+                urls = await discoverer.discover_urls()
+                read_sitemaps = discoverer.read_sitemaps
             except Exception as e:
                 self.logger.warning(f"Sitemap discover failed: {e}")
+            finally:
+                await discoverer.close()
 
-        if not urls:
+        if self.since is not None and read_sitemaps:
+            # An empty result only means nothing changed since the cutoff.
+            self.logger.info(f"{len(urls)} URLs changed since the cutoff")
+        elif not urls:
             self.logger.info("No URLs from sitemap; falling back to HTTP crawler")
-            crawler = HttpAsyncCrawler(self.base_url)
-            urls = await crawler.run()
-            await crawler.close()
+            # Imported here so runs answered by sitemaps never load the crawler and its HTML parser.
+            from app.url_discovery.http_async_crawler import HttpAsyncCrawler
 
-        urls = [u for u in urls if isinstance(u, str) and u.startswith(("http://", "https://"))]
-        return self._postprocess(urls)
+            crawler = HttpAsyncCrawler(self.base_url, self._checkpoint_store("crawler"), self.robots, session,
+                                       on_url)
+            try:
+                urls = await crawler.run()
+                self.aliases = crawler.aliases
+            finally:
+                await crawler.close()
+        return urls
+
+    def _default_languages(self) -> List[str]:
+        return [""] + [l.strip().lower() for l in self.post_cfg.default_languages if l.strip()]
 
     def _postprocess(self, links: List[str]) -> List[str]:
         unique = sorted(set(links))
         if self.post_cfg.collapse_language_variants:
-            defaults = [""] + [l.strip().lower() for l in self.post_cfg.default_languages if l.strip()]
-            unique = collapse_language_variants(unique, defaults, self.patterns)
+            unique = collapse_language_variants(unique, self._default_languages(), self.patterns,
+                                                classifier=self.classifier)
         return unique
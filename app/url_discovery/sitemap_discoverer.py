@@ -1,12 +1,25 @@
+from typing import Callable, Optional
+
+from app.url_discovery.core.checkpoint import CheckpointStore
+from app.url_discovery.core.robots import RobotsCache
 from app.url_discovery.core.sitemap_processor import SitemapDiscoveryProcessor
+from app.url_discovery.core.sitemap_state import SitemapState
+from app.url_discovery.core.transport import HttpSession
 
 
 class SitemapDiscoverer:
-    def __init__(self, base_url: str):
-        self.processor = SitemapDiscoveryProcessor(base_url)
+    def __init__(self, base_url: str, checkpoint: Optional[CheckpointStore] = None,
+                 robots: Optional[RobotsCache] = None, state: Optional[SitemapState] = None,
+                 since: Optional[float] = None, session: Optional[HttpSession] = None,
+                 on_url: Optional[Callable[[str], None]] = None):
+        self.processor = SitemapDiscoveryProcessor(base_url, checkpoint, robots, state, since, session, on_url)
 
     async def discover_urls(self) -> list[str]:
         return await self.processor.discover_urls()
 
+    @property
+    def read_sitemaps(self) -> bool:
+        return self.processor.fetched + self.processor.reused > 0
+
     async def close(self):
         await self.processor.close()
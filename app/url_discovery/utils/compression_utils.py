@@ -1,20 +1,131 @@
-import gzip
+import zlib
+from typing import List, Optional
 
 import brotli
 
 from app.exceptions import SitemapDiscoveryError
 
+GZIP_MAGIC = b"\x1f\x8b"
+BROTLI_CONTENT_TYPES = ("application/x-brotli", "application/brotli")
 
-def maybe_decompress(url: str, content: bytes) -> bytes:
-    if content[:2] == b"\x1f\x8b":  # GZIP
+_GZIP_STEP = 256 * 1024
+_BROTLI_STEP = 4 * 1024
+
+
+class StreamDecompressor:
+    """Chunk-by-chunk decompressor for sitemap bodies.
+
+    The codec is picked from the first bytes (gzip magic) or, for brotli which has no magic,
+    from the URL suffix and Content-Type. Transport-level Content-Encoding is already undone by
+    httpx, so only file-level compression is handled here. ``max_bytes`` caps the decompressed
+    output to guard against decompression bombs.
+    """
+
+    def __init__(self, url: str, content_type: str = "", max_bytes: Optional[int] = None):
+        self.url = url
+        self.content_type = (content_type or "").lower()
+        self.max_bytes = max_bytes
+        self.total_out = 0
+        self.mode: Optional[str] = None
+        self._head = b""
+        self._carry = b""
+        self._gzip = None
+        self._brotli = None
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        if not chunk:
+            return []
+        if self.mode is None:
+            self._head += chunk
+            if len(self._head) < len(GZIP_MAGIC):
+                return []
+            chunk, self._head = self._head, b""
+            self._select_mode(chunk)
+
+        if self.mode == "gzip":
+            return self._feed_gzip(chunk)
+        if self.mode == "brotli":
+            return self._feed_brotli(chunk)
+        return [self._account(chunk)]
+
+    def flush(self) -> List[bytes]:
+        if self.mode is None:
+            if not self._head:
+                return []
+            chunk, self._head = self._head, b""
+            self._select_mode(chunk)
+            return self.feed(chunk)
+
+        if self.mode == "gzip":
+            if self._gzip is None:
+                return []
+            try:
+                out = [self._account(self._gzip.flush())]
+            except zlib.error as e:
+                raise SitemapDiscoveryError(f"Gzip decompression failed for {self.url}: {e}")
+            if not self._gzip.eof:
+                raise SitemapDiscoveryError(f"Gzip decompression failed for {self.url}: truncated stream")
+            return out
+        if self.mode == "brotli":
+            finish = getattr(self._brotli, "finish", None)
+            if finish is not None:
+                try:
+                    return [self._account(finish())]
+                except brotli.error as e:
+                    raise SitemapDiscoveryError(f"Brotli decompression failed for {self.url}: {e}")
+        return []
+
+    def _select_mode(self, head: bytes) -> None:
+        if head[:2] == GZIP_MAGIC:
+            self.mode = "gzip"
+        elif self.url.lower().endswith(".br") or any(ct in self.content_type for ct in BROTLI_CONTENT_TYPES):
+            self.mode = "brotli"
+            self._brotli = brotli.Decompressor()
+        else:
+            self.mode = "identity"
+
+    def _feed_gzip(self, chunk: bytes) -> List[bytes]:
+        out: List[bytes] = []
+        data, self._carry = self._carry + chunk, b""
         try:
-            return gzip.decompress(content)
-        except Exception as e:
-            raise SitemapDiscoveryError(f"Gzip decompression failed for {url}: {e}")
+            while data:
+                if self._gzip is None:
+                    # Concatenated gzip members, as produced by some sitemap generators.
+                    if len(data) < len(GZIP_MAGIC):
+                        self._carry = data
+                        break
+                    if data[:2] != GZIP_MAGIC:
+                        break
+                    self._gzip = zlib.decompressobj(wbits=31)
+                out.append(self._account(self._gzip.decompress(data, _GZIP_STEP)))
+                if self._gzip.eof:
+                    data = self._gzip.unused_data
+                    self._gzip = None
+                else:
+                    data = self._gzip.unconsumed_tail
+        except zlib.error as e:
+            raise SitemapDiscoveryError(f"Gzip decompression failed for {self.url}: {e}")
+        return out
+
+    def _feed_brotli(self, chunk: bytes) -> List[bytes]:
+        process = getattr(self._brotli, "process", None) or self._brotli.decompress
+        out: List[bytes] = []
+        view = memoryview(chunk)
+        try:
+            for start in range(0, len(view), _BROTLI_STEP):
+                out.append(self._account(process(view[start:start + _BROTLI_STEP].tobytes())))
+        except brotli.error as e:
+            raise SitemapDiscoveryError(f"Brotli decompression failed for {self.url}: {e}")
+        return out
+
+    def _account(self, piece: bytes) -> bytes:
+        self.total_out += len(piece)
+        if self.max_bytes is not None and self.total_out > self.max_bytes:
+            raise SitemapDiscoveryError(
+                f"Decompressed size of {self.url} exceeds limit of {self.max_bytes} bytes")
+        return piece
 
-    try:
-        return brotli.decompress(content)
-    except brotli.error:
-        pass
 
-    return content
+def maybe_decompress(url: str, content: bytes, content_type: str = "") -> bytes:
+    decompressor = StreamDecompressor(url, content_type)
+    return b"".join(decompressor.feed(content) + decompressor.flush())
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import get_context
+
+from app.url_discovery.batch import run_batch
+from benchmarks.common import save_results
+from benchmarks.host_scheduler import wait_for_port
+from benchmarks.sitemap_incremental import SitemapSite
+
+
+def serve_sites(base_port: int, sites: int, children: int, urls_per_child: int) -> None:
+    async def serve():
+        servers = [SitemapSite(base_port + i, children, urls_per_child, 0) for i in range(sites)]
+        await asyncio.gather(*(s.serve(base_port + i) for i, s in enumerate(servers)))
+
+    asyncio.run(serve())
+
+
+def per_process(domains, parallel: int) -> float:
+    # One interpreter per domain, as when run_orchestrator.py is driven from a shell loop.
+    def run(domain):
+        subprocess.run([sys.executable, "-m", "scripts.run_orchestrator", domain],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        list(pool.map(run, domains))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Domains/hour: one process per domain vs the batch runner")
+    parser.add_argument("--base-port", type=int, default=8800)
+    parser.add_argument("--domains", type=int, default=48)
+    parser.add_argument("--children", type=int, default=4, help="Child sitemaps per domain")
+    parser.add_argument("--urls-per-child", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-concurrent-domains", type=int, default=32)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    proc = get_context("spawn").Process(
+        target=serve_sites, args=(args.base_port, args.domains, args.children, args.urls_per_child), daemon=True)
+    proc.start()
+    try:
+        for i in range(args.domains):
+            wait_for_port(args.base_port + i)
+        domains = [f"http://127.0.0.1:{args.base_port + i}" for i in range(args.domains)]
+
+        baseline = per_process(domains, args.workers)
+        logging.disable(logging.INFO)
+        counts = []
+        stats = run_batch(domains, lambda r: counts.append(len(r.urls)), args.workers, args.max_concurrent_domains,
+                          log_level=logging.CRITICAL + 1)
+    finally:
+        proc.terminate()
+        proc.join()
+
+    results = {
+        "domains": args.domains,
+        "workers": args.workers,
+        "per_process": {"seconds": round(baseline, 3), "domains_per_hour": round(args.domains * 3600 / baseline)},
+        "batch": {"seconds": stats.seconds, "domains_per_hour": round(stats.domains_per_hour),
+                  "failed": stats.failed, "urls": stats.urls},
+        "expected_urls": args.domains * args.children * args.urls_per_child,
+    }
+    save_results("batch", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from app.url_discovery.core.checkpoint import CheckpointStore
+from app.url_discovery.core.crawler import HttpAsyncCrawler
+from benchmarks.common import save_results
+
+
+def make_handler(pages: int, fanout: int):
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        i = int(path[2:]) if path.startswith("/p") else 0
+        links = "".join(f'<a href="/p{(i * 31 + k * 7 + 1) % pages}">link {k}</a>' for k in range(fanout))
+        body = f"<html><head><title>p{i}</title></head><body><nav><a href=\"/\">home</a></nav>{links}</body></html>"
+        return httpx.Response(200, content=body.encode(), headers={"content-type": "text/html; charset=utf-8"})
+    return handler
+
+
+async def crawl(pages: int, fanout: int, store: Optional[CheckpointStore]) -> dict:
+    crawler = HttpAsyncCrawler("https://bench.example", store)
+    crawler.cfg = crawler.cfg.model_copy(update={"max_pages": pages})
+    await crawler.client.aclose()
+    crawler.client = httpx.AsyncClient(transport=httpx.MockTransport(make_handler(pages, fanout)))
+
+    # One page at a time through the crawler's own bookkeeping, so only checkpoint cost differs between runs.
+    start = time.perf_counter()
+    await crawler._prepare()
+    fetched = 0
+    while (len(crawler.frontier) or crawler.scheduler.parked) and fetched < pages:
+        host, url = await crawler._next_url()
+        try:
+            done = await crawler._crawl_one(host, url)
+        finally:
+            crawler._release(url, done)
+        fetched += 1
+    if store is not None:
+        store.write_snapshot(crawler._checkpoint_state(complete=True))
+    elapsed = time.perf_counter() - start
+    found = len(crawler.found)
+    await crawler.close()
+    return {"pages": fetched, "found": found, "seconds": round(elapsed, 4),
+            "pages_per_sec": round(fetched / elapsed, 1) if elapsed else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl throughput with and without checkpointing")
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--fanout", type=int, default=40, help="Links per synthetic page")
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    parser.add_argument("--snapshot-interval", type=float, default=5.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    baseline, checkpointed = [], []
+    restore_seconds = 0.0
+    for _ in range(args.rounds):
+        baseline.append(asyncio.run(crawl(args.pages, args.fanout, None)))
+
+        directory = Path(tempfile.mkdtemp(prefix="smartcrawl-checkpoint-bench-"))
+        try:
+            store = CheckpointStore(directory, args.flush_interval, args.snapshot_interval)
+            checkpointed.append(asyncio.run(crawl(args.pages, args.fanout, store)))
+
+            start = time.perf_counter()
+            snapshot, records = CheckpointStore(directory).load()
+            restore_seconds = time.perf_counter() - start
+            snapshot_kb = (directory / CheckpointStore.SNAPSHOT).stat().st_size / 1024
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    best_base = max(baseline, key=lambda r: r["pages_per_sec"])
+    best_ckpt = max(checkpointed, key=lambda r: r["pages_per_sec"])
+    overhead = 1 - best_ckpt["pages_per_sec"] / best_base["pages_per_sec"]
+    results = {
+        "baseline": best_base,
+        "checkpointed": best_ckpt,
+        "overhead_pct": round(overhead * 100, 2),
+        "snapshot_kb": round(snapshot_kb, 1),
+        "load_seconds": round(restore_seconds, 4),
+    }
+    save_results("checkpoint", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import json
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+def _peak_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(setup: Callable[..., Any], run: Callable[[Any], int], args: tuple) -> Dict[str, float]:
+    data = setup(*args)
+    rss_before = _peak_rss_kb()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    count = run(data)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    return {
+        "items": count,
+        "seconds": round(elapsed, 4),
+        "cpu_seconds": round(cpu, 4),
+        "items_per_sec": round(count / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_delta_mb": round((_peak_rss_kb() - rss_before) / 1024, 2),
+    }
+
+
+def measure_isolated(setup: Callable[..., Any], run: Callable[[Any], int], *args) -> Dict[str, float]:
+    # Fresh interpreter per measurement so peak RSS is not polluted by earlier runs.
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as ex:
+        return ex.submit(_measure, setup, run, args).result()
+
+
+def _call(fn: Callable[..., Dict[str, Any]], args: tuple) -> Dict[str, Any]:
+    cpu_start = time.process_time()
+    result = fn(*args)
+    result["cpu_seconds"] = round(time.process_time() - cpu_start, 4)
+    result["peak_rss_mb"] = round(_peak_rss_kb() / 1024, 1)
+    return result
+
+
+def run_isolated(fn: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+    # Like measure_isolated, for functions that report their own figures: adds the CPU time and
+    # the peak RSS of the fresh interpreter they ran in.
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as ex:
+        return ex.submit(_call, fn, args).result()
+
+
+def save_results(name: str, results: Dict[str, Any], output: Optional[str]) -> None:
+    payload = {"benchmark": name, "timestamp": time.time(), "results": results}
+    text = json.dumps(payload, indent=2)
+    print(text)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
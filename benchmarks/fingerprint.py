@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List
+
+import httpx
+
+from app.url_discovery.core.crawler import HttpAsyncCrawler
+from app.url_discovery.core.fingerprint import FingerprintIndex
+from app.url_discovery.core.html_parsing import parse_page
+from app.url_discovery.core.parse_executor import make_parse_executor
+from app.url_discovery.core.patterns import load_patterns
+from benchmarks.common import save_results
+
+START_URL = "https://dup.example"
+SORTS = ["name", "price", "date", "rating"]
+PER_LIST = 20
+
+
+def _vocabulary(size: int = 2000) -> List[str]:
+    rnd = random.Random(5)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rnd.choice(letters) for _ in range(rnd.randint(3, 10))) for _ in range(size)]
+
+
+VOCABULARY = _vocabulary()
+
+
+def product_text(i: int, words: int = 200) -> List[str]:
+    return random.Random(i).choices(VOCABULARY, k=words)
+
+
+def html_page(text: str, links: List[str], chrome: bool = True) -> bytes:
+    anchors = "".join(f'<a href="{href}">x</a>' for href in links)
+    nav = '<nav><a href="/">Home</a> shop deals account basket help</nav>' if chrome else ""
+    footer = "<footer>Copyright shop terms privacy cookies</footer>" if chrome else ""
+    return f"<html><body>{nav}<main><p>{text}</p>{anchors}</main>{footer}</body></html>".encode()
+
+
+def make_handler(products: int):
+    """A shop of ``products`` product pages, each also served as a printable view, listed by
+    pages of ``PER_LIST`` products in four sort orders.
+
+    The print view of a product and the sort orders of one listing page carry the same text, so
+    all but the first of them are near-duplicates. Print views link only to print views of
+    related products, one URL per referring product, so duplicates lead to ever more duplicates.
+    """
+    lists = (products + PER_LIST - 1) // PER_LIST
+
+    def respond(body: bytes) -> httpx.Response:
+        return httpx.Response(200, content=body, headers={"content-type": "text/html; charset=utf-8"})
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        parts = [p for p in request.url.path.split("/") if p]
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        if not parts:
+            return respond(html_page("Welcome", [f"/list/0?sort={s}" for s in SORTS]))
+        if parts[0] == "list":
+            n, sort = int(parts[1]), request.url.params.get("sort", "name")
+            items = list(range(n * PER_LIST, min(products, (n + 1) * PER_LIST)))
+            random.Random(f"{n}-{sort}").shuffle(items)
+            names = " ".join(" ".join(product_text(i)[:5]) for i in items)
+            links = [f"/product/{i}" for i in items] + [f"/list/{n}?sort={s}" for s in SORTS]
+            if n + 1 < lists:
+                links.append(f"/list/{n + 1}?sort={sort}")
+            return respond(html_page(names, links))
+        i = int(parts[1])
+        related = [(i * 7 + k) % products for k in range(1, 4)]
+        if request.url.params.get("view") == "print":
+            return respond(html_page(" ".join(product_text(i)),
+                                     [f"/product/{j}?from={i}&view=print" for j in related], chrome=False))
+        return respond(html_page(" ".join(product_text(i)),
+                                 [f"/product/{i}?view=print"] + [f"/product/{j}" for j in related]))
+
+    return handler
+
+
+def is_original(url: str) -> bool:
+    path = url.split("://", 1)[-1].partition("/")[2]
+    return path.startswith("product/") and "?" not in path
+
+
+async def crawl(products: int, max_pages: int, mode: str) -> Dict[str, float]:
+    crawler = HttpAsyncCrawler(START_URL)
+    fingerprint = crawler.cfg.fingerprint.model_copy(update={"enabled": mode != "off"})
+    if mode != "off":
+        fingerprint = fingerprint.model_copy(update={"alias_links": mode})
+    crawler.cfg = crawler.cfg.model_copy(update={"max_pages": max_pages, "verbose": False,
+                                                 "parse_executor": "inline", "fingerprint": fingerprint})
+    crawler.fingerprints = FingerprintIndex(fingerprint.max_distance) if fingerprint.enabled else None
+    await crawler.parse_executor.close()
+    crawler.parse_executor = make_parse_executor(crawler.cfg, crawler.patterns, crawler.normalizer,
+                                                 crawler.classifier)
+    await crawler.client.aclose()
+    crawler.client = httpx.AsyncClient(transport=httpx.MockTransport(make_handler(products)))
+    start = time.perf_counter()
+    try:
+        found = await crawler.run()
+    finally:
+        await crawler.close()
+    return {
+        "fetched": len(crawler.seen),
+        "products_fetched": sum(1 for u in crawler.seen if is_original(u)),
+        "found": len(found),
+        "aliases": len(crawler.aliases),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def cost(pages: int, words: int, links: int, rounds: int) -> Dict[str, float]:
+    """Per-page time of parse_page with and without the fingerprint, fastest of ``rounds``."""
+    patterns = load_patterns()
+    docs = [(f"https://dup.example/p{i}",
+             html_page(" ".join(product_text(i, words)), [f"/p{(i + k) % pages}" for k in range(links)]))
+            for i in range(pages)]
+
+    def best(fingerprint: bool) -> float:
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for url, html in docs:
+                parse_page(url, html, False, True, patterns, fingerprint=fingerprint)
+            times.append(time.perf_counter() - start)
+        return min(times) / pages * 1000
+
+    parse_ms, with_fp_ms = best(False), best(True)
+    return {
+        "words": words,
+        "links": links,
+        "parse_ms": round(parse_ms, 3),
+        "parse_with_fingerprint_ms": round(with_fp_ms, 3),
+        "fingerprint_ms": round(with_fp_ms - parse_ms, 3),
+        "overhead_pct": round((with_fp_ms / parse_ms - 1) * 100, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fingerprint cost per page, and a crawl of a shop full of "
+                                                 "duplicate print and sort views with and without dedupe")
+    parser.add_argument("--products", type=int, default=500, help="Product pages on the site")
+    parser.add_argument("--max-pages", type=int, default=600, help="Crawler page budget")
+    parser.add_argument("--pages", type=int, default=200, help="Pages per cost measurement")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = {
+        "cost": [cost(args.pages, words, links, args.rounds) for words, links in ((200, 20), (2000, 100))],
+        "products": args.products,
+        "max_pages": args.max_pages,
+        "crawl": {mode: asyncio.run(crawl(args.products, args.max_pages, mode)) for mode in ("off", "lower", "skip")},
+    }
+    save_results("fingerprint", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
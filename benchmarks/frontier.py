@@ -0,0 +1,74 @@
+import argparse
+import random
+import resource
+import time
+
+from app.url_discovery.core.frontier import CrawlFrontier
+from benchmarks.common import save_results
+
+
+def percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push synthetic URLs through the disk-spilling frontier")
+    parser.add_argument("--urls", type=int, default=10000000)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3, help="Share of pushes that repeat a URL")
+    parser.add_argument("--hot-capacity", type=int, default=100000)
+    parser.add_argument("--dir", help="Directory for the spill-tier SQLite file (default: system temp dir)")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    frontier = CrawlFrontier(args.dir, hot_capacity=args.hot_capacity)
+    rss_samples = []
+
+    start = time.perf_counter()
+    unique = 0
+    for i in range(args.urls):
+        if unique and rng.random() < args.duplicate_ratio:
+            n = rng.randrange(unique)
+        else:
+            n = unique
+            unique += 1
+        frontier.push(5 + (n % 16) * 5, f"https://example.com/section-{n % 997}/item-{n}")
+        if i % 1000000 == 0:
+            rss_samples.append(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024)
+    push_seconds = time.perf_counter() - start
+    queued = len(frontier)
+    spilled = frontier.spilled
+
+    latencies = []
+    start = time.perf_counter()
+    popped = 0
+    while True:
+        t = time.perf_counter()
+        item = frontier.pop()
+        if popped % 100 == 0:
+            latencies.append(time.perf_counter() - t)
+        if item is None:
+            break
+        popped += 1
+    pop_seconds = time.perf_counter() - start
+    frontier.close()
+
+    results = {
+        "pushes": args.urls,
+        "unique_queued": queued,
+        "spilled_to_disk": spilled,
+        "push_per_sec": round(args.urls / push_seconds, 1),
+        "pop_per_sec": round(popped / pop_seconds, 1) if pop_seconds else 0.0,
+        "pop_latency_p50_us": round(percentile(latencies, 0.5) * 1e6, 2),
+        "pop_latency_p99_us": round(percentile(latencies, 0.99) * 1e6, 2),
+        "peak_rss_mb_by_million_pushes": rss_samples,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+    }
+    save_results("frontier", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import logging
+import socket
+import time
+from multiprocessing import get_context
+from typing import Optional
+
+import httpx
+
+from app.url_discovery.core.crawler import HttpAsyncCrawler
+from app.url_discovery.core.host_scheduler import HostScheduler
+from benchmarks.common import save_results
+from benchmarks.server import DEFAULT_HOSTS, run_server
+
+
+class LocalRouting(httpx.AsyncBaseTransport):
+    """Sends every request to the local test server; the Host header still names the virtual host."""
+
+    def __init__(self, port: int, inner: Optional[httpx.AsyncBaseTransport] = None, host: str = "127.0.0.1",
+                 scheme: str = "http"):
+        self.port = port
+        self.host = host
+        self.scheme = scheme
+        self._inner = inner or httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(scheme=self.scheme, host=self.host, port=self.port)
+        return await self._inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Test server did not start on port {port}")
+
+
+async def crawl(port: int, start_url: str, pages: int, concurrency: int, adaptive: bool,
+                per_host: float, max_per_host: float) -> dict:
+    crawler = HttpAsyncCrawler(start_url)
+    crawler.cfg = crawler.cfg.model_copy(update={"max_pages": pages, "concurrency": concurrency, "verbose": False})
+    if adaptive:
+        crawler.scheduler = HostScheduler(concurrency, per_host, max_per_host,
+                                          latency_factor=crawler.cfg.latency_factor)
+    else:
+        # Equivalent of the old single global semaphore.
+        crawler.scheduler = HostScheduler(concurrency, concurrency, concurrency, adaptive=False)
+    await crawler.client.aclose()
+    crawler.client = httpx.AsyncClient(transport=LocalRouting(port), timeout=30.0)
+
+    start = time.perf_counter()
+    found = await crawler.run()
+    elapsed = time.perf_counter() - start
+    stats = (await crawler.client.get(f"{start_url}/__stats")).json()
+    await crawler.close()
+    return {
+        "pages": len(crawler.seen),
+        "found": len(found),
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(len(crawler.seen) / elapsed, 1) if elapsed else 0.0,
+        "served_per_host": stats["served"],
+        "throttled_per_host": stats["throttled"],
+        "peak_concurrency_per_host": stats["peak"],
+    }
+
+
+def run_mode(args, adaptive: bool) -> dict:
+    proc = get_context("spawn").Process(target=run_server,
+                                        args=(args.hosts, args.port, args.pages_per_host, args.fanout), daemon=True)
+    proc.start()
+    try:
+        wait_for_port(args.port)
+        start_url = f"http://{args.hosts[0].split(':')[0]}"
+        return asyncio.run(crawl(args.port, start_url, args.pages, args.concurrency, adaptive,
+                                 args.per_host_concurrency, args.max_per_host_concurrency))
+    finally:
+        proc.terminate()
+        proc.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Global semaphore vs per-host adaptive scheduling on a multi-host site")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--host", action="append", dest="hosts",
+                        help="name[:latency_ms[:max_concurrent[:crawl_delay]]], repeatable; first host is the start")
+    parser.add_argument("--pages", type=int, default=3000, help="Crawler max_pages")
+    parser.add_argument("--pages-per-host", type=int, default=2000)
+    parser.add_argument("--fanout", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=30)
+    parser.add_argument("--per-host-concurrency", type=float, default=2.0, help="Starting per-host limit")
+    parser.add_argument("--max-per-host-concurrency", type=float, default=8.0, help="Per-host cap")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+    args.hosts = args.hosts or DEFAULT_HOSTS
+
+    logging.disable(logging.INFO)
+    results = {"global_semaphore": run_mode(args, adaptive=False), "per_host_adaptive": run_mode(args, adaptive=True)}
+    results["speedup"] = round(results["per_host_adaptive"]["pages_per_sec"]
+                               / max(0.1, results["global_semaphore"]["pages_per_sec"]), 2)
+    save_results("host_scheduler", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import logging
+import shutil
+import tempfile
+import time
+from multiprocessing import get_context
+from typing import Optional
+
+import httpx
+
+from app.url_discovery.core.crawler import HttpAsyncCrawler
+from app.url_discovery.core.http_cache import CachingTransport, HttpCacheStore
+from benchmarks.common import save_results
+from benchmarks.host_scheduler import LocalRouting, wait_for_port
+from benchmarks.server import run_server
+
+HOSTS = ["bench.test:20", "a.bench.test:20", "b.bench.test:20"]
+
+
+async def crawl(port: int, pages: int, cache_dir: Optional[str]) -> dict:
+    start_url = f"http://{HOSTS[0].split(':')[0]}"
+    crawler = HttpAsyncCrawler(start_url)
+    crawler.cfg = crawler.cfg.model_copy(update={"max_pages": pages, "verbose": False})
+    await crawler.client.aclose()
+    transport = LocalRouting(port)
+    if cache_dir is not None:
+        transport = CachingTransport(transport, HttpCacheStore(cache_dir))
+    crawler.client = httpx.AsyncClient(transport=transport, timeout=30.0)
+
+    start = time.perf_counter()
+    found = await crawler.run()
+    elapsed = time.perf_counter() - start
+    stats = (await crawler.client.get(f"{start_url}/__stats")).json()
+    result = {
+        "pages": len(crawler.seen),
+        "found": len(found),
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(len(crawler.seen) / elapsed, 1) if elapsed else 0.0,
+        "server_bytes_sent": stats["bytes_sent"],
+        "full_responses": sum(stats["served"].values()),
+        "not_modified": sum(stats["not_modified"].values()),
+    }
+    if isinstance(transport, CachingTransport):
+        result.update(cache_hits=transport.hits, cache_misses=transport.misses,
+                      bytes_from_cache=transport.bytes_from_cache, bytes_from_network=transport.bytes_from_network)
+    await crawler.close()
+    return result
+
+
+def run(args, cache_dir: Optional[str]) -> dict:
+    proc = get_context("spawn").Process(
+        target=run_server, args=(HOSTS, args.port, args.pages_per_host, 20, args.page_kb, args.bandwidth), daemon=True)
+    proc.start()
+    try:
+        wait_for_port(args.port)
+        return asyncio.run(crawl(args.port, args.pages, cache_dir))
+    finally:
+        proc.terminate()
+        proc.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repeat crawl of an unchanged site with and without the HTTP cache")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--pages", type=int, default=600, help="Crawler max_pages")
+    parser.add_argument("--pages-per-host", type=int, default=300)
+    parser.add_argument("--page-kb", type=int, default=60, help="Page size added as filler text")
+    parser.add_argument("--bandwidth", type=float, default=500_000, help="Bytes/s per response")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    cache_dir = tempfile.mkdtemp(prefix="smartcrawl-http-cache-bench-")
+    try:
+        results = {
+            "no_cache": run(args, None),
+            "cold_cache": run(args, cache_dir),
+            "warm_cache": run(args, cache_dir),
+        }
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    results["warm_bytes_ratio"] = round(results["warm_cache"]["server_bytes_sent"]
+                                        / max(1, results["no_cache"]["server_bytes_sent"]), 4)
+    results["warm_speedup"] = round(results["no_cache"]["seconds"] / max(1e-9, results["warm_cache"]["seconds"]), 2)
+    save_results("http_cache", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
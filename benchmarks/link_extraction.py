@@ -0,0 +1,89 @@
+import argparse
+import time
+from typing import List, Tuple
+
+from app.url_discovery.core.html_parsing import extract_links, extract_links_bs4
+from app.url_discovery.core.patterns import load_patterns
+from benchmarks.common import save_results
+
+BASE_URL = "https://example.com/blog/post-1"
+
+# (name, html) pairs covering the cases the extractors have to agree on.
+PARITY_CORPUS: List[Tuple[str, str]] = [
+    ("anchors", '<a href="/about">About</a><a href="contact.html#team">C</a><a href="">empty</a><a>none</a>'),
+    ("link_rel", '<head><link rel="next" href="?page=2"><link rel="stylesheet" href="/s.css"></head>'),
+    ("aria_next", '<a aria-label="Next page" href="/blog/page/2/">Next</a>'),
+    ("schemes", '<a href="mailto:a@b.c">m</a><a href="tel:1">t</a><a href="javascript:void(0)">j</a>'
+                '<a href="//cdn.example.com/x">p</a><a href="ftp://example.com/f">f</a>'),
+    ("query", '<a href="/search?q=shoes&utm_source=x&page=3">s</a><a href="/list?offset=20&sort=asc">l</a>'),
+    ("assets", '<img src="/i.png" srcset="/i-2x.png 2x, /i-3x.png 3x"><script src="/app.js"></script>'
+               '<iframe src="/embed"></iframe><video src="/v.mp4"></video><audio src="/a.mp3"></audio>'
+               '<picture><source src="/s.webp" srcset="/s1.webp 1x"></picture>'),
+    ("script_urls", '<script>var u = "https://example.com/from-script"; fetch("https:\\/\\/example.com\\/api\\/x");'
+                    '</script><script type="application/ld+json">{"url": "https://example.com/ld"}</script>'),
+    ("entities", '<a href="/a?x=1&amp;y=2">e</a><a href=" /spaced ">s</a><a href="/%7Euser/">u</a>'),
+    ("unicode", '<meta charset="utf-8"><a href="/kategorija/обувки">k</a><a href="/café">c</a>'),
+    ("broken", '<div><a href="/unclosed"><p>text<a href="/second">'),
+    ("www_port", '<a href="https://www.example.com:443/x">w</a><a href="http://example.com:80/y">h</a>'),
+]
+
+
+def synthetic_page(links: int, size_kb: int) -> str:
+    nav = "".join(f'<li><a href="/section-{i % 20}/item-{i}">Item {i}</a></li>' for i in range(links))
+    filler = "<p>" + ("lorem ipsum dolor sit amet " * 40) + "</p>"
+    body = nav + filler * max(1, (size_kb * 1024) // len(filler))
+    script = '<script>window.cfg = {"home": "https://example.com/", "feed": "https://example.com/feed"};</script>'
+    return f"<html><head><title>t</title>{script}</head><body><ul>{body}</ul></body></html>"
+
+
+def check_parity(patterns) -> List[str]:
+    mismatches = []
+    for name, html in PARITY_CORPUS:
+        for include_assets, html_only in ((False, True), (True, False), (False, False)):
+            expected = extract_links_bs4(BASE_URL, html, include_assets, html_only, patterns)
+            for source in (html, html.encode("utf-8")):
+                got = extract_links(BASE_URL, source, include_assets, html_only, patterns)
+                if got != expected:
+                    mismatches.append(f"{name} assets={include_assets} html_only={html_only} "
+                                      f"{type(source).__name__}: missing={expected - got} extra={got - expected}")
+    return mismatches
+
+
+def time_extractor(fn, html, patterns, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(BASE_URL, html, False, True, patterns)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Link extraction parity check and benchmark")
+    parser.add_argument("--links", type=int, default=300, help="Anchors per synthetic page")
+    parser.add_argument("--size-kb", type=int, default=500, help="Approximate synthetic page size")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    patterns = load_patterns()
+    mismatches = check_parity(patterns)
+
+    page = synthetic_page(args.links, args.size_kb)
+    page_bytes = page.encode("utf-8")
+    bs4_sec = time_extractor(extract_links_bs4, page, patterns, args.rounds)
+    lxml_sec = time_extractor(extract_links, page_bytes, patterns, args.rounds)
+
+    results = {
+        "parity_cases": len(PARITY_CORPUS),
+        "parity_mismatches": mismatches,
+        "page_bytes": len(page_bytes),
+        "bs4_ms_per_page": round(bs4_sec * 1000, 3),
+        "lxml_ms_per_page": round(lxml_sec * 1000, 3),
+        "speedup": round(bs4_sec / lxml_sec, 2) if lxml_sec else None,
+    }
+    save_results("link_extraction", results, args.output)
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
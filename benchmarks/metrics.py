@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import logging
+import time
+from multiprocessing import get_context
+
+from app.url_discovery.core.metrics import Metrics, NullMetrics, set_metrics
+from app.url_discovery.core.transport import HttpSession
+from app.url_discovery.http_async_crawler import HttpAsyncCrawler
+from benchmarks.common import save_results
+from benchmarks.host_scheduler import LocalRouting, wait_for_port
+from benchmarks.server import run_server
+from benchmarks.worker_pool import TreeProcessor
+
+HOSTS = ["bench.test:0", "a.bench.test:0", "b.bench.test:0"]
+
+
+async def crawl(port: int, pages: int) -> float:
+    session = HttpSession()
+    session.transport = LocalRouting(port, session.transport)
+    crawler = HttpAsyncCrawler("http://bench.test", session=session)
+    crawler.cfg = crawler.cfg.model_copy(update={"max_pages": pages, "verbose": False, "obey_robots": False})
+    start = time.perf_counter()
+    try:
+        await crawler.run()
+    finally:
+        await crawler.close()
+        await session.aclose()
+    return time.perf_counter() - start
+
+
+async def tree(nodes: int) -> float:
+    start = time.perf_counter()
+    await TreeProcessor(nodes, 20, 0.0, 32).process_with_queue([0])
+    return time.perf_counter() - start
+
+
+def compare(run, rounds: int) -> dict:
+    # Alternating rounds so drift on the machine hits both modes alike.
+    best = {"disabled": float("inf"), "enabled": float("inf")}
+    for _ in range(rounds):
+        for mode, metrics in (("disabled", NullMetrics()), ("enabled", Metrics())):
+            set_metrics(metrics)
+            best[mode] = min(best[mode], asyncio.run(run()))
+    return {
+        "disabled_seconds": round(best["disabled"], 4),
+        "enabled_seconds": round(best["enabled"], 4),
+        "overhead_pct": round((best["enabled"] / best["disabled"] - 1) * 100, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of metrics collection, disabled vs enabled")
+    parser.add_argument("--port", type=int, default=8770)
+    parser.add_argument("--pages", type=int, default=1000, help="Pages in the crawl scenario")
+    parser.add_argument("--nodes", type=int, default=50000, help="Items in the worker pool scenario")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    proc = get_context("spawn").Process(target=run_server, args=(HOSTS, args.port, args.pages, 20), daemon=True)
+    proc.start()
+    try:
+        wait_for_port(args.port)
+        results = {
+            "crawl": compare(lambda: crawl(args.port, args.pages), args.rounds),
+            "worker_pool": compare(lambda: tree(args.nodes), args.rounds),
+        }
+    finally:
+        proc.terminate()
+        proc.join()
+
+    # One enabled crawl, to show where its time goes.
+    metrics = Metrics()
+    set_metrics(metrics)
+    proc = get_context("spawn").Process(target=run_server, args=(HOSTS, args.port, args.pages, 20), daemon=True)
+    proc.start()
+    try:
+        wait_for_port(args.port)
+        asyncio.run(crawl(args.port, args.pages))
+    finally:
+        proc.terminate()
+        proc.join()
+    results["crawl_phases"] = {
+        name: {labels: {k: h[k] for k in ("count", "sum", "p50", "p99")} for labels, h in series.items()}
+        for name, series in metrics.summary()["histograms"].items()
+    }
+    save_results("metrics", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
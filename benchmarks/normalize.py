@@ -0,0 +1,59 @@
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from app.url_discovery.core.normalize import LinkNormalizer, normalize_link
+from app.url_discovery.core.patterns import load_patterns
+from benchmarks.common import save_results
+
+
+def synthetic_pages(pages: int, nav_links: int, unique_links: int, seed: int = 7) -> List[Tuple[str, List[str]]]:
+    rng = random.Random(seed)
+    nav = [f"/section-{i % 12}/topic-{i}" for i in range(nav_links)]
+    nav += ["/", "/about", "/contact", "https://www.example.com/login?next=/account", "#top", "mailto:hi@example.com"]
+    out = []
+    for i in range(pages):
+        base = f"https://example.com/section-{i % 12}/article-{i}"
+        own = [f"related-{rng.randrange(10 ** 6)}" for _ in range(unique_links)]
+        out.append((base, nav + own + [f"?page={rng.randrange(50)}"]))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="normalize_link vs LinkNormalizer throughput")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--nav-links", type=int, default=200, help="Hrefs repeated on every page")
+    parser.add_argument("--unique-links", type=int, default=20, help="Hrefs unique to each page")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    patterns = load_patterns()
+    pages = synthetic_pages(args.pages, args.nav_links, args.unique_links)
+    total = sum(len(hrefs) for _, hrefs in pages)
+
+    start = time.perf_counter()
+    for base, hrefs in pages:
+        for href in hrefs:
+            normalize_link(base, href, patterns)
+    baseline = time.perf_counter() - start
+
+    normalizer = LinkNormalizer(patterns)
+    start = time.perf_counter()
+    for base, hrefs in pages:
+        normalizer.normalize_many(base, hrefs)
+    memoized = time.perf_counter() - start
+
+    info = normalizer.cache_info()
+    results = {
+        "hrefs": total,
+        "normalize_link_per_sec": round(total / baseline, 1),
+        "link_normalizer_per_sec": round(total / memoized, 1),
+        "speedup": round(baseline / memoized, 2),
+        "cache_hit_ratio": round(info.hits / max(1, info.hits + info.misses), 3),
+    }
+    save_results("normalize", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import time
+
+from app.url_discovery.core.parse_executor import InlineParseExecutor, ProcessParseExecutor
+from app.url_discovery.core.patterns import load_patterns
+from benchmarks.common import save_results
+from benchmarks.link_extraction import synthetic_page
+
+
+async def crawl(executor, pages: int, concurrency: int, latency: float, html: bytes) -> float:
+    fetch_slots = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> int:
+        async with fetch_slots:
+            await asyncio.sleep(latency)
+        links = await executor.extract_links(f"https://example.com/page-{i}", html, "utf-8")
+        return len(links)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(pages)))
+    elapsed = time.perf_counter() - start
+    await executor.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-loop vs process-pool HTML parsing throughput")
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated fetch latency in seconds")
+    parser.add_argument("--size-kb", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=0, help="Process pool size, 0 = one per CPU")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    patterns = load_patterns()
+    html = synthetic_page(300, args.size_kb).encode("utf-8")
+
+    inline = asyncio.run(crawl(InlineParseExecutor(patterns, False, True),
+                               args.pages, args.concurrency, args.latency, html))
+    pooled = asyncio.run(crawl(ProcessParseExecutor(patterns, False, True, args.workers, args.batch_size),
+                               args.pages, args.concurrency, args.latency, html))
+
+    results = {
+        "pages": args.pages,
+        "concurrency": args.concurrency,
+        "latency_s": args.latency,
+        "inline_pages_per_sec": round(args.pages / inline, 1),
+        "process_pages_per_sec": round(args.pages / pooled, 1),
+        "speedup": round(inline / pooled, 2),
+    }
+    save_results("parse_executor", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
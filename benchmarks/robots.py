@@ -0,0 +1,106 @@
+import argparse
+import random
+import re
+import time
+from urllib.robotparser import RobotFileParser
+
+from app.url_discovery.core.robots import RobotsCache, RobotsRules
+from benchmarks.common import save_results
+
+
+def synthetic_robots(rules: int, wildcard_share: float, seed: int = 5) -> str:
+    rng = random.Random(seed)
+    lines = ["User-agent: *"]
+    for i in range(rules):
+        kind = rng.random()
+        if kind < wildcard_share / 2:
+            lines.append(f"Disallow: /*?filter{i}=")
+        elif kind < wildcard_share:
+            lines.append(f"Disallow: /*.ext{i}$")
+        elif kind < (1 + wildcard_share) / 2:
+            lines.append(f"Disallow: /section-{i}/")
+        else:
+            lines.append(f"Allow: /section-{i - 1}/public")
+    lines += ["Crawl-delay: 1", "Sitemap: https://example.com/sitemap.xml"]
+    return "\n".join(lines) + "\n"
+
+
+def synthetic_paths(count: int, rules: int, seed: int = 9) -> list:
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        n = rng.randrange(rules + 10)
+        kind = rng.random()
+        if kind < 0.5:
+            paths.append(f"/section-{n}/item-{rng.randrange(1000)}")
+        elif kind < 0.7:
+            paths.append(f"/section-{n}/public/page")
+        elif kind < 0.85:
+            paths.append(f"/list?filter{n}=red&page={rng.randrange(50)}")
+        else:
+            paths.append(f"/files/doc-{rng.randrange(1000)}.ext{n}")
+    return paths
+
+
+def reference_can_fetch(rules, path: str) -> bool:
+    # Straightforward RFC 9309 evaluation: try every rule, keep the longest match.
+    best_len, best_allow = -1, True
+    for pattern, allow in rules:
+        anchored = pattern.endswith("$")
+        regex = ".*".join(re.escape(p) for p in (pattern[:-1] if anchored else pattern).split("*"))
+        if re.match(regex + ("\\Z" if anchored else ""), path):
+            if len(pattern) > best_len or (len(pattern) == best_len and allow):
+                best_len, best_allow = len(pattern), allow
+    return best_allow
+
+
+def rate(fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="robots.txt matcher checks per second")
+    parser.add_argument("--rules", type=int, default=200)
+    parser.add_argument("--wildcard-share", type=float, default=0.1, help="Share of rules using * or $")
+    parser.add_argument("--checks", type=int, default=1000000)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    text = synthetic_robots(args.rules, args.wildcard_share)
+    start = time.perf_counter()
+    rules = RobotsRules.parse(text)
+    parse_seconds = time.perf_counter() - start
+    paths = synthetic_paths(args.checks, args.rules)
+    urls = [f"https://example.com{p}" for p in paths]
+
+    sample = paths[:5000]
+    mismatches = sum(rules.can_fetch(p) != reference_can_fetch(rules.rules, p) for p in sample)
+
+    cache = RobotsCache()
+    cache.parse("example.com", text)
+    # Links repeat across pages (navigation, footers), which is what the per-URL cache is for.
+    repeated = [urls[i % 5000] for i in range(args.checks)]
+
+    stdlib = RobotFileParser()
+    stdlib.parse(text.splitlines())
+
+    results = {
+        "rules": args.rules,
+        "wildcard_share": args.wildcard_share,
+        "parse_ms": round(parse_seconds * 1000, 2),
+        "mismatches_vs_reference": mismatches,
+        "disallowed_share": round(sum(not rules.can_fetch(p) for p in sample) / len(sample), 3),
+        "compiled_paths_per_sec": round(rate(rules.can_fetch, paths)),
+        "compiled_urls_per_sec": round(rate(rules.can_fetch, urls)),
+        "cache_repeated_urls_per_sec": round(rate(lambda u: cache.allowed("example.com", u), repeated)),
+        "reference_paths_per_sec": round(rate(lambda p: reference_can_fetch(rules.rules, p), sample)),
+        "stdlib_robotparser_urls_per_sec": round(rate(lambda u: stdlib.can_fetch("*", u), urls[:50000])),
+    }
+    save_results("robots", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
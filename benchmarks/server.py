@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import ssl as ssl_module
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass
+class HostSpec:
+    name: str
+    latency: float = 0.005
+    max_concurrent: int = 0
+    crawl_delay: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "HostSpec":
+        # name[:latency_ms[:max_concurrent[:crawl_delay]]]
+        parts = spec.split(":")
+        host = cls(parts[0])
+        if len(parts) > 1:
+            host.latency = float(parts[1]) / 1000
+        if len(parts) > 2:
+            host.max_concurrent = int(parts[2])
+        if len(parts) > 3:
+            host.crawl_delay = float(parts[3])
+        return host
+
+
+DEFAULT_HOSTS = [
+    "bench.test:40",
+    "a.bench.test:40",
+    "b.bench.test:40",
+    "c.bench.test:40",
+    "slow.bench.test:1500",
+    "limited.bench.test:40:4",
+]
+
+
+class MultiHostServer:
+    """Minimal HTTP/1.1 keep-alive server that serves one synthetic site per Host header.
+
+    Each host answers after its own latency; hosts with ``max_concurrent`` reply 429 with
+    ``Retry-After`` when more requests are in flight. Pages link across all hosts, so a crawl
+    started on the first host reaches every other one. Pages carry an ETag and answer a matching
+    ``If-None-Match`` with 304; ``bandwidth`` (bytes/s per response) adds transfer time for
+    bodies. ``GET /__stats`` returns counters.
+    """
+
+    def __init__(self, hosts: List[HostSpec], pages_per_host: int = 2000, fanout: int = 20,
+                 page_kb: int = 0, bandwidth: float = 0.0):
+        self.hosts: Dict[str, HostSpec] = {h.name: h for h in hosts}
+        self.names = [h.name for h in hosts]
+        self.pages_per_host = pages_per_host
+        self.fanout = fanout
+        self.filler = "<p>" + "lorem ipsum dolor sit amet " * (page_kb * 1024 // 27) + "</p>"
+        self.bandwidth = bandwidth
+        self.active: Counter = Counter()
+        self.served: Counter = Counter()
+        self.throttled: Counter = Counter()
+        self.not_modified: Counter = Counter()
+        self.peak: Counter = Counter()
+        self.bytes_sent = 0
+
+    def page(self, host_index: int, i: int) -> bytes:
+        links = []
+        for k in range(self.fanout):
+            target = self.names[(host_index + i + k) % len(self.names)]
+            links.append(f'<a href="http://{target}/p{(i * 13 + k * 31 + 1) % self.pages_per_host}">page {k}</a>')
+        return (f"<html><head><title>{self.names[host_index]} {i}</title></head><body>"
+                f"<nav><a href=\"/\">home</a></nav>{''.join(links)}{self.filler}</body></html>").encode()
+
+    async def respond(self, host: str, path: str, headers: Dict[str, str]) -> tuple:
+        if path == "/__stats":
+            body = json.dumps({"served": self.served, "throttled": self.throttled, "peak": self.peak,
+                               "not_modified": self.not_modified, "bytes_sent": self.bytes_sent}).encode()
+            return 200, "application/json", body, {}
+        spec = self.hosts.get(host)
+        if spec is None:
+            return 404, "text/plain", b"unknown host", {}
+        if path == "/robots.txt":
+            body = "User-agent: *\nAllow: /\n" + (f"Crawl-delay: {spec.crawl_delay}\n" if spec.crawl_delay else "")
+            return 200, "text/plain", body.encode(), {}
+        if spec.max_concurrent and self.active[host] >= spec.max_concurrent:
+            self.throttled[host] += 1
+            return 429, "text/plain", b"slow down", {"Retry-After": "1"}
+
+        self.active[host] += 1
+        self.peak[host] = max(self.peak[host], self.active[host])
+        try:
+            await asyncio.sleep(spec.latency)
+        finally:
+            self.active[host] -= 1
+        try:
+            i = int(path[2:]) if path.startswith("/p") else 0
+        except ValueError:
+            return 404, "text/plain", b"not found", {}
+        body = self.page(self.names.index(host), i)
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if headers.get("if-none-match") == etag:
+            self.not_modified[host] += 1
+            return 304, "text/html; charset=utf-8", b"", {"ETag": etag}
+        self.served[host] += 1
+        if self.bandwidth:
+            await asyncio.sleep(len(body) / self.bandwidth)
+        return 200, "text/html; charset=utf-8", body, {"ETag": etag}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                path = request_line.split()[1].decode("latin-1").split("?", 1)[0]
+                host = headers.get("host", "").split(":", 1)[0].lower()
+
+                status, ctype, body, extra = await self.respond(host, path, headers)
+                head = [f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}",
+                        f"Content-Type: {ctype}", f"Content-Length: {len(body)}", "Connection: keep-alive"]
+                head += [f"{k}: {v}" for k, v in extra.items()]
+                self.bytes_sent += len(body)
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, port: int, ready: Optional[asyncio.Event] = None,
+                    ssl: Optional[ssl_module.SSLContext] = None) -> None:
+        server = await asyncio.start_server(self.handle, "127.0.0.1", port, backlog=1024, ssl=ssl)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+
+def run_server(hosts: List[str], port: int, pages_per_host: int, fanout: int,
+               page_kb: int = 0, bandwidth: float = 0.0, certfile: Optional[str] = None,
+               keyfile: Optional[str] = None) -> None:
+    server = MultiHostServer([HostSpec.parse(h) for h in hosts], pages_per_host, fanout, page_kb, bandwidth)
+    context = None
+    if certfile:
+        context = ssl_module.create_default_context(ssl_module.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(certfile, keyfile)
+    asyncio.run(server.serve(port, ssl=context))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local multi-host test site with per-host latency and throttling")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--host", action="append", dest="hosts",
+                        help="name[:latency_ms[:max_concurrent[:crawl_delay]]], repeatable")
+    parser.add_argument("--pages-per-host", type=int, default=2000)
+    parser.add_argument("--fanout", type=int, default=20)
+    parser.add_argument("--page-kb", type=int, default=0, help="Filler text added to every page")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="Bytes/s per response, 0 = unlimited")
+    args = parser.parse_args()
+    print(f"Serving {args.hosts or DEFAULT_HOSTS} on 127.0.0.1:{args.port}")
+    run_server(args.hosts or DEFAULT_HOSTS, args.port, args.pages_per_host, args.fanout, args.page_kb,
+               args.bandwidth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import gzip
+import math
+import zlib
+from typing import Dict, List
+
+from benchmarks.server import HostSpec, MultiHostServer
+
+SITEMAP_XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+class SyntheticSite(MultiHostServer):
+    """Deterministic synthetic site per host, with a nested gzip sitemap index and robots.txt.
+
+    On top of :class:`MultiHostServer` pages: ``error_rate`` of paths answer 500 and
+    ``slow_rate`` of them take ``slow_factor`` times the host latency, both chosen by a hash of
+    host and path so every run sees the same ones. Each page also links into ``/private/``,
+    which robots.txt disallows. ``/sitemap.xml.gz`` is the root of a sitemap index tree with
+    ``index_fanout`` children per index and ``urls_per_sitemap`` page URLs per leaf.
+    """
+
+    def __init__(self, hosts: List[HostSpec], pages_per_host: int = 2000, fanout: int = 20, page_kb: int = 0,
+                 error_rate: float = 0.0, slow_rate: float = 0.0, slow_factor: float = 20.0,
+                 urls_per_sitemap: int = 500, index_fanout: int = 10):
+        super().__init__(hosts, pages_per_host, fanout, page_kb)
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_factor = slow_factor
+        self.urls_per_sitemap = urls_per_sitemap
+        self.index_fanout = max(2, index_fanout)
+        self.errors = 0
+        self.levels = self._levels()
+        self._sitemaps: Dict[str, bytes] = {}
+
+    def _levels(self) -> List[int]:
+        # Node count per level of the sitemap tree: leaves first, the root last.
+        levels = [max(1, math.ceil(self.pages_per_host / self.urls_per_sitemap))]
+        while levels[-1] > 1:
+            levels.append(math.ceil(levels[-1] / self.index_fanout))
+        return levels
+
+    def _share(self, host: str, path: str, salt: str) -> float:
+        return zlib.crc32(f"{salt}:{host}{path}".encode()) / 0xFFFFFFFF
+
+    def page(self, host_index: int, i: int) -> bytes:
+        body = super().page(host_index, i)
+        return body.replace(b"</nav>", f'<a href="/private/p{i}">account</a></nav>'.encode(), 1)
+
+    def sitemap(self, host: str, level: int, k: int) -> bytes:
+        key = f"{host}/{level}-{k}"
+        cached = self._sitemaps.get(key)
+        if cached is not None:
+            return cached
+        origin = f"http://{host}"
+        if level == 0:
+            first = k * self.urls_per_sitemap
+            locs = [f"{origin}/p{i}" for i in range(first, min(first + self.urls_per_sitemap, self.pages_per_host))]
+            xml = "".join(f"<url><loc>{loc}</loc></url>" for loc in locs)
+            doc = f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="{SITEMAP_XMLNS}">{xml}</urlset>'
+        else:
+            first = k * self.index_fanout
+            children = range(first, min(first + self.index_fanout, self.levels[level - 1]))
+            xml = "".join(f"<sitemap><loc>{origin}/sitemaps/{level - 1}-{c}.xml.gz</loc></sitemap>" for c in children)
+            doc = f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="{SITEMAP_XMLNS}">{xml}</sitemapindex>'
+        body = self._sitemaps[key] = gzip.compress(doc.encode(), compresslevel=5)
+        return body
+
+    async def respond(self, host: str, path: str, headers: Dict[str, str]) -> tuple:
+        spec = self.hosts.get(host)
+        if spec is None or path == "/__stats":
+            return await super().respond(host, path, headers)
+        if path == "/robots.txt":
+            body = ("User-agent: *\nDisallow: /private/\n"
+                    + (f"Crawl-delay: {spec.crawl_delay}\n" if spec.crawl_delay else "")
+                    + f"Sitemap: http://{host}/sitemap.xml.gz\n")
+            return 200, "text/plain", body.encode(), {}
+        if path == "/sitemap.xml.gz":
+            return 200, "application/gzip", self.sitemap(host, len(self.levels) - 1, 0), {}
+        if path.startswith("/sitemaps/") and path.endswith(".xml.gz"):
+            try:
+                level, k = map(int, path[len("/sitemaps/"):-len(".xml.gz")].split("-"))
+            except ValueError:
+                return 404, "text/plain", b"not found", {}
+            if level >= len(self.levels) or k >= self.levels[level]:
+                return 404, "text/plain", b"not found", {}
+            await asyncio.sleep(spec.latency)
+            return 200, "application/gzip", self.sitemap(host, level, k), {}
+
+        if self.error_rate and self._share(host, path, "error") < self.error_rate:
+            await asyncio.sleep(spec.latency)
+            self.errors += 1
+            return 500, "text/plain", b"injected error", {}
+        if self.slow_rate and self._share(host, path, "slow") < self.slow_rate:
+            await asyncio.sleep(spec.latency * (self.slow_factor - 1))
+        return await super().respond(host, path, headers)
+
+
+def run_site(hosts: List[str], port: int, pages_per_host: int, fanout: int, page_kb: int = 0,
+             error_rate: float = 0.0, slow_rate: float = 0.0, urls_per_sitemap: int = 500,
+             index_fanout: int = 10) -> None:
+    site = SyntheticSite([HostSpec.parse(h) for h in hosts], pages_per_host, fanout, page_kb, error_rate,
+                         slow_rate, urls_per_sitemap=urls_per_sitemap, index_fanout=index_fanout)
+    asyncio.run(site.serve(port))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a deterministic synthetic site with sitemaps and robots.txt")
+    parser.add_argument("--port", type=int, default=8771)
+    parser.add_argument("--host", action="append", dest="hosts",
+                        help="name[:latency_ms[:max_concurrent[:crawl_delay]]], repeatable")
+    parser.add_argument("--pages", type=int, default=2000, help="Pages per host")
+    parser.add_argument("--fanout", type=int, default=20, help="Links per page")
+    parser.add_argument("--page-kb", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--urls-per-sitemap", type=int, default=500)
+    parser.add_argument("--index-fanout", type=int, default=10)
+    args = parser.parse_args()
+    run_site(args.hosts or ["site.test:20"], args.port, args.pages, args.fanout, args.page_kb, args.error_rate,
+             args.slow_rate, args.urls_per_sitemap, args.index_fanout)
+
+
+if __name__ == "__main__":
+    main()
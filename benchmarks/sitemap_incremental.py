@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import logging
+import shutil
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from app.url_discovery.core.sitemap_processor import SitemapDiscoveryProcessor
+from app.url_discovery.core.sitemap_state import SitemapState, parse_lastmod
+from benchmarks.common import save_results
+from benchmarks.server import MultiHostServer
+
+DAY1 = "2024-05-01T00:00:00+00:00"
+DAY2 = "2024-05-02T00:00:00+00:00"
+
+
+class SitemapSite(MultiHostServer):
+    """A publisher-style sitemap index; after ``next_day`` a few child sitemaps gain new URLs."""
+
+    def __init__(self, port: int, children: int, urls_per_child: int, changed: int):
+        super().__init__([])
+        self.origin = f"http://127.0.0.1:{port}"
+        self.children = children
+        self.urls_per_child = urls_per_child
+        self.changed = changed
+        self.day = DAY1
+        self.requests: Counter = Counter()
+
+    def next_day(self) -> None:
+        self.day = DAY2
+
+    def child_changed(self, i: int) -> bool:
+        return self.day == DAY2 and i < self.changed
+
+    async def respond(self, host: str, path: str, headers) -> tuple:
+        self.requests[path] += 1
+        if path == "/robots.txt":
+            return 200, "text/plain", f"User-agent: *\nSitemap: {self.origin}/sitemap_index.xml\n".encode(), {}
+        if path == "/sitemap_index.xml":
+            rows = [f"<sitemap><loc>{self.origin}/sitemaps/{i}.xml</loc>"
+                    f"<lastmod>{self.day if self.child_changed(i) else DAY1}</lastmod></sitemap>"
+                    for i in range(self.children)]
+            return 200, "application/xml", self._xml("sitemapindex", rows), {}
+        if path.startswith("/sitemaps/"):
+            i = int(path.rsplit("/", 1)[1].split(".")[0])
+            count = self.urls_per_child + (10 if self.child_changed(i) else 0)
+            rows = [f"<url><loc>{self.origin}/c{i}/article-{k}</loc>"
+                    f"<lastmod>{DAY2 if k >= self.urls_per_child else DAY1}</lastmod></url>"
+                    for k in range(count)]
+            return 200, "application/xml", self._xml("urlset", rows), {}
+        return 404, "text/plain", b"not found", {}
+
+    @staticmethod
+    def _xml(root: str, rows) -> bytes:
+        return (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<{root} xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{"".join(rows)}</{root}>').encode()
+
+
+async def discover(port: int, site: SitemapSite, state_path: Optional[Path], since: Optional[float] = None) -> dict:
+    site.requests.clear()
+    processor = SitemapDiscoveryProcessor(f"http://127.0.0.1:{port}",
+                                          state=SitemapState(state_path) if state_path else None, since=since)
+    start = time.perf_counter()
+    try:
+        urls = await processor.discover_urls()
+    finally:
+        await processor.close()
+    return {
+        "seconds": round(time.perf_counter() - start, 3),
+        "requests": sum(site.requests.values()),
+        "sitemaps_fetched": processor.fetched,
+        "sitemaps_reused": processor.reused,
+        "urls": len(urls),
+        "_urls": urls,
+    }
+
+
+async def run(args) -> dict:
+    site = SitemapSite(args.port, args.children, args.urls_per_child, args.changed)
+    ready = asyncio.Event()
+    server = asyncio.create_task(site.serve(args.port, ready))
+    await ready.wait()
+    state_dir = Path(tempfile.mkdtemp(prefix="smartcrawl-sitemap-state-"))
+    try:
+        await discover(args.port, site, state_dir / "state.sqlite")
+        site.next_day()
+        full = await discover(args.port, site, None)
+        incremental = await discover(args.port, site, state_dir / "state.sqlite")
+        changed = await discover(args.port, site, state_dir / "state.sqlite", parse_lastmod(DAY2))
+    finally:
+        server.cancel()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    same = full.pop("_urls") == incremental.pop("_urls")
+    changed.pop("_urls")
+    return {
+        "children": args.children,
+        "urls_per_child": args.urls_per_child,
+        "changed_children": args.changed,
+        "full": full,
+        "incremental": incremental,
+        "incremental_since": changed,
+        "incremental_matches_full": same,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs incremental sweep of a large sitemap index")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--children", type=int, default=400)
+    parser.add_argument("--urls-per-child", type=int, default=2000)
+    parser.add_argument("--changed", type=int, default=3, help="Child sitemaps updated on the second day")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    save_results("sitemap_incremental", asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+
+from benchmarks.common import measure_isolated, save_results
+
+
+def build_urlset(count: int) -> bytes:
+    rows = [
+        f"<url><loc>https://example.com/section-{i % 97}/article-{i}</loc>"
+        f"<lastmod>2024-05-{1 + i % 28:02d}</lastmod><changefreq>daily</changefreq>"
+        f"<priority>0.{i % 10}</priority></url>"
+        for i in range(count)
+    ]
+    return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + "".join(rows)
+            + "</urlset>"
+    ).encode("utf-8")
+
+
+def run_bs4(content: bytes) -> int:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, "xml")
+    if not soup.find("urlset"):
+        return 0
+    return len([loc.text.strip() for loc in soup.find_all("loc")])
+
+
+def run_stream(content: bytes) -> int:
+    from app.url_discovery.core.sitemap_xml import SitemapStreamParser
+
+    count = 0
+    for _ in SitemapStreamParser().iter_entries(content):
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sitemap parser benchmark: BeautifulSoup vs streaming")
+    parser.add_argument("--urls", type=int, default=50000, help="URLs in the synthetic urlset")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = {
+        "urls": args.urls,
+        "bs4": measure_isolated(build_urlset, run_bs4, args.urls),
+        "stream": measure_isolated(build_urlset, run_stream, args.urls),
+    }
+    save_results("sitemap_parser", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from app.config.loaders.app_config_loader import get_app_config
+from app.config.loaders.env_loader import env_settings
+from app.config.loaders.helpers.yaml_loading_helper import load_yaml
+from app.config.loaders.url_discovery_config_loader import get_crawler_config
+from app.config.models.app_config_model import AppConfig
+from app.url_discovery.core.patterns import compile_patterns, load_patterns
+from benchmarks.common import save_results
+
+COLD_STARTS = {
+    "import_orchestrator": "import app.url_discovery.orchestrator",
+    "construct_orchestrator": "from app.url_discovery.orchestrator import UrlDiscoveryOrchestrator; "
+                              "UrlDiscoveryOrchestrator('https://example.com')",
+    "import_batch_parent": "import app.url_discovery.batch",
+    "cli_help": "import sys; sys.argv = ['run_orchestrator', '--help']; "
+                "from scripts.run_orchestrator import main; main()",
+}
+
+
+def cold_start(code: str, repeat: int) -> dict:
+    # A fresh interpreter per run, as for each CLI invocation or spawned worker.
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return {"median_seconds": round(statistics.median(times), 4), "min_seconds": round(min(times), 4)}
+
+
+def per_call(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return round((time.perf_counter() - start) / calls * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup cost: interpreter imports and per-call config access")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per cold-start measurement")
+    parser.add_argument("--calls", type=int, default=2000, help="Calls per config access measurement")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    baseline = cold_start("pass", args.repeat)
+    cold = {name: cold_start(code, args.repeat) for name, code in COLD_STARTS.items()}
+    for result in cold.values():
+        result["over_bare_interpreter"] = round(result["median_seconds"] - baseline["median_seconds"], 4)
+
+    path = env_settings.get_config_path()
+    get_app_config()
+    results = {
+        "bare_interpreter": baseline,
+        "cold_start": cold,
+        "config_access_us": {
+            # What every get_*_config() call did before the snapshot: read the YAML and validate it.
+            "read_and_validate": per_call(lambda: AppConfig(**load_yaml(path)).url_discovery.crawler, args.calls),
+            "snapshot": per_call(get_crawler_config, args.calls),
+        },
+        "patterns_us": {
+            "compile": per_call(lambda: compile_patterns(get_app_config().url_discovery.parsing), args.calls),
+            "cached": per_call(load_patterns, args.calls),
+        },
+    }
+    save_results("startup", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
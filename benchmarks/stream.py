@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import logging
+import time
+
+from app.url_discovery.core.transport import HttpSession
+from app.url_discovery.orchestrator import UrlDiscoveryOrchestrator
+from benchmarks.common import save_results
+from benchmarks.host_scheduler import LocalRouting
+from benchmarks.server import HostSpec, MultiHostServer
+from benchmarks.sitemap_incremental import SitemapSite
+
+
+def local_session(port: int) -> HttpSession:
+    session = HttpSession()
+    session.transport = LocalRouting(port, session.transport)
+    return session
+
+
+async def measure(start_url: str, port: int, streaming: bool) -> dict:
+    async with local_session(port) as session:
+        orchestrator = UrlDiscoveryOrchestrator(start_url, session=session)
+        start = time.perf_counter()
+        first = None
+        if streaming:
+            count = 0
+            async for _ in orchestrator.stream():
+                if first is None:
+                    first = time.perf_counter() - start
+                count += 1
+        else:
+            count = len(await orchestrator.discover())
+            first = time.perf_counter() - start
+        return {"first_url_seconds": round(first or 0.0, 3), "total_seconds": round(time.perf_counter() - start, 3),
+                "urls": count}
+
+
+async def scenario(server, port: int, start_url: str) -> dict:
+    ready = asyncio.Event()
+    task = asyncio.create_task(server.serve(port, ready))
+    await ready.wait()
+    try:
+        return {"discover": await measure(start_url, port, streaming=False),
+                "stream": await measure(start_url, port, streaming=True)}
+    finally:
+        task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first URL: discover() vs stream()")
+    parser.add_argument("--port", type=int, default=8769)
+    parser.add_argument("--children", type=int, default=200, help="Child sitemaps in the sitemap scenario")
+    parser.add_argument("--urls-per-child", type=int, default=1000)
+    parser.add_argument("--pages", type=int, default=300, help="Pages in the crawl scenario")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = {
+        "sitemap": asyncio.run(scenario(SitemapSite(args.port, args.children, args.urls_per_child, 0), args.port,
+                                        f"http://127.0.0.1:{args.port}")),
+        # No sitemap on this site, so discovery falls back to crawling.
+        "crawl": asyncio.run(scenario(MultiHostServer([HostSpec("crawl.test", 0.02)], args.pages, 10), args.port + 1,
+                                      "http://crawl.test")),
+    }
+    save_results("stream", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict
+
+import httpx
+
+from app.url_discovery.core.content_filter import NonHtmlPatterns
+from app.url_discovery.core.crawler import HttpAsyncCrawler
+from benchmarks.common import save_results
+
+START_URL = "https://files.example"
+CHUNK = 64 * 1024
+
+
+class CountingStream(httpx.AsyncByteStream):
+    """A body of ``size`` bytes generated as it is read, adding what the client pulled to ``counts``."""
+
+    def __init__(self, size: int, counts: Dict[str, int], fill: bytes = b"x"):
+        self.size = size
+        self.counts = counts
+        self.fill = fill
+
+    async def __aiter__(self):
+        sent = 0
+        while sent < self.size:
+            n = min(CHUNK, self.size - sent)
+            sent += n
+            self.counts["served"] += n
+            yield self.fill * n
+
+
+class _Prefixed(httpx.AsyncByteStream):
+    def __init__(self, head: bytes, rest: httpx.AsyncByteStream):
+        self.head = head
+        self.rest = rest
+
+    async def __aiter__(self):
+        yield self.head
+        async for chunk in self.rest:
+            yield chunk
+
+
+def make_handler(pages: int, docs_per_page: int, doc_kb: int, huge_mb: int, counts: Dict[str, int]):
+    """HTML pages that each link to ``docs_per_page`` PDF downloads at extensionless URLs
+    (``/download/N``), which look like pages to the URL classifier, plus one HTML page of
+    ``huge_mb`` megabytes."""
+    def respond(ctype: str, size: int, fill: bytes = b"x", head: bytes = b"") -> httpx.Response:
+        counts["offered"] += len(head) + size
+        stream = CountingStream(size, counts, fill)
+        if head:
+            counts["served"] += len(head)
+            stream = _Prefixed(head, stream)
+        return httpx.Response(200, headers={"content-type": ctype, "content-length": str(len(head) + size)},
+                              stream=stream)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        parts = [p for p in request.url.path.split("/") if p]
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        if parts and parts[0] == "download":
+            return respond("application/pdf", doc_kb * 1024)
+        if parts and parts[0] == "huge":
+            return respond("text/html", huge_mb * 1024 * 1024, b" ", b'<html><body><a href="/page/0">x</a>')
+        i = int(parts[1]) if len(parts) > 1 else 0
+        links = [f"/page/{(i * 7 + k) % pages}" for k in range(1, 4)] + ["/huge"]
+        links += [f"/download/{i * docs_per_page + k}" for k in range(docs_per_page)]
+        body = ("<html><body>" + "".join(f'<a href="{h}">x</a>' for h in links) + "</body></html>").encode()
+        counts["offered"] += len(body)
+        counts["served"] += len(body)
+        return httpx.Response(200, headers={"content-type": "text/html; charset=utf-8"}, content=body)
+
+    return handler
+
+
+async def crawl(args, learn_after: int) -> dict:
+    counts = {"offered": 0, "served": 0}
+    crawler = HttpAsyncCrawler(START_URL)
+    crawler.cfg = crawler.cfg.model_copy(update={"max_pages": args.max_pages, "verbose": False,
+                                                 "max_html_bytes": args.max_html_kb * 1024,
+                                                 "non_html_learn_after": learn_after})
+    crawler.non_html = NonHtmlPatterns(learn_after)
+    await crawler.client.aclose()
+    crawler.client = httpx.AsyncClient(transport=httpx.MockTransport(
+        make_handler(args.pages, args.docs_per_page, args.doc_kb, args.huge_mb, counts)))
+    start = time.perf_counter()
+    try:
+        await crawler.run()
+    finally:
+        await crawler.close()
+    fetched_pages = sum(1 for u in crawler.seen if "/page/" in u or u.rstrip("/") == START_URL)
+    return {
+        "fetched": len(crawler.seen),
+        "html_pages_fetched": fetched_pages,
+        "non_html_patterns": sorted(crawler.non_html.patterns),
+        # What a fetch that downloads every body before looking at content-type would have read.
+        "mb_buffered_fetch": round(counts["offered"] / 2 ** 20, 2),
+        "mb_downloaded": round(counts["served"] / 2 ** 20, 2),
+        "bytes_wasted": crawler.bytes_wasted,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes downloaded by the crawler on a site full of non-HTML "
+                                                 "links and one oversized page")
+    parser.add_argument("--pages", type=int, default=300, help="HTML pages on the site")
+    parser.add_argument("--docs-per-page", type=int, default=2, help="PDF links per page")
+    parser.add_argument("--doc-kb", type=int, default=512, help="Size of each PDF")
+    parser.add_argument("--huge-mb", type=int, default=50, help="Size of the oversized HTML page")
+    parser.add_argument("--max-html-kb", type=int, default=5000, help="Crawler max_html_bytes, in KiB")
+    parser.add_argument("--max-pages", type=int, default=500, help="Crawler page budget")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = {
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "no_learning": asyncio.run(crawl(args, 0)),
+        "learning": asyncio.run(crawl(args, 3)),
+    }
+    save_results("streaming_fetch", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
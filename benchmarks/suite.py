@@ -0,0 +1,193 @@
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import time
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import run_isolated, save_results
+from benchmarks.host_scheduler import LocalRouting, wait_for_port
+from benchmarks.site import run_site
+
+START_URL = "http://site.test"
+
+
+class TimedRouting(LocalRouting):
+    """Routes to the local site and records each request's time to response headers."""
+
+    def __init__(self, port: int, inner: Optional[httpx.AsyncBaseTransport] = None):
+        super().__init__(port, inner)
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await super().handle_async_request(request)
+        self.latencies.append(time.perf_counter() - start)
+        if response.status_code >= 500:
+            self.errors += 1
+        return response
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"fetch_p50_ms": 0.0, "fetch_p99_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "fetch_p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "fetch_p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2),
+    }
+
+
+async def _discover(port: int, phase: str, max_pages: int) -> Dict[str, Any]:
+    from app.url_discovery.core.transport import HttpSession
+    from app.url_discovery.http_async_crawler import HttpAsyncCrawler
+    from app.url_discovery.sitemap_discoverer import SitemapDiscoverer
+
+    session = HttpSession()
+    routing = TimedRouting(port, session.transport)
+    session.transport = routing
+    if phase == "crawler":
+        runner = HttpAsyncCrawler(START_URL, session=session)
+        runner.cfg = runner.cfg.model_copy(update={"max_pages": max_pages, "verbose": False})
+        run = runner.run
+    else:
+        runner = SitemapDiscoverer(START_URL, session=session)
+        run = runner.discover_urls
+    start = time.perf_counter()
+    try:
+        urls = await run()
+    finally:
+        await runner.close()
+        await session.aclose()
+    elapsed = time.perf_counter() - start
+    result = {
+        "seconds": round(elapsed, 3),
+        "requests": len(routing.latencies),
+        "server_errors": routing.errors,
+        "urls": len(urls),
+        "urls_per_sec": round(len(urls) / elapsed, 1),
+        **latency_stats(routing.latencies),
+    }
+    if phase == "crawler":
+        result["pages"] = len(runner.seen)
+        result["pages_per_sec"] = round(len(runner.seen) / elapsed, 1)
+    return result
+
+
+def discover(port: int, phase: str, max_pages: int) -> Dict[str, Any]:
+    logging.disable(logging.WARNING)
+    return asyncio.run(_discover(port, phase, max_pages))
+
+
+def _rate(fn, items: list, rounds: int) -> Dict[str, Any]:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(items)
+        best = min(best, time.perf_counter() - start)
+    return {"items": len(items), "seconds": round(best, 4), "items_per_sec": round(len(items) / best, 1)}
+
+
+def micro(name: str, count: int, rounds: int) -> Dict[str, Any]:
+    """One microbenchmark on deterministic input; ``items_per_sec`` is from the fastest round."""
+    from app.url_discovery.core.html_parsing import extract_links, is_probably_html_url
+    from app.url_discovery.core.normalize import normalize_link
+    from app.url_discovery.core.patterns import load_patterns
+    from app.url_discovery.core.postprocess import collapse_language_variants
+
+    logging.disable(logging.WARNING)
+    patterns = load_patterns()
+    rnd = random.Random(11)
+    sections = [f"section-{i}" for i in range(40)]
+    suffixes = ["", ".html", ".pdf", "?page=2", "#top", "/", ".jpg"]
+    hrefs = [f"/{rnd.choice(sections)}/item-{rnd.randrange(count // 4)}{rnd.choice(suffixes)}" for _ in range(count)]
+
+    if name == "normalize_link":
+        return _rate(lambda xs: [normalize_link(h, "https://example.com/a/b", patterns) for h in xs], hrefs, rounds)
+    if name == "is_probably_html_url":
+        urls = ["https://example.com" + h for h in hrefs]
+        return _rate(lambda xs: [is_probably_html_url(u, patterns) for u in xs], urls, rounds)
+    if name == "collapse_language_variants":
+        langs = ["", "en", "de", "fr", "es"]
+        urls = [f"https://example.com/{rnd.choice(langs)}{h}".replace("//", "/").replace("https:/", "https://")
+                for h in hrefs]
+        return _rate(lambda xs: collapse_language_variants(xs, ["en"], patterns), urls, rounds)
+    if name == "extract_links":
+        pages = [("https://example.com/p%d" % i,
+                  ("<html><body>" + "".join(f'<a href="{h}">x</a>' for h in hrefs[i * 100:(i + 1) * 100])
+                   + "</body></html>").encode())
+                 for i in range(max(1, count // 100))]
+        result = _rate(lambda xs: [extract_links(u, html, False, True, patterns) for u, html in xs], pages, rounds)
+        result["links_per_sec"] = round(result["items_per_sec"] * 100, 1)
+        return result
+    raise ValueError(f"unknown microbenchmark {name}")
+
+
+MICRO = ["normalize_link", "is_probably_html_url", "collapse_language_variants", "extract_links"]
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for key, value in after.items():
+        old = before.get(key)
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and isinstance(old, dict):
+            out.update(compare(old, value, name + "."))
+        elif isinstance(value, (int, float)) and isinstance(old, (int, float)) and old:
+            out[name] = {"before": old, "after": value, "change_pct": round((value / old - 1) * 100, 1)}
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawler, sitemap and hot-path benchmarks on a local synthetic site")
+    parser.add_argument("--port", type=int, default=8771)
+    parser.add_argument("--hosts", default="site.test:20,a.site.test:20,b.site.test:20",
+                        help="Comma-separated name[:latency_ms[:max_concurrent[:crawl_delay]]]")
+    parser.add_argument("--pages", type=int, default=2000, help="Pages per host")
+    parser.add_argument("--fanout", type=int, default=20, help="Links per page")
+    parser.add_argument("--page-kb", type=int, default=8)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--slow-rate", type=float, default=0.02)
+    parser.add_argument("--urls-per-sitemap", type=int, default=200)
+    parser.add_argument("--index-fanout", type=int, default=5)
+    parser.add_argument("--crawl-pages", type=int, default=1500, help="Crawler max_pages")
+    parser.add_argument("--micro-items", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per microbenchmark")
+    parser.add_argument("--only", choices=["site", "micro"], help="Run only the site or the micro benchmarks")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    # Recorded so a later --compare run can be checked against the same site.
+    results: Dict[str, Any] = {"params": {k: v for k, v in vars(args).items() if k not in ("compare", "output")}}
+    if args.only != "micro":
+        hosts = args.hosts.split(",")
+        proc = get_context("spawn").Process(
+            target=run_site, args=(hosts, args.port, args.pages, args.fanout, args.page_kb, args.error_rate,
+                                   args.slow_rate, args.urls_per_sitemap, args.index_fanout), daemon=True)
+        proc.start()
+        try:
+            wait_for_port(args.port)
+            # Each run in a fresh interpreter, so CPU time and peak RSS belong to that subsystem alone.
+            results["sitemap"] = run_isolated(discover, args.port, "sitemap", 0)
+            results["crawler"] = run_isolated(discover, args.port, "crawler", args.crawl_pages)
+        finally:
+            proc.terminate()
+            proc.join()
+    if args.only != "site":
+        results["micro"] = {name: run_isolated(micro, name, args.micro_items, args.rounds) for name in MICRO}
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            results["comparison"] = compare(json.load(f)["results"], results)
+    save_results("suite", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
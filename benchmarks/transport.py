@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import logging
+import shutil
+import subprocess
+import tempfile
+import time
+from multiprocessing import get_context
+from pathlib import Path
+from typing import List
+
+from app.url_discovery.core.robots import RobotsCache
+from app.url_discovery.core.transport import HttpSession
+from app.url_discovery.http_async_crawler import HttpAsyncCrawler
+from app.url_discovery.sitemap_discoverer import SitemapDiscoverer
+from benchmarks.common import save_results
+from benchmarks.host_scheduler import LocalRouting, wait_for_port
+from benchmarks.server import run_server
+
+HOST = "localhost"
+
+
+def self_signed_cert(directory: Path) -> tuple:
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", f"/CN={HOST}",
+                    "-addext", f"subjectAltName=DNS:{HOST}", "-keyout", str(key), "-out", str(cert)],
+                   check=True, capture_output=True)
+    return str(cert), str(key)
+
+
+def new_session(port: int, cert: str) -> HttpSession:
+    session = HttpSession(verify=cert)
+    # The test site has no sitemap, so every run probes the sitemap paths and then falls back to crawling.
+    session.transport = LocalRouting(port, session.transport, host=HOST, scheme="https")
+    return session
+
+
+async def discover(start_url: str, session: HttpSession, crawler_session: HttpSession, pages: int) -> int:
+    robots = RobotsCache()
+    discoverer = SitemapDiscoverer(start_url, robots=robots, session=session)
+    try:
+        await discoverer.discover_urls()
+    finally:
+        await discoverer.close()
+    crawler = HttpAsyncCrawler(start_url, robots=robots, session=crawler_session)
+    crawler.cfg = crawler.cfg.model_copy(update={"max_pages": pages, "verbose": False})
+    try:
+        return len(await crawler.run())
+    finally:
+        await crawler.close()
+
+
+def totals(sessions: List[HttpSession]) -> dict:
+    out: dict = {}
+    for session in sessions:
+        for key, value in session.stats.items():
+            out[key] = out.get(key, 0) + value
+    return out
+
+
+async def run_mode(port: int, cert: str, runs: int, pages: int, shared: bool) -> dict:
+    start_url = f"https://{HOST}"
+    sessions: List[HttpSession] = []
+    start = time.perf_counter()
+    if shared:
+        # One session for both phases of every run, as in a batch worker.
+        session = new_session(port, cert)
+        sessions.append(session)
+        for _ in range(runs):
+            await discover(start_url, session, session, pages)
+    else:
+        # A client per phase per run, as before the shared transport.
+        for _ in range(runs):
+            phase_sessions = [new_session(port, cert), new_session(port, cert)]
+            sessions += phase_sessions
+            await discover(start_url, *phase_sessions, pages)
+            for session in phase_sessions:
+                await session.aclose()
+    elapsed = time.perf_counter() - start
+    for session in sessions:
+        await session.aclose()
+    return {"seconds": round(elapsed, 3), **totals(sessions)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connection setup per discovery run: per-phase clients vs a shared session")
+    parser.add_argument("--port", type=int, default=8768)
+    parser.add_argument("--runs", type=int, default=5, help="Discovery runs of the same site")
+    parser.add_argument("--pages", type=int, default=100, help="Crawler max_pages per run")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    tmp = Path(tempfile.mkdtemp(prefix="smartcrawl-transport-bench-"))
+    cert, key = self_signed_cert(tmp)
+    proc = get_context("spawn").Process(target=run_server, args=([f"{HOST}:20"], args.port, 500, 20, 0, 0.0, cert, key),
+                                        daemon=True)
+    proc.start()
+    try:
+        wait_for_port(args.port)
+        results = {
+            "runs": args.runs,
+            "per_phase_clients": asyncio.run(run_mode(args.port, cert, args.runs, args.pages, shared=False)),
+            "shared_session": asyncio.run(run_mode(args.port, cert, args.runs, args.pages, shared=True)),
+        }
+    finally:
+        proc.terminate()
+        proc.join()
+        shutil.rmtree(tmp, ignore_errors=True)
+    save_results("transport", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
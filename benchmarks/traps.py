@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import logging
+import time
+from typing import Set
+
+import httpx
+
+from app.url_discovery.core.crawler import HttpAsyncCrawler
+from app.url_discovery.core.traps import TrapDetector
+from benchmarks.common import save_results
+
+START_URL = "https://trap.example"
+
+
+def make_handler(articles: int, year: int):
+    """A site of ``articles`` real pages wrapped in the usual traps.
+
+    Every page links a calendar with prev/next months, a shop whose facet links add one filter
+    per page, a relative "more/" link that nests forever, and an endless paginated blog listing.
+    """
+    def page(links) -> httpx.Response:
+        body = "".join(f'<a href="{href}">x</a>' for href in links)
+        return httpx.Response(200, content=f"<html><body>{body}</body></html>".encode(),
+                              headers={"content-type": "text/html; charset=utf-8"})
+
+    common = ["/", f"/calendar/{year}/1", "/shop?color=red", "more/", "/blog/page/1"]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = request.url
+        parts = [p for p in url.path.split("/") if p]
+        if url.path == "/robots.txt":
+            return httpx.Response(404)
+        if url.path == "/":
+            return page(common + [f"/article/{i}" for i in range(5)])
+        if parts[0] == "article" and len(parts) == 2:
+            i = int(parts[1])
+            return page(common + [f"/article/{(i * 7 + k) % articles}" for k in range(1, 6)])
+        if parts[0] == "calendar":
+            y, m = int(parts[1]), int(parts[2])
+            prev_y, prev_m = (y, m - 1) if m > 1 else (y - 1, 12)
+            next_y, next_m = (y, m + 1) if m < 12 else (y + 1, 1)
+            return page([f"/calendar/{prev_y}/{prev_m}", f"/calendar/{next_y}/{next_m}"])
+        if parts[0] == "shop":
+            params = dict(url.params)
+            facets = ["size", "sort", "brand", "price", "material", "fit", "season", "style"]
+            extra = [f for f in facets if f not in params]
+            return page([f"{url.path}?{url.query.decode()}&{f}={v}" for f in extra[:3] for v in ("a", "b")])
+        if parts[0] == "blog":
+            n = int(parts[2])
+            return page([f"/blog/page/{n + 1}"] + [f"/article/{(n * 3 + k) % articles}" for k in range(3)])
+        # Anything under a "more/" chain.
+        return page(["more/"])
+
+    return handler
+
+
+def is_real(url: str) -> bool:
+    path = url.split("://", 1)[-1].partition("/")[2]
+    return path in ("", "/") or (path.startswith("article/") and path[len("article/"):].isdigit())
+
+
+async def crawl(articles: int, max_pages: int, traps: bool) -> dict:
+    crawler = HttpAsyncCrawler(START_URL)
+    crawler.cfg = crawler.cfg.model_copy(update={
+        "max_pages": max_pages, "verbose": False,
+        "traps": crawler.cfg.traps.model_copy(update={"enabled": traps}),
+    })
+    crawler.traps = TrapDetector(crawler.patterns, crawler.cfg.traps)
+    await crawler.client.aclose()
+    crawler.client = httpx.AsyncClient(transport=httpx.MockTransport(make_handler(articles, time.gmtime().tm_year)))
+    start = time.perf_counter()
+    try:
+        found = await crawler.run()
+    finally:
+        await crawler.close()
+    elapsed = time.perf_counter() - start
+    fetched: Set[str] = {u for u in crawler.seen if is_real(u)}
+    return {
+        "fetched": len(crawler.seen),
+        "real_fetched": len(fetched),
+        "real_found": sum(1 for u in found if is_real(u)),
+        "trap_found": sum(1 for u in found if not is_real(u)),
+        "seconds": round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Real pages reached within a page budget, with and without trap detection")
+    parser.add_argument("--articles", type=int, default=1000, help="Real pages on the site")
+    parser.add_argument("--max-pages", type=int, default=1000, help="Crawler page budget")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = {
+        "articles": args.articles,
+        "max_pages": args.max_pages,
+        "disabled": asyncio.run(crawl(args.articles, args.max_pages, False)),
+        "enabled": asyncio.run(crawl(args.articles, args.max_pages, True)),
+    }
+    save_results("traps", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
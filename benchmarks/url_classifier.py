@@ -0,0 +1,48 @@
+import argparse
+import time
+
+from app.url_discovery.core.html_parsing import is_probably_html_url
+from app.url_discovery.core.patterns import load_patterns
+from app.url_discovery.core.url_classifier import UrlClassifier
+from benchmarks.common import save_results
+
+
+def synthetic_links(count: int, distinct: int):
+    suffixes = ["", ".html", ".pdf", ".jpg?w=200", "/feed", ".min.js", "?page=2", "/api/v1/items"]
+    return [f"https://example.com/section-{i % 40}/item-{i % distinct}{suffixes[i % len(suffixes)]}"
+            for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="is_probably_html_url vs UrlClassifier throughput")
+    parser.add_argument("--links", type=int, default=1000000)
+    parser.add_argument("--distinct", type=int, default=50000, help="Distinct URLs among the links")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    patterns = load_patterns()
+    links = synthetic_links(args.links, args.distinct)
+
+    start = time.perf_counter()
+    for link in links:
+        is_probably_html_url(link, patterns)
+    uncached = time.perf_counter() - start
+
+    classifier = UrlClassifier(patterns)
+    start = time.perf_counter()
+    for link in links:
+        classifier.is_html(link)
+    cached = time.perf_counter() - start
+
+    results = {
+        "links": args.links,
+        "distinct": args.distinct,
+        "is_probably_html_url_per_sec": round(args.links / uncached, 1),
+        "classifier_per_sec": round(args.links / cached, 1),
+        "speedup": round(uncached / cached, 2),
+    }
+    save_results("url_classifier", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import time
+from typing import List
+
+from app.url_discovery.core.async_worker_pool import ItemResult, QueueProcessor
+from benchmarks.common import save_results
+
+
+class TreeProcessor(QueueProcessor[int, int]):
+    """Walks a complete ``fanout``-ary tree of ``nodes`` items, like a large sitemap index tree."""
+
+    def __init__(self, nodes: int, fanout: int, latency: float, concurrency: int):
+        super().__init__(concurrency, worker_timeout=30.0)
+        self.nodes = nodes
+        self.fanout = fanout
+        self.latency = latency
+        self.last_finished = 0.0
+
+    async def process_item(self, item: int) -> ItemResult[int, int]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0)
+        first = item * self.fanout + 1
+        self.last_finished = time.perf_counter()
+        return ItemResult([item], range(first, min(first + self.fanout, self.nodes)))
+
+
+async def measure(nodes: int, fanout: int, latency: float, concurrency: int, runs: int) -> dict:
+    seconds: List[float] = []
+    tails: List[float] = []
+    for _ in range(runs):
+        processor = TreeProcessor(nodes, fanout, latency, concurrency)
+        start = time.perf_counter()
+        results = await processor.process_with_queue([0])
+        end = time.perf_counter()
+        assert len(results) == nodes
+        seconds.append(end - start)
+        # Time between the last item finishing and process_with_queue returning.
+        tails.append(end - processor.last_finished)
+    best = min(seconds)
+    return {
+        "nodes": nodes,
+        "seconds": round(best, 4),
+        "us_per_item": round(best / nodes * 1e6, 2),
+        "shutdown_tail_ms": round(min(tails) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QueueProcessor overhead and shutdown latency on a synthetic tree")
+    parser.add_argument("--nodes", type=int, default=50000, help="Items in the zero-latency scenario")
+    parser.add_argument("--fanout", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = {
+        "overhead": asyncio.run(measure(args.nodes, args.fanout, 0.0, args.concurrency, args.runs)),
+        # Network-bound items: total time is dominated by latency, the tail by shutdown.
+        "latency_5ms": asyncio.run(measure(2000, args.fanout, 0.005, args.concurrency, args.runs)),
+    }
+    save_results("worker_pool", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import logging
+import sys
+
+from app.config.loaders.url_discovery_config_loader import get_batch_config
+from app.logging.logger import setup_logger
+from app.url_discovery.batch import run_batch
+
+
+def read_domains(path: str):
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in stream:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def main():
+    cfg = get_batch_config()
+    parser = argparse.ArgumentParser(description="SmartCrawl URL discovery for many domains")
+    parser.add_argument("domains_file", help="File with one domain or start URL per line, - for stdin")
+    parser.add_argument("--output", required=True, help="NDJSON output file, one record per domain; - for stdout")
+    parser.add_argument("--workers", type=int, default=cfg.workers, help="Worker processes, 0 = one per CPU core")
+    parser.add_argument("--max-concurrent-domains", type=int, default=cfg.max_concurrent_domains)
+    parser.add_argument("--domain-timeout", type=float, default=cfg.domain_timeout, help="Seconds per domain")
+    parser.add_argument("--no-sitemap", action="store_true", help="Skip sitemap discovery and use HTTP crawler only")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="Log level for per-domain discovery logs")
+    args = parser.parse_args()
+
+    to_stdout = args.output == "-"
+    # Logs share stdout, so they are silenced when it carries the records.
+    log_level = logging.CRITICAL + 1 if to_stdout else getattr(logging, args.log_level)
+    if to_stdout:
+        logging.disable(logging.CRITICAL)
+    logger = setup_logger(__name__)
+
+    out = sys.stdout if to_stdout else open(args.output, "w", encoding="utf-8")
+
+    def write(result):
+        out.write(result.to_json() + "\n")
+        out.flush()
+        if result.error is not None:
+            logger.warning(f"{result.domain}: {result.error}")
+        else:
+            logger.info(f"{result.domain}: {len(result.urls)} URLs in {result.seconds}s")
+
+    try:
+        run_batch(read_domains(args.domains_file), write, args.workers, args.max_concurrent_domains,
+                  use_sitemap=not args.no_sitemap, domain_timeout=args.domain_timeout, log_level=log_level)
+    finally:
+        if not to_stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
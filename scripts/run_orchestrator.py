@@ -1,11 +1,13 @@
 import argparse
 import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
 
-from app.config.loaders.env_loader import env_settings
-from app.config.loaders.helpers.yaml_loading_helper import load_yaml
-from app.config.models.app_config_model import AppConfig
+from app.config.loaders.test_config_loader import get_test_config
 from app.logging.logger import setup_logger
-from app.url_discovery.orchestrator import UrlDiscoveryOrchestrator
 
 
 def main():
@@ -20,28 +22,98 @@ def main():
         action="store_true",
         help="Skip sitemap discovery and use HTTP crawler only",
     )
+    parser.add_argument(
+        "--checkpoint-dir",
+        help="Directory for crawl checkpoints (enables checkpointing)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume from an existing checkpoint (defaults --checkpoint-dir to .checkpoints/<host>)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse child sitemaps whose lastmod is unchanged since the previous incremental run",
+    )
+    parser.add_argument(
+        "--since",
+        help="Only output sitemap URLs added or modified at or after this ISO date/time (UTC if no offset)",
+    )
+    parser.add_argument(
+        "--output",
+        choices=["log", "ndjson"],
+        default="log",
+        help="log: log every URL after the run; ndjson: stream one JSON record per URL as it is found, "
+             "then one {\"url\", \"alias_of\"} record per near-duplicate page",
+    )
+    parser.add_argument(
+        "--output-file",
+        help="Write NDJSON to this file instead of stdout",
+    )
     args = parser.parse_args()
 
+    # Imported after argument parsing so --help and usage errors return without loading the HTTP stack.
+    from app.url_discovery.core.metrics import metrics_reporting
+    from app.url_discovery.core.sitemap_state import parse_lastmod
+    from app.url_discovery.orchestrator import UrlDiscoveryOrchestrator
+
+    since = parse_lastmod(args.since) if args.since else None
+    if args.since and since is None:
+        parser.error(f"--since: invalid date/time {args.since!r}")
+
+    ndjson_to_stdout = args.output == "ndjson" and not args.output_file
+    if ndjson_to_stdout:
+        # Logs share stdout, so they are silenced when it carries the records.
+        logging.disable(logging.CRITICAL)
     logger = setup_logger(__name__)
 
     if args.start_url:
         start_url = args.start_url
         logger.info(f"Using start_url from CLI: {start_url}")
     else:
-        data = load_yaml(env_settings.get_config_path())
-        cfg = AppConfig(**data)
-        start_url = cfg.test.target_url
+        start_url = get_test_config().target_url
         logger.info(f"Using start_url from config: {start_url}")
 
+    checkpoint_dir = args.checkpoint_dir
+    if args.resume and not checkpoint_dir:
+        host = urlparse(start_url if "://" in start_url else f"https://{start_url}").netloc
+        checkpoint_dir = str(Path(".checkpoints") / host)
+    if checkpoint_dir:
+        logger.info(f"Checkpointing to {checkpoint_dir} (resume={args.resume})")
+
     async def run():
-        orchestrator = UrlDiscoveryOrchestrator(start_url, use_sitemap=not args.no_sitemap)
+        orchestrator = UrlDiscoveryOrchestrator(start_url, use_sitemap=not args.no_sitemap,
+                                                checkpoint_dir=checkpoint_dir, resume=args.resume,
+                                                incremental=args.incremental, since=since)
         logger.info("Starting URL discovery...")
+        if args.output == "ndjson":
+            out = open(args.output_file, "w", encoding="utf-8") if args.output_file else sys.stdout
+            count = 0
+            try:
+                async for u in orchestrator.stream():
+                    out.write(json.dumps({"url": u}, ensure_ascii=False) + "\n")
+                    out.flush()
+                    count += 1
+                # Known only once the crawl is over, so sent after the URLs.
+                for u, original in orchestrator.aliases.items():
+                    out.write(json.dumps({"url": u, "alias_of": original}, ensure_ascii=False) + "\n")
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            logger.info(f"TOTAL={count}")
+            return
         urls = await orchestrator.discover()
         for u in urls:
-            logger.info(f"Discovered: {u}")
+            original = orchestrator.aliases.get(u)
+            logger.info(f"Discovered: {u}" + (f" (alias of {original})" if original else ""))
         logger.info(f"TOTAL={len(urls)}")
 
-    asyncio.run(run())
+    async def run_with_metrics():
+        async with metrics_reporting():
+            await run()
+
+    asyncio.run(run_with_metrics())
 
 
 if __name__ == "__main__":